@@ -10,3 +10,21 @@ class LLMProvider(str, Enum):
     IBM = "ibm"
     HUGGINGFACE = "huggingface"
     GOOGLE = "google"
+
+
+class GraphBackend(str, Enum):
+    """
+    Enum for the backend answering the fixed graph tools.
+    """
+
+    NEO4J = "neo4j"
+    MEMORY = "memory"
+
+
+class CheckpointerBackend(str, Enum):
+    """
+    Enum for the storage of the graph checkpoints.
+    """
+
+    MEMORY = "memory"
+    SQLITE = "sqlite"
@@ -3,12 +3,12 @@ from langchain_core.runnables import RunnableSequence
 from hackathon.managers.model_manager import ModelManager
 from hackathon.graph.prompts import CHEF_EXTRACTION_PROMPT, DISH_EXTRACTION_PROMPT
 from hackathon.models import Dish, Chef, License
+import functools
 
-llm = ModelManager().model
+# The chains are built on first use, building them sets up the model
 
 
 # region Chef Extraction
-structured_llm_chef = llm.with_structured_output(Chef)
 chef_extraction_prompt = ChatPromptTemplate.from_messages(
     [
         ("system", CHEF_EXTRACTION_PROMPT),
@@ -19,11 +19,16 @@ chef_extraction_prompt = ChatPromptTemplate.from_messages(
     ]
 )
 
-chef_extraction_chain: RunnableSequence = chef_extraction_prompt | structured_llm_chef  # type: ignore
+
+@functools.cache
+def get_chef_extraction_chain() -> RunnableSequence:
+    structured_llm_chef = ModelManager().model.with_structured_output(Chef)
+    return chef_extraction_prompt | structured_llm_chef  # type: ignore
+
+
 # endregion
 
 # region Dish Extraction
-structured_llm_dish = llm.with_structured_output(Dish)
 dish_extraction_prompt = ChatPromptTemplate.from_messages(
     [
         ("system", DISH_EXTRACTION_PROMPT),
@@ -35,6 +40,11 @@ dish_extraction_prompt = ChatPromptTemplate.from_messages(
     ]
 )
 
-dish_extraction_chain: RunnableSequence = dish_extraction_prompt | structured_llm_dish  # type: ignore
+
+@functools.cache
+def get_dish_extraction_chain() -> RunnableSequence:
+    structured_llm_dish = ModelManager().model.with_structured_output(Dish)
+    return dish_extraction_prompt | structured_llm_dish  # type: ignore
+
 
 # endregion
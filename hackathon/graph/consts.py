@@ -1,4 +1,5 @@
 # Node names
+ROUTER = "router"
 FORMAT_OUTPUT = "format_output"
 
 
@@ -1,24 +1,86 @@
+from contextlib import asynccontextmanager
+from collections.abc import AsyncIterator
+import argparse
+import functools
+import os
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langgraph.graph import END, StateGraph
+from langgraph.graph.state import CompiledStateGraph
 
-from hackathon.graph.consts import CYPHER_AGENT, FORMAT_OUTPUT
+from hackathon.enums import CheckpointerBackend
+from hackathon.graph.consts import CYPHER_AGENT, FORMAT_OUTPUT, ROUTER
 
 from hackathon.graph.nodes.format_output import format_output
-from hackathon.graph.nodes.cypher_agent import cypher_agent
+from hackathon.graph.nodes.cypher_agent import get_cypher_agent
+from hackathon.graph.nodes.router import after_route, route
 
 
 from hackathon.graph.state import GraphState
+from hackathon.utils.settings.settings_provider import SettingsProvider
 
 memory = MemorySaver()
 
 
-workflow = StateGraph(GraphState)
-workflow.add_node(CYPHER_AGENT, cypher_agent)
-workflow.add_node(FORMAT_OUTPUT, format_output)
-workflow.set_entry_point(CYPHER_AGENT)
-workflow.add_edge(CYPHER_AGENT, FORMAT_OUTPUT)
-workflow.add_edge(FORMAT_OUTPUT, END)
+def build_workflow() -> StateGraph:
+    workflow = StateGraph(GraphState)
+    workflow.add_node(ROUTER, route)
+    workflow.add_node(CYPHER_AGENT, get_cypher_agent())
+    workflow.add_node(FORMAT_OUTPUT, format_output)
+    workflow.set_entry_point(ROUTER)
+    workflow.add_conditional_edges(ROUTER, after_route)
+    workflow.add_edge(CYPHER_AGENT, FORMAT_OUTPUT)
+    workflow.add_edge(FORMAT_OUTPUT, END)
+    return workflow
 
-app = workflow.compile(checkpointer=memory)
 
-app.get_graph().draw_mermaid_png(output_file_path="graph.png")
+def compile_app(checkpointer: BaseCheckpointSaver | None = None) -> CompiledStateGraph:
+    """Compile the workflow with the given checkpointer, in memory by default."""
+    return build_workflow().compile(checkpointer=checkpointer or memory)
+
+
+@functools.cache
+def get_app() -> CompiledStateGraph:
+    """The workflow compiled with the in memory checkpointer, built on first use."""
+    return compile_app()
+
+
+@asynccontextmanager
+async def open_checkpointer() -> AsyncIterator[BaseCheckpointSaver]:
+    """Open the checkpointer selected in the settings. The SQLite checkpointer
+    persists the threads on disk, so an interrupted run can be resumed.
+    """
+    settings_provider = SettingsProvider()
+    if settings_provider.get_checkpointer() == CheckpointerBackend.SQLITE:
+        async with AsyncSqliteSaver.from_conn_string(
+            settings_provider.get_checkpoint_db_path()
+        ) as checkpointer:
+            yield checkpointer
+    else:
+        yield memory
+
+
+def draw_graphs(output_dir: str = ".") -> None:
+    """Render the diagrams of the workflow and of the agent as PNG files. The
+    Mermaid diagrams are rendered by the remote mermaid.ink service.
+
+    Args:
+        - output_dir: Directory of graph.png and cypher_agent.png.
+    """
+    for name, graph in [("graph", get_app()), ("cypher_agent", get_cypher_agent())]:
+        path = os.path.join(output_dir, f"{name}.png")
+        graph.get_graph().draw_mermaid_png(output_file_path=path)
+        print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the graph diagrams.")
+    parser.add_argument(
+        "--output-dir",
+        default=".",
+        help="Directory where the PNG diagrams are saved.",
+    )
+    args = parser.parse_args()
+
+    draw_graphs(args.output_dir)
@@ -11,48 +11,59 @@ from hackathon.graph.tools.available_resources import (
     get_available_culinary_orders,
 )
 
-from hackathon.graph.tools.planet_distance import get_nearest_planets
+from hackathon.graph.tools.planet_distance import (
+    get_nearest_planets,
+    get_planets_near_any,
+    get_k_nearest_planets,
+)
 from langgraph.prebuilt import ToolNode
+from hackathon.enums import GraphBackend
 from hackathon.session import SessionManager
+from hackathon.managers.catalogue_manager import CatalogueManager
 from hackathon.managers.model_manager import ModelManager
 from hackathon.models import CypherAgentResponse
 from hackathon.utils.settings.settings_provider import SettingsProvider
 from typing import Any, Literal
+import functools
+import hashlib
 from langchain_core.messages import HumanMessage, SystemMessage
 from hackathon.graph.prompts import CYPHER_QUERY_GENERATION_PROMPT
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
+from langgraph.graph.state import CompiledStateGraph
 from hackathon.graph.consts import (
     CYPHER_AGENT,
     CYPHER_AGENT_RESPONSE,
     CYPHER_AGENT_TOOLS,
 )
 
-config_dict = SettingsProvider().get_langfuse_config()
-
 tools = [
     get_dishes_by_planets,
     get_dishes_by_ingredients,
     get_dishes_by_custom_query,
     get_nearest_planets,
+    get_planets_near_any,
+    get_k_nearest_planets,
     CypherAgentResponse,
 ]
 
-model_with_tools = ModelManager().model.bind_tools(tools, tool_choice="any")
 
-
-prompt = ChatPromptTemplate.from_messages(
-    [
-        ("system", CYPHER_QUERY_GENERATION_PROMPT),
-    ]
-)
-
-agent_chain = prompt | model_with_tools
+@functools.cache
+def get_model_with_tools():
+    """Model with the tools bound, built on the first call to the agent."""
+    return ModelManager().model.bind_tools(tools, tool_choice="any")
 
 
 def call_model(state: GraphState) -> dict[str, Any]:
     """Chiamata effettiva al cypher agent"""
-    response = model_with_tools.invoke(state.messages)
+    response = get_model_with_tools().invoke(state.messages)
+    return {"messages": [response]}
+
+
+async def acall_model(state: GraphState) -> dict[str, Any]:
+    """Chiamata asincrona al cypher agent, usata quando il grafo è eseguito con l'API async"""
+    response = await get_model_with_tools().ainvoke(state.messages)
     return {"messages": [response]}
 
 
@@ -78,35 +89,80 @@ def should_continue(
         return CYPHER_AGENT_TOOLS
 
 
-system_prompt = ChatPromptTemplate.from_template(CYPHER_QUERY_GENERATION_PROMPT)
-system_message_content = system_prompt.format(
-    schema=SessionManager().neo4j_manager.graph.schema,
-    planets=get_available_planets(),
-    technique_categories=get_available_technique_categories(),
-    restaurants=get_available_restaurants(),
-    culinary_orders=get_available_culinary_orders(),
-)
-
-
-cypher_agent = StateGraph(GraphState)
-cypher_agent.add_node(CYPHER_AGENT, call_model)
-cypher_agent.add_node(CYPHER_AGENT_RESPONSE, respond)
-cypher_agent.add_node(CYPHER_AGENT_TOOLS, ToolNode(tools))
+def get_schema() -> str:
+    """Schema del grafo da includere nel prompt. Con il backend in memoria il
+    database non viene interrogato."""
+    if SettingsProvider().get_graph_backend() == GraphBackend.MEMORY:
+        return SessionManager().memory_graph_manager.schema
+    return SessionManager().neo4j_manager.schema
 
-cypher_agent.set_entry_point(CYPHER_AGENT)
-cypher_agent.add_conditional_edges(CYPHER_AGENT, should_continue)
-cypher_agent.add_edge(CYPHER_AGENT_TOOLS, CYPHER_AGENT)
-cypher_agent.add_edge(CYPHER_AGENT_RESPONSE, END)
 
-cypher_agent = cypher_agent.compile()
+def _get_snapshot_key() -> str | None:
+    """Key of the schema snapshot: the backend, the data hash of the graph, the
+    data version of the entity files the vocabularies are read from and the hash
+    of the prompt template. None if the graph has no data hash.
+    """
+    backend = SettingsProvider().get_graph_backend()
+    data_version = CatalogueManager().data_version
+    if backend == GraphBackend.MEMORY:
+        data_hash = data_version
+    else:
+        data_hash = SessionManager().neo4j_manager.data_hash
+    if data_hash is None:
+        return None
+    prompt_hash = hashlib.sha256(CYPHER_QUERY_GENERATION_PROMPT.encode()).hexdigest()
+    return f"{backend.value}:{data_hash}:{data_version}:{prompt_hash}"
+
+
+@functools.cache
+def get_system_message_content() -> str:
+    """System prompt of the agent, with the schema of the graph and the
+    vocabularies. Read from the schema snapshot if the graph did not change since
+    it was taken, otherwise built and saved in a new snapshot.
+    """
+    snapshot_manager = SessionManager().schema_snapshot_manager
+    key = _get_snapshot_key()
+    snapshot = snapshot_manager.get(key) if key else None
+    if snapshot is not None:
+        return snapshot["system_prompt"]
+
+    schema = get_schema()
+    vocabularies = {
+        "planets": get_available_planets(),
+        "technique_categories": get_available_technique_categories(),
+        "restaurants": get_available_restaurants(),
+        "culinary_orders": get_available_culinary_orders(),
+    }
+    system_prompt = ChatPromptTemplate.from_template(CYPHER_QUERY_GENERATION_PROMPT)
+    system_message_content = system_prompt.format(schema=schema, **vocabularies)
+    if key:
+        snapshot_manager.put(key, schema, vocabularies, system_message_content)
+    return system_message_content
+
+
+@functools.cache
+def get_cypher_agent() -> CompiledStateGraph:
+    """Compile the agent subgraph. The model and the graph backend are only
+    reached when the agent runs.
+    """
+    cypher_agent = StateGraph(GraphState)
+    cypher_agent.add_node(CYPHER_AGENT, RunnableLambda(call_model, afunc=acall_model))
+    cypher_agent.add_node(CYPHER_AGENT_RESPONSE, respond)
+    cypher_agent.add_node(CYPHER_AGENT_TOOLS, ToolNode(tools))
+
+    cypher_agent.set_entry_point(CYPHER_AGENT)
+    cypher_agent.add_conditional_edges(CYPHER_AGENT, should_continue)
+    cypher_agent.add_edge(CYPHER_AGENT_TOOLS, CYPHER_AGENT)
+    cypher_agent.add_edge(CYPHER_AGENT_RESPONSE, END)
+
+    return cypher_agent.compile()
 
-cypher_agent.get_graph().draw_mermaid_png(output_file_path="cypher_agent.png")
 
 if __name__ == "__main__":
-    dishes = cypher_agent.invoke(
+    dishes = get_cypher_agent().invoke(
         input={
             "messages": [
-                SystemMessage(content=system_message_content),
+                SystemMessage(content=get_system_message_content()),
                 HumanMessage(
                     content="Quali sono i piatti che includono le Chocobo Wings come ingrediente?"
                 ),
@@ -1,20 +1,13 @@
 from typing import Any, Dict
-import json
 from hackathon.graph.state import GraphState
-from hackathon.utils.settings.settings_provider import SettingsProvider
 from hackathon.session import SessionManager
 from hackathon.models import CSVEntry
-import polars as pl
 
 
 def format_output(state: GraphState) -> Dict[str, Any]:
     print("---Format Output---")
 
-    # Load the dish mapping
-    print("Loading dish mapping")
-    mapping_path = SettingsProvider().get_dish_mapping_path()
-    with open(mapping_path) as file:
-        dish_mapping = json.load(file)
+    answer_mapping_manager = SessionManager().answer_mapping_manager
 
     # Get the dishes from the state
     dishes = state.dishes
@@ -23,14 +16,14 @@ def format_output(state: GraphState) -> Dict[str, Any]:
     # Map the dishes to ids
     print("Mapping dishes to ids")
     for dish in dishes:
-        dish_id = dish_mapping.get(dish.name.lower(), None)
+        dish_id = answer_mapping_manager.get_dish_id(dish.name)
         if dish_id is not None:
             dish_ids.append(str(dish_id))
 
     # Convert dish ids to strings
     print("Converting dish ids to strings")
     if len(dish_ids) == 0:
-        result = pl.read_csv("data/fallback_dataset.csv").row(state.question_id - 1)[-1]
+        result = answer_mapping_manager.get_fallback(state.question_id)
     else:
         result = ",".join(dish_ids)
 
@@ -39,4 +32,4 @@ def format_output(state: GraphState) -> Dict[str, Any]:
     SessionManager().dataset_manager.add_entry(
         CSVEntry(question_id=state.question_id, result=result)
     )
-    return {"question": state.question}
+    return {"question": state.question, "dish_ids": dish_ids}
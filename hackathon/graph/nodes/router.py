@@ -0,0 +1,135 @@
+import threading
+from typing import Any, Literal
+
+from hackathon.graph.consts import CYPHER_AGENT, FORMAT_OUTPUT
+from hackathon.graph.state import GraphState
+from hackathon.graph.tools.cypher_queries import (
+    get_dishes_by_ingredients,
+    get_dishes_by_planets,
+)
+from hackathon.managers.catalogue_manager import CatalogueManager
+from hackathon.utils.phrase_matcher import PhraseMatch, PhraseMatcher
+from hackathon.utils.settings.settings_provider import SettingsProvider
+from hackathon.utils.singleton import Singleton
+from hackathon.utils.text_utils import normalize_text
+
+# Vocabularies matched in the question. Only ingredients and planets are answered
+# by the router, the others are matched so that questions mentioning them fall
+# through to the agent.
+VOCABULARIES = [
+    "ingredients",
+    "planets",
+    "restaurants",
+    "culinary_orders",
+    "techniques",
+    "technique_categories",
+    "licenses",
+    "dishes",
+]
+
+# Words that make a question more than a plain lookup: negations, disjunctions,
+# distances and references to chefs, licenses or the galactic code
+FALLTHROUGH_WORDS = {"non", "senza", "tranne", "eccetto", "o", "oppure", "ne"}
+FALLTHROUGH_PREFIXES = (
+    "evit",
+    "esclu",
+    "almeno",
+    "solo",
+    "soltanto",
+    "distan",
+    "entro",
+    "anni",
+    "luce",
+    "vicin",
+    "lontan",
+    "chef",
+    "ristorant",
+    "licenz",
+    "certific",
+    "ordin",
+    "codic",
+    "manual",
+    "galattic",
+    "tecnic",
+    "grad",
+    "livell",
+    "quantit",
+    "doppi",
+    "nessun",
+)
+
+
+class QuestionMatcher(metaclass=Singleton):
+    """Singleton phrase matcher over the catalogue vocabularies, rebuilt when the
+    entity files change.
+    """
+
+    def __init__(self):
+        self._matcher = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    @property
+    def matcher(self) -> PhraseMatcher:
+        catalogue = CatalogueManager()
+        version = catalogue.version
+        with self._lock:
+            if self._matcher is None or self._version != version:
+                self._matcher = PhraseMatcher.from_vocabularies(
+                    {name: catalogue.get_vocabulary(name) for name in VOCABULARIES}
+                )
+                self._version = version
+        return self._matcher
+
+    def find(self, question: str) -> list[PhraseMatch]:
+        return self.matcher.find(question)
+
+
+def _is_plain_lookup(question: str) -> bool:
+    """Whether the question has no words that could add a constraint the matched
+    entities do not capture.
+    """
+    for word in normalize_text(question).split():
+        if word.isdigit() or any(char.isdigit() for char in word):
+            return False
+        if word in FALLTHROUGH_WORDS or word.startswith(FALLTHROUGH_PREFIXES):
+            return False
+    return True
+
+
+def route(state: GraphState) -> dict[str, Any]:
+    """Answer the questions asking for the dishes with some ingredients, or for the
+    dishes of some planets, with the fixed tools and without calling the LLM. Any
+    other question, or one the router is not sure about, is left to the agent.
+    """
+    print("---Router---")
+
+    if not SettingsProvider().router_enabled() or not _is_plain_lookup(state.question):
+        return {"dishes": []}
+
+    matches = QuestionMatcher().find(state.question)
+    kinds = set()
+    for match in matches:
+        if len(match.kinds) > 1:
+            # The same phrase names different entities
+            return {"dishes": []}
+        kinds |= match.kinds
+
+    phrases = list(dict.fromkeys(match.phrase for match in matches))
+    if kinds == {"ingredients"}:
+        dishes = get_dishes_by_ingredients.invoke({"ingredients": phrases})["dishes"]
+    elif kinds == {"planets"}:
+        dishes = get_dishes_by_planets.invoke({"planet_names": phrases})["dishes"]
+    else:
+        return {"dishes": []}
+
+    if dishes:
+        print(f"Answered by the router with {next(iter(kinds))}: {phrases}")
+    return {"dishes": dishes}
+
+
+def after_route(state: GraphState) -> Literal["format_output", "cypher_agent"]:
+    # An empty result may be a wrong match, the agent gets a chance to do better
+    if state.dishes:
+        return FORMAT_OUTPUT
+    return CYPHER_AGENT
@@ -81,6 +81,8 @@ Il tuo compito è analizzare:
 Hai a disposizione i seguenti tools:
 - get_dishes_by_ingredients: se nella query dell'utente vengono specificati degli ingredienti in modo esplicito, utilizza questo tool.
 - get_nearest_planets: se nella query dell'utente è specificato un pianeta e un raggio massimo di distanza, utilizza questo tool per ottenere i pianeti che soddisfano i requisiti da utilizzare poi per una query custom.
+- get_planets_near_any: se nella query dell'utente sono specificati più pianeti di riferimento e un raggio massimo di distanza, utilizza questo tool per ottenere i pianeti vicini ad almeno uno di essi.
+- get_k_nearest_planets: se nella query dell'utente sono richiesti i k pianeti più vicini a un pianeta, utilizza questo tool.
 - get_dishes_by_planets: se nella query dell'utente è specificato un pianeta o una lista di pianeti in modo esplicito, utilizza questo tool.
 - get_dishes_by_custom_query: questo tool ti consente di eseguire una query custom, nel caso in cui la richiesta dell'utente non rientri nei casi precedenti.
 
@@ -14,6 +14,7 @@ class GraphState(BaseModel):
         question_id: The id of the user's question.
         dishes: A list of dishes that satisfy the user's question.
         messages: The messages generated by the CypherAgent.
+        dish_ids: The ids of the dishes of the answer, empty if it is a fallback.
     """
 
     question: str = Field(description="La domanda dell'utente.", default="")
@@ -25,3 +26,7 @@ class GraphState(BaseModel):
     messages: Annotated[Sequence[BaseMessage], add_messages] = Field(
         description="I messaggi generati dal CypherAgent", default_factory=list
     )
+    dish_ids: list[str] = Field(
+        description="Id dei piatti della risposta, vuota se è quella di fallback",
+        default_factory=list,
+    )
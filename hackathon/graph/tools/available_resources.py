@@ -1,5 +1,4 @@
-from hackathon.utils.settings.settings_provider import SettingsProvider
-from hackathon.utils.file_utils import load_json
+from hackathon.managers.catalogue_manager import CatalogueManager
 
 
 def get_available_restaurants() -> list[str]:
@@ -12,66 +11,49 @@ def get_available_restaurants() -> list[str]:
     pianeta. Posso utilizzare il tool get_available_restaurants per ottenere la lista dei ristoranti disponibili.
     Chiamata al tool: get_available_restaurants()
     """
-    chef_file_path = SettingsProvider().get_chefs_json_path()
-    chefs = load_json(chef_file_path)
-    return list(set([chef["restaurant"].lower() for chef in chefs]))
+    return CatalogueManager().get_vocabulary("restaurants")
 
 
 def get_available_dishes() -> list[str]:
     """Restituisce il nome dei piatti disponibili
     Utilizza il seguente tool per ottenere la lista dei piatti disponibili.
     """
-    dishes_file_path = SettingsProvider().get_dishes_json_path()
-    dishes = load_json(dishes_file_path)
-    return list(set([dish["name"].lower() for dish in dishes]))
+    return CatalogueManager().get_vocabulary("dishes")
 
 
 def get_available_techniques() -> list[str]:
     """Restituisce il nome delle tecniche disponibili
     Utilizza il seguente tool per ottenere la lista delle tecniche disponibili.
     """
-    techniques_json_path = SettingsProvider().get_techniques_json_path()
-    techniques = load_json(techniques_json_path)
-    return list(set([technique["name"].lower() for technique in techniques]))
+    return CatalogueManager().get_vocabulary("techniques")
 
 
 def get_available_licenses() -> list[str]:
     """Restituisce il nome delle licenze disponibili
     Utilizza il seguente tool per ottenere la lista delle licenze disponibili.
     """
-    chefs_file_path = SettingsProvider().get_chefs_json_path()
-    chefs = load_json(chefs_file_path)
-    license_names = []
-    for chef in chefs:
-        for license in chef["licenses"]:
-            license_names.append(license["name"].lower())
+    return CatalogueManager().get_vocabulary("licenses")
 
 
 def get_available_planets() -> list[str]:
     """Restituisce il nome dei pianeti disponibili
     Utilizza il seguente tool per ottenere la lista dei pianeti disponibili.
     """
-    chef_file_path = SettingsProvider().get_chefs_json_path()
-    chefs = load_json(chef_file_path)
-    return list(set([chef["planet_name"].lower() for chef in chefs]))
+    return CatalogueManager().get_vocabulary("planets")
 
 
 def get_available_culinary_orders() -> list[str]:
     """Restituisce il nome degli ordini culinari disponibili
     Utilizza il seguente tool per ottenere la lista degli ordini culinari disponibili.
     """
-    dishes_file_path = SettingsProvider().get_dishes_json_path()
-    dishes = load_json(dishes_file_path)
-    return list(set([dish["culinary_order"].lower() for dish in dishes]))
+    return CatalogueManager().get_vocabulary("culinary_orders")
 
 
 def get_available_technique_categories() -> list[str]:
     """Restituisce il nome delle categorie delle tecniche disponibili
     Utilizza il seguente tool per ottenere la lista delle categorie delle tecniche disponibili.
     """
-    techniques_json_path = SettingsProvider().get_techniques_json_path()
-    techniques = load_json(techniques_json_path)
-    return list(set([technique["category"].lower() for technique in techniques]))
+    return CatalogueManager().get_vocabulary("technique_categories")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,137 @@
+import logging
+import re
+
+from hackathon.session import SessionManager
+from hackathon.utils.settings.settings_provider import SettingsProvider
+from hackathon.utils.singleton import Singleton
+from hackathon.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Comments, then string literals and escaped identifiers, whose content must not
+# be mistaken for clauses
+COMMENTS = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+LITERALS = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`")
+NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+
+# Clauses that modify the graph, and procedure calls, which may do it too
+WRITE_CLAUSES = re.compile(
+    r"\b(CREATE|MERGE|DELETE|DETACH|SET|REMOVE|DROP|FOREACH|LOAD\s+CSV)\b"
+    r"|\bCALL\s+[\w.]+\s*\(",
+    re.IGNORECASE,
+)
+
+
+def normalize_query(query: str) -> str:
+    """Shape of a query: comments dropped, literals replaced by `?` and whitespace
+    collapsed. Queries differing only in their literals share the same shape.
+    """
+    query = COMMENTS.sub(" ", query)
+    query = LITERALS.sub("?", query)
+    query = NUMBERS.sub("?", query)
+    return " ".join(query.split())
+
+
+class CypherGuard(metaclass=Singleton):
+    """Singleton guard running the queries written by the LLM on the graph.
+
+    A query is rejected if it contains a write clause outside of its literals, and
+    then planned with EXPLAIN, which checks the syntax and gives the query type
+    computed by Neo4j: only read only plans are accepted. Validated shapes are
+    cached, so a query with a known shape runs without being planned again. Queries
+    run in read only sessions, with a timeout and a limit on the number of rows.
+    """
+
+    def __init__(self):
+        self._validated = None
+        self._hits = 0
+        self._misses = 0
+        self.settings_provider = SettingsProvider()  # type: ignore
+
+    @property
+    def validated(self) -> TTLCache:
+        if self._validated is None:
+            self._validated = TTLCache(
+                max_size=self.settings_provider.get_cypher_plan_cache_size()
+            )
+        return self._validated
+
+    def _check_clauses(self, query: str) -> str | None:
+        """Reject the queries with write clauses.
+
+        Returns:
+            - The shape of the query, None if it was already validated.
+        """
+        shape = normalize_query(query)
+        if self.validated.get(shape):
+            self._hits += 1
+            return None
+        self._misses += 1
+
+        clause = WRITE_CLAUSES.search(shape)
+        if clause:
+            raise ValueError(
+                f"Only read queries are allowed, found '{clause.group(0)}'."
+            )
+        return shape
+
+    def _check_plan(self, shape: str, query_type: str) -> None:
+        if query_type != "r":
+            raise ValueError(
+                f"Only read queries are allowed, got a '{query_type}' plan."
+            )
+        self.validated.put(shape, True)
+
+    def validate(self, query: str, params: dict | None = None) -> None:
+        """Check that a query only reads the graph.
+
+        Args:
+            - query: The Cypher query.
+            - params: The parameters of the query.
+
+        Raises:
+            - ValueError: If the query may modify the graph.
+        """
+        shape = self._check_clauses(query)
+        if shape is not None:
+            query_type = SessionManager().neo4j_manager.explain(query, params)
+            self._check_plan(shape, query_type)
+
+    async def avalidate(self, query: str, params: dict | None = None) -> None:
+        """Async version of `validate`."""
+        shape = self._check_clauses(query)
+        if shape is not None:
+            query_type = await SessionManager().neo4j_manager.aexplain(query, params)
+            self._check_plan(shape, query_type)
+
+    def run(self, query: str, params: dict | None = None) -> list[dict]:
+        """Validate a query and run it with the configured timeout and row limit.
+
+        Args:
+            - query: The Cypher query.
+            - params: The parameters of the query.
+
+        Returns:
+            - The rows of the result.
+        """
+        self.validate(query, params)
+        return SessionManager().neo4j_manager.read(
+            query,
+            params,
+            timeout=self.settings_provider.get_cypher_query_timeout(),
+            row_limit=self.settings_provider.get_cypher_row_limit(),
+        )
+
+    async def arun(self, query: str, params: dict | None = None) -> list[dict]:
+        """Async version of `run`."""
+        await self.avalidate(query, params)
+        return await SessionManager().neo4j_manager.aread(
+            query,
+            params,
+            timeout=self.settings_provider.get_cypher_query_timeout(),
+            row_limit=self.settings_provider.get_cypher_row_limit(),
+        )
+
+    def get_stats(self) -> dict[str, int]:
+        """Number of queries whose shape was already validated, and of new ones."""
+        return {"hits": self._hits, "misses": self._misses}
@@ -1,13 +1,98 @@
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
+from hackathon.enums import GraphBackend
+from hackathon.graph.tools.cypher_guard import COMMENTS, LITERALS, CypherGuard
+from hackathon.graph.tools.query_cache import QueryCache
+from hackathon.managers.memory_graph_manager import MemoryGraphManager
 from hackathon.models import Dish
 from hackathon.session import SessionManager
+from hackathon.utils.settings.settings_provider import SettingsProvider
+from collections import defaultdict
+from collections.abc import Callable
 from typing import Any
+import re
+import time
 
-neo4j_store_manager = SessionManager().neo4j_manager
+DISHES_BY_INGREDIENTS_QUERY = """
+    MATCH (d:Dish)-[:CONTAINS]->(i:Ingredient)
+    WHERE i.name IN $ingredients
+    WITH d, COUNT(DISTINCT i) AS matched_ingredients
+    WHERE matched_ingredients = SIZE($ingredients)
+    RETURN d
+    """
+
+DISHES_BY_PLANETS_QUERY = """
+    MATCH (d:Dish)
+    WHERE d.planet_name IN $planet_names
+    RETURN d
+    """
+
+RELATIONS_BY_DISH_NAMES_QUERY = """
+    UNWIND $dish_names AS dish_name
+    MATCH (d:Dish {name: dish_name})
+    OPTIONAL MATCH (d)-[:CONTAINS]->(i:Ingredient)
+    WITH d, COLLECT(DISTINCT i.name) AS ingredients
+    OPTIONAL MATCH (d)-[:REQUIRES_TECHNIQUE]->(t:Technique)
+    RETURN d.name AS name, ingredients, COLLECT(DISTINCT t.name) AS techniques
+    """
+
+# Queries of the tools, planned by `Neo4jStoreManager.missing_indexes`
+TOOL_QUERIES = [
+    DISHES_BY_INGREDIENTS_QUERY,
+    DISHES_BY_PLANETS_QUERY,
+    RELATIONS_BY_DISH_NAMES_QUERY,
+]
+
+# Vocabulary of the node properties holding entity names, by label and property
+KIND_BY_PROPERTY = {
+    ("Ingredient", "name"): "ingredients",
+    ("Technique", "name"): "techniques",
+    ("Technique", "category"): "technique_categories",
+    ("Dish", "name"): "dishes",
+    ("Dish", "planet_name"): "planets",
+    ("Dish", "restaurant"): "restaurants",
+    ("Dish", "culinary_order"): "culinary_orders",
+    ("Chef", "planet_name"): "planets",
+    ("Chef", "restaurant"): "restaurants",
+    ("License", "name"): "licenses",
+}
+
+# Node patterns with a label, e.g. (d:Dish {name: $name}), and the parameters
+# compared for equality with a property, e.g. d.name = $name or d.name IN $names
+NODE_PATTERN = re.compile(r"\(\s*(\w*)\s*:\s*(\w+)\s*(\{[^}]*\})?")
+MAP_PARAM = re.compile(r"(\w+)\s*:\s*\$(\w+)")
+PROPERTY_PARAM = re.compile(
+    r"\b(\w+)\.(\w+)\s*(?:=(?!~)|\bIN\b)\s*\$(\w+)", re.IGNORECASE
+)
+PARAM_PROPERTY = re.compile(r"\$(\w+)\s*=(?!~)\s*(\w+)\.(\w+)")
+
+
+def _use_memory_backend() -> bool:
+    return SettingsProvider().get_graph_backend() == GraphBackend.MEMORY
 
 
-# @tool(name_or_callable="get_dishes_by_ingredients")
-def get_dishes_by_ingredients(ingredients: list[str]) -> dict[str, list[Dish]]:
+def _prepare_lookup(
+    names: list[str],
+    kind: str,
+    memory_lookup: Callable[[MemoryGraphManager, list[str]], list[Dish]],
+) -> tuple[list[str], dict[str, list[Dish]] | None]:
+    """Link the entity names of a fixed tool and, on the memory backend, answer it.
+
+    Args:
+        - names: The entity names, as written by the LLM.
+        - kind: The vocabulary of the names, e.g. "ingredients" or "planets".
+        - memory_lookup: The method of MemoryGraphManager answering the tool.
+
+    Returns:
+        - The linked names, and the answer on the memory backend, None on Neo4j.
+    """
+    names = SessionManager().entity_linker_manager.link_all(names, kind)
+    if _use_memory_backend():
+        memory_graph_manager = SessionManager().memory_graph_manager
+        return names, {"dishes": memory_lookup(memory_graph_manager, names)}
+    return names, None
+
+
+def _get_dishes_by_ingredients(ingredients: list[str]) -> dict[str, list[Dish]]:
     """Restituisce i piatti che contengono tutti gli ingredienti specificati (case-insensitive).
 
     Esempi di utilizzo del tool:
@@ -16,22 +101,45 @@ def get_dishes_by_ingredients(ingredients: list[str]) -> dict[str, list[Dish]]:
     il tool `get_dishes_by_ingredients`con il seguente input: ['chocobo wings'].
     Chiamata al tool: get_dishes_by_ingredients(['chocobo wings']).
     """
-    query = """
-        MATCH (d:Dish)-[:CONTAINS]->(i:Ingredient)
-        WHERE i.name IN $ingredients
-        WITH d, COUNT(DISTINCT i) AS matched_ingredients
-        WHERE matched_ingredients = SIZE($ingredients)
-        RETURN d
-        """
-    res = neo4j_store_manager.graph.query(
-        query, params={"ingredients": [i.lower() for i in ingredients]}
+    ingredients, answer = _prepare_lookup(
+        ingredients, "ingredients", MemoryGraphManager.get_dishes_by_ingredients
     )
+    if answer is not None:
+        return answer
 
+    res = QueryCache().query(
+        DISHES_BY_INGREDIENTS_QUERY, params={"ingredients": ingredients}
+    )
     return {"dishes": _get_dishes(res)}
 
 
-@tool(name_or_callable="get_dishes_by_planets")
-def get_dishes_by_planets(planet_names: list[str]) -> dict[str, list[Dish]]:
+async def _aget_dishes_by_ingredients(
+    ingredients: list[str],
+) -> dict[str, list[Dish]]:
+    """Versione asincrona di get_dishes_by_ingredients."""
+    ingredients, answer = _prepare_lookup(
+        ingredients, "ingredients", MemoryGraphManager.get_dishes_by_ingredients
+    )
+    if answer is not None:
+        return answer
+
+    res = await QueryCache().aquery(
+        DISHES_BY_INGREDIENTS_QUERY, params={"ingredients": ingredients}
+    )
+    return {"dishes": await _aget_dishes(res)}
+
+
+# The tools get a coroutine too, the ToolNode awaits it when the graph runs with
+# the async API instead of running the function in a worker thread
+get_dishes_by_ingredients = StructuredTool.from_function(
+    func=_get_dishes_by_ingredients,
+    coroutine=_aget_dishes_by_ingredients,
+    name="get_dishes_by_ingredients",
+    description=_get_dishes_by_ingredients.__doc__,
+)
+
+
+def _get_dishes_by_planets(planet_names: list[str]) -> dict[str, list[Dish]]:
     """Restituisce i piatti preparati sui pianeti specificati
 
     Esempi di utilizzo del tool:
@@ -40,21 +148,96 @@ def get_dishes_by_planets(planet_names: list[str]) -> dict[str, list[Dish]]:
     il tool `get_dishes_by_planets` con il seguente input: ['cybertron', 'krypton'].
     Chiamata al tool: get_dishes_by_planets(['cybertron', 'krypton']).
     """
-
-    query = """
-    MATCH (d:Dish)
-    WHERE d.planet_name IN $planet_names
-    RETURN d
-    """
-    res = neo4j_store_manager.graph.query(
-        query, params={"planet_names": [planet.lower() for planet in planet_names]}
+    planet_names, answer = _prepare_lookup(
+        planet_names, "planets", MemoryGraphManager.get_dishes_by_planets
     )
+    if answer is not None:
+        return answer
 
+    res = QueryCache().query(
+        DISHES_BY_PLANETS_QUERY, params={"planet_names": planet_names}
+    )
     return {"dishes": _get_dishes(res)}
 
 
-@tool(name_or_callable="get_dishes_by_custom_query")
-def get_dishes_by_custom_query(query: str, params: dict) -> dict[str, list[Dish]]:
+async def _aget_dishes_by_planets(planet_names: list[str]) -> dict[str, list[Dish]]:
+    """Versione asincrona di get_dishes_by_planets."""
+    planet_names, answer = _prepare_lookup(
+        planet_names, "planets", MemoryGraphManager.get_dishes_by_planets
+    )
+    if answer is not None:
+        return answer
+
+    res = await QueryCache().aquery(
+        DISHES_BY_PLANETS_QUERY, params={"planet_names": planet_names}
+    )
+    return {"dishes": await _aget_dishes(res)}
+
+
+get_dishes_by_planets = StructuredTool.from_function(
+    func=_get_dishes_by_planets,
+    coroutine=_aget_dishes_by_planets,
+    name="get_dishes_by_planets",
+    description=_get_dishes_by_planets.__doc__,
+)
+
+
+def _entity_params(query: str) -> dict[str, str]:
+    """Find the parameters of a query compared for equality, with = or IN, to a
+    property holding entity names.
+
+    Args:
+        - query: The Cypher query.
+
+    Returns:
+        - The vocabulary of the entities compared to each parameter. Parameters
+        compared to other properties, or to different vocabularies, are left out.
+    """
+    query = LITERALS.sub("''", COMMENTS.sub(" ", query))
+    labels = {}
+    kinds: dict[str, set[str | None]] = defaultdict(set)
+    for variable, label, properties in NODE_PATTERN.findall(query):
+        if variable:
+            labels[variable] = label
+        for prop, param in MAP_PARAM.findall(properties):
+            kinds[param].add(KIND_BY_PROPERTY.get((label, prop)))
+    for variable, prop, param in PROPERTY_PARAM.findall(query):
+        kinds[param].add(KIND_BY_PROPERTY.get((labels.get(variable), prop)))
+    for param, variable, prop in PARAM_PROPERTY.findall(query):
+        kinds[param].add(KIND_BY_PROPERTY.get((labels.get(variable), prop)))
+    return {
+        param: next(iter(kind))
+        for param, kind in kinds.items()
+        if len(kind) == 1 and None not in kind
+    }
+
+
+def _link_params(query: str, params: dict) -> dict:
+    """Link the entity names in the parameters to the names in the graph, which
+    are lower case. Only the parameters compared for equality to an entity name
+    are linked, against the vocabulary of that property: substrings matched with
+    CONTAINS or STARTS WITH and free text are left as written, as linking them
+    could turn a missing entity into a different one.
+    """
+    entity_linker_manager = SessionManager().entity_linker_manager
+    kinds = _entity_params(query)
+    linked_params = {}
+    for key, value in params.items():
+        kind = kinds.get(key)
+        if kind is not None and isinstance(value, str):
+            linked_params[key] = entity_linker_manager.link(value, kind)
+        elif (
+            kind is not None
+            and isinstance(value, list)
+            and all(isinstance(v, str) for v in value)
+        ):
+            linked_params[key] = entity_linker_manager.link_all(value, kind)
+        else:
+            linked_params[key] = value
+    return linked_params
+
+
+def _get_dishes_by_custom_query(query: str, params: dict) -> dict[str, list[Dish]]:
     """Restituisce i piatti che soddisfano una query specifica.
 
     Esempi di utilizzo del tool:
@@ -71,20 +254,112 @@ def get_dishes_by_custom_query(query: str, params: dict) -> dict[str, list[Dish]
     params = {"technique_name": "sferificazione a gravità psionica variabile"}
     Chiamata al tool: get_dishes_by_custom_query(query)
     """
+    # Custom queries always run on Neo4j, the memory backend answers only the
+    # fixed tools
+    res = QueryCache().query(query, _link_params(query, params), run=CypherGuard().run)
+    return {"dishes": _get_dishes(res)}
 
-    # lower case all the parameters
-    lower_params = {}
-    for key, value in params.items():
-        if isinstance(value, str):
-            lower_params[key] = value.lower()
-        else:
-            lower_params[key] = value
 
-    res = neo4j_store_manager.graph.query(query, lower_params)
-    return {"dishes": _get_dishes(res)}
+async def _aget_dishes_by_custom_query(
+    query: str, params: dict
+) -> dict[str, list[Dish]]:
+    """Versione asincrona di get_dishes_by_custom_query."""
+    res = await QueryCache().aquery(
+        query, _link_params(query, params), run=CypherGuard().arun
+    )
+    return {"dishes": await _aget_dishes(res)}
+
+
+get_dishes_by_custom_query = StructuredTool.from_function(
+    func=_get_dishes_by_custom_query,
+    coroutine=_aget_dishes_by_custom_query,
+    name="get_dishes_by_custom_query",
+    description=_get_dishes_by_custom_query.__doc__,
+)
+
+
+def _build_dishes(
+    res: list[dict[str, Any]],
+    dish_names: list[str],
+    relations: dict[str, tuple[list[str], list[str]]],
+) -> list[Dish]:
+    dishes = []
+    for d, dish_name in zip(res, dish_names):
+        ingredients, techniques = relations.get(dish_name, ([], []))
+        dishes.append(Dish.from_neo4j(d, ingredients, techniques))
+    return dishes
+
+
+def _get_dish_names(res: list[dict[str, Any]]) -> list[str]:
+    return [next(iter(d.values()))["name"] for d in res]
 
 
 def _get_dishes(res: list[dict[str, Any]]) -> list[Dish]:
+    """Build the Dish objects of a query result, fetching the ingredients and the
+    techniques of all the dishes with a single query.
+
+    Args:
+        - res: Rows returned by a query whose first column is a dish node.
+
+    Returns:
+        - List of dishes, in the same order as the rows.
+    """
+    dish_names = _get_dish_names(res)
+    # Sorted, so the same dishes always give the same cache key
+    relations = _get_relations_by_dish_names(sorted(set(dish_names)))
+    return _build_dishes(res, dish_names, relations)
+
+
+async def _aget_dishes(res: list[dict[str, Any]]) -> list[Dish]:
+    """Async version of `_get_dishes`."""
+    dish_names = _get_dish_names(res)
+    relations = await _aget_relations_by_dish_names(sorted(set(dish_names)))
+    return _build_dishes(res, dish_names, relations)
+
+
+def _relations_by_dish_name(
+    res: list[dict[str, Any]],
+) -> dict[str, tuple[list[str], list[str]]]:
+    return {r["name"]: (r["ingredients"], r["techniques"]) for r in res}
+
+
+def _get_relations_by_dish_names(
+    dish_names: list[str],
+) -> dict[str, tuple[list[str], list[str]]]:
+    """Get the ingredients and the techniques of a set of dishes.
+
+    Args:
+        - dish_names: Names of the dishes.
+
+    Returns:
+        - Mapping from dish name to its ingredients and techniques.
+    """
+    if not dish_names:
+        return {}
+
+    res = QueryCache().query(
+        RELATIONS_BY_DISH_NAMES_QUERY, params={"dish_names": dish_names}
+    )
+    return _relations_by_dish_name(res)
+
+
+async def _aget_relations_by_dish_names(
+    dish_names: list[str],
+) -> dict[str, tuple[list[str], list[str]]]:
+    """Async version of `_get_relations_by_dish_names`."""
+    if not dish_names:
+        return {}
+
+    res = await QueryCache().aquery(
+        RELATIONS_BY_DISH_NAMES_QUERY, params={"dish_names": dish_names}
+    )
+    return _relations_by_dish_name(res)
+
+
+def _get_dishes_per_dish(res: list[dict[str, Any]]) -> list[Dish]:
+    """Build the Dish objects of a query result with two queries per dish.
+    Kept as a reference for `compare_hydration_latency`.
+    """
     dishes = []
     for d in res:
         dish_name = d[list(d.keys())[0]]["name"]
@@ -94,6 +369,37 @@ def _get_dishes(res: list[dict[str, Any]]) -> list[Dish]:
     return dishes
 
 
+def compare_hydration_latency(repeat: int = 5) -> dict[str, float]:
+    """Compare the latency of the batched hydration against the per-dish one, on
+    the result set of all the dishes in the graph. Run it with the query cache
+    disabled, otherwise the batched hydration is served from the cache.
+
+    Args:
+        - repeat: Number of runs for each hydration path.
+
+    Returns:
+        - Mean latency in seconds of each hydration path.
+    """
+    res = SessionManager().neo4j_manager.read("MATCH (d:Dish) RETURN d")
+
+    latencies = {}
+    for name, hydrate in [
+        ("batched", _get_dishes),
+        ("per_dish", _get_dishes_per_dish),
+    ]:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            hydrate(res)
+        latencies[name] = (time.perf_counter() - start) / repeat
+
+    print(
+        f"Hydrated {len(res)} dishes: batched {latencies['batched']:.3f}s, "
+        f"per dish {latencies['per_dish']:.3f}s "
+        f"({latencies['per_dish'] / latencies['batched']:.1f}x)"
+    )
+    return latencies
+
+
 def _get_ingredients_by_dish_name(dish_name: str) -> list[str]:
     """Get the ingredients of a dish by its name.
 
@@ -107,7 +413,7 @@ def _get_ingredients_by_dish_name(dish_name: str) -> list[str]:
         MATCH (d:Dish {name: $dish_name})-[:CONTAINS]->(i:Ingredient)
         RETURN i.name
         """
-    res = neo4j_store_manager.graph.query(query, params={"dish_name": dish_name})
+    res = SessionManager().neo4j_manager.read(query, params={"dish_name": dish_name})
     return [r["i.name"] for r in res]
 
 
@@ -124,11 +430,13 @@ def _get_techniques_by_dish_name(dish_name: str) -> list[str]:
     MATCH (d:Dish {name: $dish_name}) -[:REQUIRES_TECHNIQUE] -> (t:Technique)
     RETURN t.name
     """
-    res = neo4j_store_manager.graph.query(query, params={"dish_name": dish_name})
+    res = SessionManager().neo4j_manager.read(query, params={"dish_name": dish_name})
     return [r["t.name"] for r in res]
 
 
 if __name__ == "__main__":
     ingredients = ["uova di fenice", "scaglie stellari"]
-    dishes = get_dishes_by_ingredients(ingredients)
+    dishes = get_dishes_by_ingredients.invoke({"ingredients": ingredients})
     print(dishes)
+
+    compare_hydration_latency()
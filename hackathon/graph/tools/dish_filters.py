@@ -0,0 +1,211 @@
+from abc import ABC, abstractmethod
+from collections import defaultdict
+
+from hackathon.models import Dish, Technique
+
+
+class DishMatrix:
+    """Columnar representation of the dish catalogue.
+
+    Each row is a dish and each column a feature (an ingredient, a technique, a
+    technique category, a license level, a planet or a culinary order). A column is
+    stored as a packed bitset, a Python int whose i-th bit is set when the i-th dish
+    has the feature, so filters are evaluated with bitwise operations over all the
+    dishes at once.
+    """
+
+    def __init__(self, dish_names: list[str]):
+        self.dish_names = dish_names
+        self.all = (1 << len(dish_names)) - 1
+        self.ingredients: dict[str, int] = defaultdict(int)
+        self.techniques: dict[str, int] = defaultdict(int)
+        self.technique_categories: dict[str, int] = defaultdict(int)
+        self.licenses: dict[tuple[str, int], int] = defaultdict(int)
+        self.planets: dict[str, int] = defaultdict(int)
+        self.culinary_orders: dict[str, int] = defaultdict(int)
+
+    @classmethod
+    def from_entities(
+        cls, dishes: list[Dish], techniques: list[Technique]
+    ) -> "DishMatrix":
+        """Build the matrix from the dishes and the techniques of the catalogue.
+
+        Args:
+            - dishes: list of Dish objects, one row per distinct name.
+            - techniques: list of Technique objects, giving categories and licenses.
+
+        Returns:
+            - The dish matrix.
+        """
+        rows = {dish.name.lower(): dish for dish in dishes}
+        matrix = cls(list(rows))
+
+        technique_categories = {t.name.lower(): t.category.lower() for t in techniques}
+        technique_licenses = {
+            t.name.lower(): [(lic.name.lower(), lic.level) for lic in t.licenses]
+            for t in techniques
+        }
+
+        for i, dish in enumerate(rows.values()):
+            bit = 1 << i
+            matrix.planets[dish.planet_name.lower()] |= bit
+            matrix.culinary_orders[dish.culinary_order.lower()] |= bit
+            for ingredient in dish.ingredients:
+                matrix.ingredients[ingredient.lower()] |= bit
+            for technique in dish.techniques:
+                technique = technique.lower()
+                matrix.techniques[technique] |= bit
+                if technique in technique_categories:
+                    matrix.technique_categories[technique_categories[technique]] |= bit
+                for lic in technique_licenses.get(technique, []):
+                    matrix.licenses[lic] |= bit
+        return matrix
+
+    def names(self, mask: int) -> list[str]:
+        """Names of the dishes whose bit is set in the mask, in row order."""
+        return [name for i, name in enumerate(self.dish_names) if mask >> i & 1]
+
+    def evaluate(self, expression: "DishFilter") -> list[str]:
+        """Names of the dishes satisfying a filter expression."""
+        return self.names(expression.mask(self))
+
+    def cross_check(
+        self, expression: "DishFilter", dish_names: list[str]
+    ) -> dict[str, list[str]]:
+        """Compare the dishes returned by another path, e.g. an LLM-written Cypher
+        query, with the ones satisfying the filter expression.
+
+        Args:
+            - expression: the filter the query is expected to implement.
+            - dish_names: names of the dishes returned by the query.
+
+        Returns:
+            - The expected dishes that are missing, and the returned dishes that do
+            not satisfy the filter.
+        """
+        expected = set(self.evaluate(expression))
+        returned = {name.lower() for name in dish_names}
+        return {
+            "missing": sorted(expected - returned),
+            "unexpected": sorted(returned - expected),
+        }
+
+
+class DishFilter(ABC):
+    """Predicate over the dishes, combined with `&`, `|` and `~`."""
+
+    @abstractmethod
+    def mask(self, matrix: DishMatrix) -> int:
+        """Bitset of the dishes of the matrix satisfying the filter."""
+
+    def __and__(self, other: "DishFilter") -> "DishFilter":
+        return And(self, other)
+
+    def __or__(self, other: "DishFilter") -> "DishFilter":
+        return Or(self, other)
+
+    def __invert__(self) -> "DishFilter":
+        return Not(self)
+
+
+class And(DishFilter):
+    def __init__(self, *filters: DishFilter):
+        self.filters = filters
+
+    def mask(self, matrix: DishMatrix) -> int:
+        result = matrix.all
+        for f in self.filters:
+            result &= f.mask(matrix)
+        return result
+
+
+class Or(DishFilter):
+    def __init__(self, *filters: DishFilter):
+        self.filters = filters
+
+    def mask(self, matrix: DishMatrix) -> int:
+        result = 0
+        for f in self.filters:
+            result |= f.mask(matrix)
+        return result
+
+
+class Not(DishFilter):
+    def __init__(self, filter: DishFilter):
+        self.filter = filter
+
+    def mask(self, matrix: DishMatrix) -> int:
+        return matrix.all & ~self.filter.mask(matrix)
+
+
+class HasIngredient(DishFilter):
+    def __init__(self, name: str):
+        self.name = name.lower()
+
+    def mask(self, matrix: DishMatrix) -> int:
+        return matrix.ingredients.get(self.name, 0)
+
+
+class UsesTechnique(DishFilter):
+    def __init__(self, name: str):
+        self.name = name.lower()
+
+    def mask(self, matrix: DishMatrix) -> int:
+        return matrix.techniques.get(self.name, 0)
+
+
+class UsesTechniqueCategory(DishFilter):
+    def __init__(self, category: str):
+        self.category = category.lower()
+
+    def mask(self, matrix: DishMatrix) -> int:
+        return matrix.technique_categories.get(self.category, 0)
+
+
+class NeedsLicense(DishFilter):
+    """Dishes requiring a technique that needs the license at `min_level` or above."""
+
+    def __init__(self, name: str, min_level: int = 0):
+        self.name = name.lower()
+        self.min_level = min_level
+
+    def mask(self, matrix: DishMatrix) -> int:
+        result = 0
+        for (name, level), column in matrix.licenses.items():
+            if name == self.name and level >= self.min_level:
+                result |= column
+        return result
+
+
+class OnPlanet(DishFilter):
+    def __init__(self, name: str):
+        self.name = name.lower()
+
+    def mask(self, matrix: DishMatrix) -> int:
+        return matrix.planets.get(self.name, 0)
+
+
+class OfCulinaryOrder(DishFilter):
+    def __init__(self, culinary_order: str):
+        self.culinary_order = culinary_order.lower()
+
+    def mask(self, matrix: DishMatrix) -> int:
+        return matrix.culinary_orders.get(self.culinary_order, 0)
+
+
+if __name__ == "__main__":
+    from hackathon.managers.neo4j_store_manager import load_entities
+
+    techniques, _, dishes = load_entities()
+    matrix = DishMatrix.from_entities(dishes, techniques)
+
+    # Contains A and B but not C
+    print(
+        matrix.evaluate(
+            HasIngredient("essenza di tachioni")
+            & HasIngredient("carne di mucca")
+            & ~HasIngredient("muffa lunare")
+        )
+    )
+    # Needs license G >= 2
+    print(matrix.evaluate(NeedsLicense("gravitazionale", 2)))
@@ -1,6 +1,82 @@
 import polars as pl
+from hackathon.session import SessionManager
 from hackathon.utils.settings.settings_provider import SettingsProvider
+from hackathon.utils.singleton import Singleton
 from langchain_core.tools import tool
+from bisect import bisect_right
+import threading
+
+
+class PlanetDistanceIndex(metaclass=Singleton):
+    """Singleton index of the distances between planets, loaded once from the
+    distance CSV. For every planet it keeps the list of all the planets, itself
+    included, sorted by distance, so radius queries are binary searches.
+    """
+
+    def __init__(self):
+        self._neighbours = None
+        self._lock = threading.Lock()
+        self.settings_provider = SettingsProvider()  # type: ignore
+
+    def _setup_index(self):
+        """Load the distance matrix and sort the neighbours of every planet.
+        Planet names are normalised to lowercase, as in the CSV headers.
+        """
+        df = pl.read_csv(self.settings_provider.get_distance_csv_path())
+        planets = [planet.lower() for planet in df["/"].to_list()]
+
+        neighbours = {}
+        for column in df.columns[1:]:
+            pairs = sorted(zip(df[column].to_list(), planets))
+            neighbours[column.lower()] = (
+                [distance for distance, _ in pairs],
+                [planet for _, planet in pairs],
+            )
+        self._neighbours = neighbours
+
+    @property
+    def neighbours(self) -> dict[str, tuple[list[float], list[str]]]:
+        with self._lock:
+            if self._neighbours is None:
+                self._setup_index()
+        return self._neighbours  # type: ignore
+
+    @property
+    def planets(self) -> list[str]:
+        return list(self.neighbours)
+
+    def _get_neighbours(self, planet_name: str) -> tuple[list[float], list[str]]:
+        try:
+            return self.neighbours[planet_name.strip().lower()]
+        except KeyError:
+            raise ValueError(
+                f"Unknown planet: {planet_name}. Available planets: {self.planets}"
+            )
+
+    def within(self, planet_name: str, distance: float) -> list[str]:
+        """Planets at a distance less or equal than `distance` from a planet, the
+        planet itself included, sorted by distance.
+        """
+        distances, planets = self._get_neighbours(planet_name)
+        return planets[: bisect_right(distances, distance)]
+
+    def within_any(self, planet_names: list[str], distance: float) -> list[str]:
+        """Planets at a distance less or equal than `distance` from at least one of
+        the planets, sorted by their distance from the closest of them.
+        """
+        closest: dict[str, float] = {}
+        for planet_name in planet_names:
+            distances, planets = self._get_neighbours(planet_name)
+            end = bisect_right(distances, distance)
+            for d, planet in zip(distances[:end], planets[:end]):
+                closest[planet] = min(d, closest.get(planet, d))
+        return sorted(closest, key=lambda planet: (closest[planet], planet))
+
+    def nearest(self, planet_name: str, k: int) -> list[str]:
+        """The `k` planets closest to a planet, the planet itself excluded."""
+        _, planets = self._get_neighbours(planet_name)
+        origin = planet_name.strip().lower()
+        return [planet for planet in planets if planet != origin][:k]
 
 
 @tool(name_or_callable="get_nearest_planets")
@@ -19,8 +95,45 @@ def get_nearest_planets(planet_name: str, distance: float) -> list[str]:
     i pianeti che sono a una distanza minore o uguale a 83 anni luce da Cybertron.
     Chiamata al tool: get_nearest_planets("Cybertron", 83)
     """
-    distance_file_path = SettingsProvider().get_distance_csv_path()
-    df = pl.read_csv(distance_file_path)
-    return pl.Series(
-        df.filter(pl.col(planet_name.lower()) <= distance).select(pl.col("/"))
-    ).to_list()
+    planet_name = SessionManager().entity_linker_manager.link(planet_name, "planets")
+    return PlanetDistanceIndex().within(planet_name, distance)
+
+
+@tool(name_or_callable="get_planets_near_any")
+def get_planets_near_any(planet_names: list[str], distance: float) -> list[str]:
+    """Restituisce i pianeti che sono a una distanza minore o uguale a quella specificata
+    da almeno uno dei pianeti indicati, questi ultimi inclusi.
+
+    Args:
+        - planet_names: I nomi dei pianeti di riferimento.
+        - distance: La distanza massima dai pianeti di riferimento.
+
+    Esempio:
+    Input: "Quali piatti sono serviti entro 100 anni luce da Namecc o da Krypton?"
+    Chain of thought: La richiesta dell'utente include due pianeti di riferimento e una distanza massima. Posso utilizzare
+    il tool get_planets_near_any per ottenere i pianeti entro 100 anni luce da almeno uno dei due.
+    Chiamata al tool: get_planets_near_any(["Namecc", "Krypton"], 100)
+    """
+    planet_names = SessionManager().entity_linker_manager.link_all(
+        planet_names, "planets"
+    )
+    return PlanetDistanceIndex().within_any(planet_names, distance)
+
+
+@tool(name_or_callable="get_k_nearest_planets")
+def get_k_nearest_planets(planet_name: str, k: int) -> list[str]:
+    """Restituisce i k pianeti più vicini al pianeta specificato, quest'ultimo escluso,
+    ordinati per distanza crescente.
+
+    Args:
+        - planet_name: Il nome del pianeta di riferimento.
+        - k: Il numero di pianeti da restituire.
+
+    Esempio:
+    Input: "Quali piatti sono preparati sui due pianeti più vicini a Tatooine?"
+    Chain of thought: La richiesta dell'utente riguarda i due pianeti più vicini a Tatooine. Posso utilizzare il tool
+    get_k_nearest_planets per ottenerli.
+    Chiamata al tool: get_k_nearest_planets("Tatooine", 2)
+    """
+    planet_name = SessionManager().entity_linker_manager.link(planet_name, "planets")
+    return PlanetDistanceIndex().nearest(planet_name, k)
@@ -0,0 +1,161 @@
+import json
+import logging
+import os
+import threading
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from hackathon.graph.tools.cypher_guard import COMMENTS, LITERALS
+from hackathon.session import SessionManager
+from hackathon.utils.settings.settings_provider import SettingsProvider
+from hackathon.utils.singleton import Singleton
+from hackathon.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+def canonical_query(query: str) -> str:
+    """Query text without comments and with the whitespace outside of the literals
+    collapsed, so reformatted queries share the same cache entry.
+    """
+    query = COMMENTS.sub(" ", query)
+    parts, end = [], 0
+    for literal in LITERALS.finditer(query):
+        parts.append(" ".join(query[end : literal.start()].split()))
+        parts.append(literal.group(0))
+        end = literal.end()
+    parts.append(" ".join(query[end:].split()))
+    return " ".join(part for part in parts if part)
+
+
+class QueryCache(metaclass=Singleton):
+    """Singleton cache of the results of the read queries of the tools.
+
+    Entries are keyed by the canonical query text and the parameters serialised
+    with sorted keys, and tagged with the graph version kept by Neo4jStoreManager,
+    the epoch of the database and its write counter: an entry written at another
+    version is a miss. The cache is bounded, its entries expire after a time to
+    live, and it is persisted to disk so the results are reused across runs while
+    the graph does not change.
+
+    Lookups use the version read by the process. It is read again on every miss,
+    before the query runs, so the writes of another process invalidate the
+    entries of a long-running one from its next miss on.
+    """
+
+    def __init__(self):
+        self._cache = None
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        self.settings_provider = SettingsProvider()  # type: ignore
+
+    def _setup_cache(self):
+        """Load the cache from disk."""
+        self._cache = TTLCache(
+            max_size=self.settings_provider.get_query_cache_max_size(),
+            ttl=self.settings_provider.get_query_cache_ttl(),
+        )
+        path = self.settings_provider.get_query_cache_path()
+        if not os.path.exists(path):
+            return
+        with open(path) as file:
+            for key, expires_at, value in json.load(file):
+                self._cache.put(key, value, expires_at=expires_at)
+        logger.info(f"Loaded {len(self._cache)} cached query results from {path}")
+
+    @property
+    def cache(self) -> TTLCache:
+        with self._lock:
+            if self._cache is None:
+                self._setup_cache()
+        return self._cache  # type: ignore
+
+    def _key(self, query: str, params: dict) -> str:
+        return json.dumps([canonical_query(query), params], sort_keys=True)
+
+    def _get(self, key: str, version: str | None) -> list[dict[str, Any]] | None:
+        entry = self.cache.get(key)
+        if entry is not None and version is not None and entry["version"] == version:
+            self._hits += 1
+            return entry["rows"]
+        self._misses += 1
+        return None
+
+    def _put(self, key: str, version: str | None, rows: list[dict[str, Any]]) -> None:
+        # A graph without a version cannot tell stale entries apart
+        if version is not None:
+            self.cache.put(key, {"version": version, "rows": rows})
+
+    def query(
+        self,
+        query: str,
+        params: dict | None = None,
+        run: Callable[[str, dict], list[dict[str, Any]]] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Get the result of a query from the cache, running it on a miss.
+
+        Args:
+            - query: The Cypher query.
+            - params: The parameters of the query.
+            - run: Function running the query, `neo4j_manager.read` by default.
+
+        Returns:
+            - The rows of the result.
+        """
+        params = params or {}
+        neo4j_manager = SessionManager().neo4j_manager
+        run = run or neo4j_manager.read
+        if not self.settings_provider.query_cache_enabled():
+            return run(query, params)
+
+        key, version = self._key(query, params), neo4j_manager.graph_version
+        rows = self._get(key, version)
+        if rows is None:
+            version = neo4j_manager.refresh_graph_version()
+            rows = run(query, params)
+            self._put(key, version, rows)
+        return rows
+
+    async def aquery(
+        self,
+        query: str,
+        params: dict | None = None,
+        run: Callable[[str, dict], Awaitable[list[dict[str, Any]]]] | None = None,
+    ) -> list[dict[str, Any]]:
+        """Async version of `query`, running the query with `neo4j_manager.aread`
+        by default.
+        """
+        params = params or {}
+        neo4j_manager = SessionManager().neo4j_manager
+        run = run or neo4j_manager.aread
+        if not self.settings_provider.query_cache_enabled():
+            return await run(query, params)
+
+        key, version = self._key(query, params), neo4j_manager.graph_version
+        rows = self._get(key, version)
+        if rows is None:
+            version = await neo4j_manager.arefresh_graph_version()
+            rows = await run(query, params)
+            self._put(key, version, rows)
+        return rows
+
+    def get_stats(self) -> dict[str, float]:
+        """Number of hits and misses of the cache, and its hit rate."""
+        lookups = self._hits + self._misses
+        return {
+            "lookups": lookups,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+        }
+
+    def save(self) -> None:
+        """Persist the cache to disk, dropping the expired entries."""
+        if self._cache is None:
+            return
+        path = self.settings_provider.get_query_cache_path()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump([list(entry) for entry in self._cache.items()], file)
+        os.replace(tmp_path, path)
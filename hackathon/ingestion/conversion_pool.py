@@ -0,0 +1,142 @@
+import asyncio
+import importlib.metadata
+import logging
+import multiprocessing
+import os
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, as_completed
+from typing import ClassVar, Protocol, Self
+
+from langchain_core.documents import Document
+
+from hackathon.managers.extraction_cache_manager import (
+    ExtractionCacheManager,
+    hash_content,
+    hash_file,
+)
+from hackathon.utils.settings.settings_provider import SettingsProvider
+
+logger = logging.getLogger(__name__)
+
+
+class Ingestor(Protocol):
+    """An ingestor converts a document to markdown, the CPU bound step run in
+    the pool, and splits the markdown into chunks in the calling process.
+    `to_markdown` must be a static method, so it can be sent to the workers.
+    """
+
+    # Distribution converting the documents, its version is part of the key of
+    # the cached markdown
+    CONVERTER: ClassVar[str]
+
+    @staticmethod
+    def to_markdown(file_path: str) -> str: ...
+
+    def split(self, md_text: str, file_path: str) -> list[Document]: ...
+
+
+class ConversionPool:
+    """Front-end of the ingestors converting the documents in a pool of processes.
+
+    The conversion of PDF and DOCX files to markdown is CPU bound, so the
+    documents are converted in parallel in worker processes. The chunks of each
+    document are returned as soon as it is converted, so the extraction of the
+    first documents can start while the others are still converting. The
+    markdown is cached by the bytes of the document and the version of the
+    converter, only the documents that changed are converted again. Use it as a
+    context manager, the workers are stopped on exit.
+    """
+
+    def __init__(self, max_workers: int | None = None):
+        self.max_workers = max_workers or SettingsProvider().get_ingestion_max_workers()
+        self._executor: Executor | None = None
+        self.extraction_cache_manager = ExtractionCacheManager()
+
+    def __enter__(self) -> Self:
+        # Workers are spawned, forking a process with running threads can deadlock
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            raise RuntimeError("ConversionPool must be used as a context manager")
+        return self._executor
+
+    def _submit(
+        self, ingestor: Ingestor, file_paths: list[str]
+    ) -> tuple[list[tuple[str, str]], dict[Future, tuple[str, str]]]:
+        """Look the markdown of the documents up in the cache and submit the
+        conversion of the others to the pool.
+
+        Returns:
+            - The path and the markdown of the cached documents, and the path and
+            the cache key of the documents being converted, by future.
+        """
+        converter = (
+            f"{ingestor.CONVERTER}=={importlib.metadata.version(ingestor.CONVERTER)}"
+        )
+        cached, futures = [], {}
+        for file_path in file_paths:
+            key = hash_content({"file": hash_file(file_path), "converter": converter})
+            md_text = self.extraction_cache_manager.get_markdown(key)
+            if md_text is None:
+                future = self.executor.submit(ingestor.to_markdown, file_path)
+                futures[future] = (file_path, key)
+            else:
+                cached.append((file_path, md_text))
+        return cached, futures
+
+    def _converted(
+        self, ingestor: Ingestor, file_path: str, key: str, md_text: str
+    ) -> list[Document]:
+        logger.info(f"Converted {os.path.basename(file_path)}")
+        self.extraction_cache_manager.put_markdown(key, md_text)
+        return ingestor.split(md_text, file_path)
+
+    def ingest(
+        self, ingestor: Ingestor, file_paths: list[str]
+    ) -> Iterator[tuple[str, list[Document]]]:
+        """Convert documents in parallel and split them into chunks.
+
+        Args:
+            - ingestor: The ingestor of the documents.
+            - file_paths: The paths of the documents.
+
+        Returns:
+            - The path and the chunks of each document, the cached documents
+            first, then the others in order of completion.
+        """
+        cached, futures = self._submit(ingestor, file_paths)
+        for file_path, md_text in cached:
+            yield file_path, ingestor.split(md_text, file_path)
+        for future in as_completed(futures):
+            file_path, key = futures[future]
+            yield file_path, self._converted(ingestor, file_path, key, future.result())
+
+    async def aingest(
+        self, ingestor: Ingestor, file_paths: list[str]
+    ) -> AsyncIterator[tuple[str, list[Document]]]:
+        """Async version of `ingest`, waiting for the conversions without blocking
+        the event loop.
+        """
+        cached, futures = self._submit(ingestor, file_paths)
+        for file_path, md_text in cached:
+            yield file_path, ingestor.split(md_text, file_path)
+        pending = {asyncio.wrap_future(future): futures[future] for future in futures}
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for future in done:
+                file_path, key = pending.pop(future)
+                yield (
+                    file_path,
+                    self._converted(ingestor, file_path, key, future.result()),
+                )
@@ -1,5 +1,7 @@
 import os
+from collections.abc import Iterator
 from langchain_core.documents import Document
+from hackathon.ingestion.conversion_pool import ConversionPool
 import re
 from langchain_core.prompts import PromptTemplate
 from hackathon.managers.model_manager import ModelManager
@@ -18,24 +20,38 @@ class GalacticCodeIngestor:
     Ingests documents from Codice Galattico.
     """
 
+    CONVERTER = "markitdown"
+
     def __init__(self):
         split_prompt_template = "Given this markdown document, provide a list of headers of the document to split the document on, keep only level 1 header (e.g. 1 Definizioni, 2 Sostanze regolamentate), include eventual appendix. \nDocument:\n\n{document}\n\n"
         split_prompt = PromptTemplate.from_template(split_prompt_template)
         llm = ModelManager().model
         structured_llm = llm.with_structured_output(SplitHeaders)
         self.split_chain = split_prompt | structured_llm
-        self.markitdown = MarkItDown()
 
     def ingest(self, file_path: str) -> list[Document]:
         """
         Ingests a document from a file path.
         """
+        return self.split(self.to_markdown(file_path), file_path)
+
+    def ingest_all(self, file_paths: list[str]) -> Iterator[tuple[str, list[Document]]]:
+        """Ingest documents converted in parallel, see `ConversionPool.ingest`."""
+        with ConversionPool() as pool:
+            yield from pool.ingest(self, file_paths)
+
+    @staticmethod
+    def to_markdown(file_path: str) -> str:
+        """Convert the document to markdown. CPU bound, run in a process pool by
+        ConversionPool.
+        """
+        return MarkItDown().convert(file_path).text_content
+
+    def split(self, md_text: str, file_path: str) -> list[Document]:
+        """Split the markdown on the level 1 headers found by the LLM."""
         # Obtain file name from path
         file_name = os.path.basename(file_path)
 
-        result = self.markitdown.convert(file_path)
-        md_text = result.text_content
-
         split_headers = self.split_chain.invoke({"document": md_text})
 
         split_text = self._split_markdown_by_headers(md_text, split_headers.headers)
@@ -1,7 +1,9 @@
 import os
+from collections.abc import Iterator
 from langchain_text_splitters import MarkdownHeaderTextSplitter
 import pymupdf4llm
 from langchain_core.documents import Document
+from hackathon.ingestion.conversion_pool import ConversionPool
 
 
 class MenuIngestor:
@@ -9,15 +11,31 @@ class MenuIngestor:
     Ingests documents from menu folder.
     """
 
+    CONVERTER = "pymupdf4llm"
+
     def __init__(self):
         headers_to_split_on = [("#", "header_1"), ("##", "header_2")]
         self.markdown_splitter = MarkdownHeaderTextSplitter(headers_to_split_on)
 
     def ingest(self, file_path: str) -> list[Document]:
+        return self.split(self.to_markdown(file_path), file_path)
+
+    def ingest_all(self, file_paths: list[str]) -> Iterator[tuple[str, list[Document]]]:
+        """Ingest documents converted in parallel, see `ConversionPool.ingest`."""
+        with ConversionPool() as pool:
+            yield from pool.ingest(self, file_paths)
+
+    @staticmethod
+    def to_markdown(file_path: str) -> str:
+        """Convert the document to markdown. CPU bound, run in a process pool by
+        ConversionPool.
+        """
+        return pymupdf4llm.to_markdown(file_path)
+
+    def split(self, md_text: str, file_path: str) -> list[Document]:
         # Obtain file name from path
         file_name = os.path.basename(file_path)
 
-        md_text = pymupdf4llm.to_markdown(file_path)
         split_docs = self.markdown_splitter.split_text(md_text)
 
         # Add filename to metadata
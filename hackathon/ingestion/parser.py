@@ -1,24 +1,175 @@
+from hackathon.ingestion.conversion_pool import ConversionPool
 from hackathon.ingestion.menu import MenuIngestor
 from hackathon.utils.settings.settings_provider import SettingsProvider
+from langchain_core.documents import Document
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel
 from tqdm import tqdm
+from typing import Any
+import asyncio
+import logging
+import random
 import time
 import os
 from hackathon.utils.file_utils import load_json
 
 from hackathon.graph.chains.extract_entities import (
-    chef_extraction_chain,
-    dish_extraction_chain,
+    chef_extraction_prompt,
+    dish_extraction_prompt,
+    get_chef_extraction_chain,
+    get_dish_extraction_chain,
 )
+from hackathon.managers.extraction_cache_manager import (
+    ExtractionCacheManager,
+    hash_content,
+)
+from hackathon.managers.model_manager import ModelManager
 
 from hackathon.models import Chef, Dish
 from hackathon.utils.file_utils import save_json
 
+logger = logging.getLogger(__name__)
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """Whether a request failed because the provider rate limited it (HTTP 429).
+    The clients of the providers raise different exceptions, so the status code
+    and the message are checked.
+    """
+    for attribute in ("status_code", "code"):
+        if getattr(error, attribute, None) == 429:
+            return True
+    message = str(error).lower()
+    return (
+        "429" in message
+        or "rate limit" in message
+        or "resource exhausted" in message
+        or "resource_exhausted" in message
+    )
+
 
 class Parser:
     def __init__(self):
         self.settings_provider = SettingsProvider()
+        self._semaphore = None
+        self._progress = None
+        self._cached_chunks = 0
+        self.extraction_cache_manager = ExtractionCacheManager()
+
+    async def _ainvoke(self, chain: Runnable, inputs: dict):
+        """Invoke an extraction chain, retrying the rate limited requests with an
+        exponential backoff. The provider's token bucket paces the requests, the
+        backoff only handles the 429s it did not prevent.
+
+        Args:
+            - chain: The extraction chain.
+            - inputs: The inputs of the chain.
+
+        Returns:
+            - The extracted entity.
+        """
+        max_retries = self.settings_provider.get_extraction_max_retries()
+        backoff = self.settings_provider.get_extraction_backoff_seconds()
+        for attempt in range(max_retries + 1):
+            try:
+                async with self._semaphore:  # type: ignore
+                    return await chain.ainvoke(inputs)
+            except Exception as error:
+                if attempt == max_retries or not _is_rate_limited(error):
+                    raise
+                # Jitter spreads the retries of the requests limited together
+                wait = backoff * 2**attempt * random.uniform(0.5, 1.5)
+                logger.warning(
+                    f"Rate limited, retry {attempt + 1}/{max_retries} in {wait:.1f}s"
+                )
+                await asyncio.sleep(wait)
+
+    async def _aextract(
+        self,
+        prompt: ChatPromptTemplate,
+        chain: Runnable,
+        entity_type: type[BaseModel],
+        inputs: dict,
+    ) -> Any:
+        """Extract an entity, reusing the one extracted by an identical request.
+
+        Args:
+            - prompt: The prompt of the chain, rendered into the cache key.
+            - chain: The extraction chain.
+            - entity_type: The type of the extracted entity.
+            - inputs: The inputs of the chain.
+
+        Returns:
+            - The extracted entity.
+        """
+        key = hash_content(
+            {
+                "prompt": prompt.format(**inputs),
+                "schema": entity_type.model_json_schema(),
+                "model": ModelManager().model_id,
+            }
+        )
+        cached = self.extraction_cache_manager.get_entity(key)
+        if cached is not None:
+            self._cached_chunks += 1
+            return entity_type.model_validate(cached)
+
+        entity = await self._ainvoke(chain, inputs)
+        self.extraction_cache_manager.put_entity(key, entity.model_dump(mode="json"))
+        return entity
+
+    async def _aparse_file(
+        self,
+        menu: str,
+        menu_splits: list[Document],
+        techniques: list[str],
+    ) -> tuple[Chef, list[Dish]]:
+        """Extract the chef and the dishes of a menu. The dishes are extracted
+        concurrently, their order is the order of the chunks.
+        """
+        self._progress.total += len(menu_splits)  # type: ignore
+        self._progress.refresh()  # type: ignore
+
+        # Take the first chunk as the header
+        header = menu_splits[0]
+
+        # call llm to extract chef information
+        chef: Chef = await self._aextract(
+            chef_extraction_prompt,
+            get_chef_extraction_chain(),
+            Chef,
+            {"document": header},
+        )
+        self._progress.update()  # type: ignore
 
-    def _parse_menu(self) -> None:
+        chef.restaurant = menu.split(".")[0].lower()
+        chef.document = header.page_content
+
+        async def extract_dish(chunk: Document) -> Dish:
+            dish: Dish = await self._aextract(
+                dish_extraction_prompt,
+                get_dish_extraction_chain(),
+                Dish,
+                {
+                    "document": chunk,
+                    "techniques": techniques,
+                },
+            )
+            self._progress.update()  # type: ignore
+            dish.restaurant = chef.restaurant
+            dish.chef_name = chef.name
+            dish.planet_name = chef.planet_name
+            dish.document = chunk.page_content
+            return dish
+
+        # parse each dish in the menu
+        dishes = await asyncio.gather(
+            *(extract_dish(chunk) for chunk in menu_splits[1:])
+        )
+        return chef, list(dishes)
+
+    async def _aparse_menu(self) -> None:
         menu_path = self.settings_provider.get_menu_path()
 
         if not os.path.exists(menu_path):
@@ -34,51 +185,59 @@ class Parser:
         # Define the menu ingestor
         menu_ingestor = MenuIngestor()
 
-        chefs = []
-        dishes = []
-
-        techniques_mapping = load_json(
-            self.settings_provider.get_techniques_json_path()
-        )
-        techniques = list(techniques_mapping.keys())
-        # Scan the menu files
-        for menu in tqdm(menu_file_names, desc="Parsing menu document to markdown"):
-            # Load all chunks of the given menu
-            menu_splits = menu_ingestor.ingest(os.path.join(menu_path, menu))
-
-            # Take the first chunk as the header
-            header = menu_splits[0]
-
-            # call llm to extract chef information
-
-            chef: Chef = chef_extraction_chain.invoke(
-                {
-                    "document": header,
-                }
+        techniques = [
+            technique["name"]
+            for technique in load_json(
+                self.settings_provider.get_techniques_json_path()
             )
+        ]
 
-            chef.restaurant = menu.split(".")[0].lower()
-            chef.document = header.page_content
-            chefs.append(chef)
-
-            # parse each dish in the menu
-            for chunk in menu_splits[1:]:
-                dish: Dish = dish_extraction_chain.invoke(
-                    {
-                        "document": chunk,
-                        "techniques": techniques,
-                    }
+        # Bounds the requests in flight across all the menus
+        self._semaphore = asyncio.Semaphore(
+            self.settings_provider.get_extraction_max_concurrency()
+        )
+        self._cached_chunks = 0
+
+        # The total grows as the menus are converted into chunks
+        start = time.perf_counter()
+        menu_file_paths = [os.path.join(menu_path, menu) for menu in menu_file_names]
+        with (
+            ConversionPool() as pool,
+            tqdm(total=0, desc="Extracting menu chunks", unit="chunk") as progress,
+        ):
+            self._progress = progress
+            # The menus converted first are extracted while the others are still
+            # converting
+            tasks = {}
+            async for file_path, menu_splits in pool.aingest(
+                menu_ingestor, menu_file_paths
+            ):
+                tasks[file_path] = asyncio.create_task(
+                    self._aparse_file(
+                        os.path.basename(file_path), menu_splits, techniques
+                    )
                 )
-                dish.restaurant = chef.restaurant
-                dish.chef_name = chef.name
-                dish.planet_name = chef.planet_name
-                dish.document = chunk.page_content
-                dishes.append(dish)
-                time.sleep(3)
+            results = [await tasks[file_path] for file_path in menu_file_paths]
+        elapsed = time.perf_counter() - start
+
+        chefs = [chef for chef, _ in results]
+        dishes = [dish for _, menu_dishes in results for dish in menu_dishes]
+        n_chunks = len(chefs) + len(dishes)
+        logger.info(
+            f"Extracted {n_chunks} chunks from {len(menu_file_names)} menus in "
+            f"{elapsed:.1f}s ({n_chunks / elapsed:.2f} chunks/s), "
+            f"{self._cached_chunks} from the cache"
+        )
 
         save_json(chefs, self.settings_provider.get_chefs_json_path())
         save_json(dishes, self.settings_provider.get_dishes_json_path())
 
+    def _parse_menu(self) -> None:
+        """Extract the chefs and the dishes of all the menus, processed in parallel,
+        and save them to the JSON files.
+        """
+        asyncio.run(self._aparse_menu())
+
 
 def main():
     parser = Parser()
@@ -1,18 +1,24 @@
 from hackathon.graph.state import GraphState
 from pprint import pprint
+import argparse
+import asyncio
 import polars as pl
-from hackathon.graph.graph import app
+import time
+from hackathon.graph.graph import compile_app, get_app, open_checkpointer
+from hackathon.graph.tools.query_cache import QueryCache
+from langgraph.graph.state import CompiledStateGraph
 from hackathon.session import SessionManager
+from hackathon.utils.settings.settings_provider import SettingsProvider
 from langchain_core.messages import HumanMessage, SystemMessage
-from hackathon.graph.nodes.cypher_agent import system_message_content
+from hackathon.graph.nodes.cypher_agent import get_system_message_content
 from tqdm import tqdm
 from hackathon.models import CSVEntry
 
 
-def run(question: str, question_id: int):
-    inputs = {
+def _build_inputs(question: str, question_id: int) -> dict:
+    return {
         "messages": [
-            SystemMessage(content=system_message_content),
+            SystemMessage(content=get_system_message_content()),
             HumanMessage(
                 content=question,
             ),
@@ -20,27 +26,176 @@ def run(question: str, question_id: int):
         "question_id": question_id,
         "question": question,
     }
+
+
+def _add_fallback_entry(question_id: int) -> None:
+    """Record the fallback answer for a question the agent could not answer."""
+    result = SessionManager().answer_mapping_manager.get_fallback(question_id)
+    entry = CSVEntry(question_id=question_id, result=result)
+    SessionManager().dataset_manager.add_entry(entry)
+
+
+def _add_cached_entry(question: str, question_id: int) -> bool:
+    """Record the cached answer of a question, if there is one. The exact cache
+    is looked up first, then the semantic one.
+
+    Returns:
+        - True if the answer was found in one of the caches.
+    """
+    dish_ids = SessionManager().answer_cache_manager.get(question)
+    if dish_ids is None:
+        dish_ids = SessionManager().semantic_cache_manager.get(question)
+    if dish_ids is None:
+        return False
+    entry = CSVEntry(question_id=question_id, result=",".join(dish_ids))
+    SessionManager().dataset_manager.add_entry(entry)
+    return True
+
+
+def _cache_answer(question: str, dish_ids: list[str]) -> None:
+    SessionManager().answer_cache_manager.put(question, dish_ids)
+    SessionManager().semantic_cache_manager.put(question, dish_ids)
+
+
+def _save_caches() -> None:
+    SessionManager().answer_cache_manager.save()
+    SessionManager().semantic_cache_manager.save()
+    QueryCache().save()
+
+    stats = QueryCache().get_stats()
+    if stats["lookups"]:
+        print(
+            f"Query cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({stats['hit_rate']:.1%})"
+        )
+
+    stats = SessionManager().semantic_cache_manager.get_stats()
+    if stats["lookups"]:
+        print(
+            f"Semantic cache: {stats['hits']}/{stats['lookups']} hits "
+            f"({stats['hit_rate']:.1%}), {stats['mean_lookup_seconds']:.3f}s per "
+            f"lookup, ~{stats['saved_seconds']:.0f}s of agent time saved"
+        )
+
+
+def run(question: str, question_id: int):
+    if _add_cached_entry(question, question_id):
+        pprint(f"Answered from cache: {question_id}")
+        return
+
+    inputs = _build_inputs(question, question_id)
     config = {"configurable": {"thread_id": question_id}}
 
+    app = get_app()
     for output in app.stream(inputs, config=config):
         for key, value in output.items():
             pprint(f"Finished running: {key}:")
 
     res = GraphState.model_validate(app.get_state(config).values)
+    _cache_answer(question, res.dish_ids)
 
 
-if __name__ == "__main__":
-    for i, question in tqdm(
-        enumerate(pl.read_csv("competition_data/domande.csv")["domanda"].to_list())
-    ):
-        dataset_manager = SessionManager().dataset_manager
+async def arun(
+    app: CompiledStateGraph,
+    question: str,
+    question_id: int,
+    semaphore: asyncio.Semaphore,
+) -> None:
+    """Run a single question through the async API of the graph, unless its
+    answer is already cached.
+
+    Args:
+        - app: The compiled graph.
+        - question: The question of the user.
+        - question_id: The row_id of the question, also used as thread_id.
+        - semaphore: Semaphore bounding the number of questions in flight.
+    """
+    inputs = _build_inputs(question, question_id)
+    config = {"configurable": {"thread_id": str(question_id)}}
 
+    # Embedding the question for the semantic cache is CPU bound
+    if await asyncio.to_thread(_add_cached_entry, question, question_id):
+        return
+
+    async with semaphore:
         try:
-            run(question, i + 1)
+            start = time.perf_counter()
+            snapshot = await app.aget_state(config)
+            if snapshot.next:
+                # Interrupted by a previous run, continue from the last checkpoint
+                state = await app.ainvoke(None, config=config)
+            else:
+                if snapshot.values:
+                    # Finished by a previous run but not recorded, start over
+                    await app.checkpointer.adelete_thread(str(question_id))
+                state = await app.ainvoke(inputs, config=config)
+            SessionManager().semantic_cache_manager.record_agent_run(
+                time.perf_counter() - start
+            )
+            await asyncio.to_thread(_cache_answer, question, state.get("dish_ids", []))
         except Exception:
-            print(f"Error on question {i + 1}: {question}")
-            result = pl.read_csv("data/fallback_dataset.csv").row(i)[-1]
-            entry = CSVEntry(question_id=i + 1, result=result)
-            dataset_manager.add_entry(entry)
+            print(f"Error on question {question_id}: {question}")
+            _add_fallback_entry(question_id)
+
+        if SettingsProvider().prune_finished_threads():
+            # The answer is recorded, the checkpoints are no longer needed
+            await app.checkpointer.adelete_thread(str(question_id))
+
+
+async def run_batch(
+    questions: list[str], max_concurrency: int, resume: bool = False
+) -> None:
+    """Run all the questions concurrently, with at most `max_concurrency` in flight.
+
+    Entries are recorded as soon as each question completes and journaled by the
+    DatasetManager; the dataset is saved once, sorted by row_id, so the output order
+    does not depend on completion order.
+
+    Args:
+        - questions: The questions to answer, the row_id is the 1-based position.
+        - max_concurrency: Maximum number of questions processed at the same time.
+        - resume: Skip the questions already in the dataset.
+    """
+    dataset_manager = SessionManager().dataset_manager
+    answered = dataset_manager.row_ids if resume else set()
+    if answered:
+        print(f"Resuming: skipping {len(answered)} questions already answered")
+
+    async with open_checkpointer() as checkpointer:
+        batch_app = compile_app(checkpointer)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        tasks = [
+            arun(batch_app, question, i + 1, semaphore)
+            for i, question in enumerate(questions)
+            if i + 1 not in answered
+        ]
+
+        try:
+            for task in tqdm(asyncio.as_completed(tasks), total=len(tasks)):
+                await task
+        finally:
+            await SessionManager().aclose()
+
+    dataset_manager.save()
+    _save_caches()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Answer the competition questions.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=SettingsProvider().get_max_concurrency(),
+        help="Maximum number of questions processed concurrently.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Skip the questions already present in the dataset output.",
+    )
+    args = parser.parse_args()
 
-        dataset_manager.save()
+    questions = pl.read_csv("competition_data/domande.csv")["domanda"].to_list()
+    asyncio.run(
+        run_batch(questions, max_concurrency=args.concurrency, resume=args.resume)
+    )
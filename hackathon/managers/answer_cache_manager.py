@@ -0,0 +1,129 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+from hackathon.enums import GraphBackend
+from hackathon.graph.prompts import CYPHER_QUERY_GENERATION_PROMPT
+from hackathon.managers.catalogue_manager import CatalogueManager
+from hackathon.managers.model_manager import ModelManager
+from hackathon.utils.settings.settings_provider import SettingsProvider
+from hackathon.utils.singleton import Singleton
+from hackathon.utils.text_utils import normalize_text
+from hackathon.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+PROMPT_HASH = hashlib.sha256(CYPHER_QUERY_GENERATION_PROMPT.encode()).hexdigest()
+
+
+def get_answers_version() -> str | None:
+    """Version of the answers of the agent: the data hash of the graph, the model
+    and the prompt of the agent. None if the graph has no data hash.
+    """
+    if SettingsProvider().get_graph_backend() == GraphBackend.MEMORY:
+        data_hash = CatalogueManager().data_version
+    else:
+        # Imported here, the session imports the cache managers
+        from hackathon.session import SessionManager
+
+        data_hash = SessionManager().neo4j_manager.data_hash
+    if data_hash is None:
+        return None
+    return f"{data_hash}:{ModelManager().model_id}:{PROMPT_HASH}"
+
+
+class AnswerCacheManager(metaclass=Singleton):
+    """Singleton cache of the answers of the agent, keyed by the normalised question.
+
+    Questions differing only in casing, accents, punctuation or whitespace share the
+    same entry. The cache is persisted to disk together with the version of the
+    answers: the data hash of the graph, the model and the prompt of the agent. It
+    is emptied when any of them changes, and disabled while the graph has no data
+    hash, i.e. was never loaded.
+    """
+
+    def __init__(self):
+        self._cache = None
+        self._version = None
+        self._lock = threading.Lock()
+        self.settings_provider = SettingsProvider()  # type: ignore
+
+    def _setup_cache(self, version: str | None):
+        """Load the cache from disk, discarding it if the version changed."""
+        self._cache = TTLCache(
+            max_size=self.settings_provider.get_answer_cache_max_size(),
+            ttl=self.settings_provider.get_answer_cache_ttl(),
+        )
+        self._version = version
+
+        path = self.settings_provider.get_answer_cache_path()
+        if not os.path.exists(path):
+            return
+        with open(path) as file:
+            content = json.load(file)
+        if version is None or content.get("version") != version:
+            logger.info("Graph data, model or prompt changed, discarding answer cache")
+            return
+        for key, expires_at, dish_ids in content["entries"]:
+            self._cache.put(key, dish_ids, expires_at=expires_at)
+        logger.info(f"Loaded {len(self._cache)} cached answers from {path}")
+
+    @property
+    def cache(self) -> TTLCache:
+        version = get_answers_version()
+        with self._lock:
+            if self._cache is None:
+                self._setup_cache(version)
+            elif self._version != version:
+                logger.info(
+                    "Graph data, model or prompt changed, clearing answer cache"
+                )
+                self._cache.clear()
+                self._version = version
+        return self._cache  # type: ignore
+
+    def get(self, question: str) -> list[str] | None:
+        """Get the cached answer of a question.
+
+        Args:
+            - question: The question of the user.
+
+        Returns:
+            - The dish ids of the answer, None on a miss.
+        """
+        if not self.settings_provider.answer_cache_enabled():
+            return None
+        cache = self.cache
+        if self._version is None:
+            return None
+        return cache.get(normalize_text(question))
+
+    def put(self, question: str, dish_ids: list[str]) -> None:
+        """Cache the answer of a question.
+
+        Args:
+            - question: The question of the user.
+            - dish_ids: The dish ids of the answer.
+        """
+        if not self.settings_provider.answer_cache_enabled() or not dish_ids:
+            return
+        cache = self.cache
+        if self._version is None:
+            return
+        cache.put(normalize_text(question), list(dish_ids))
+
+    def save(self) -> None:
+        """Persist the cache to disk, dropping the expired entries."""
+        if self._cache is None or self._version is None:
+            return
+        content = {
+            "version": self._version,
+            "entries": [list(entry) for entry in self._cache.items()],
+        }
+        path = self.settings_provider.get_answer_cache_path()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(content, file)
+        os.replace(tmp_path, path)
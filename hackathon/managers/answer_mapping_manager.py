@@ -0,0 +1,103 @@
+import json
+import logging
+import threading
+
+import polars as pl
+
+from hackathon.utils.settings.settings_provider import SettingsProvider
+from hackathon.utils.singleton import Singleton
+from hackathon.utils.text_utils import closest_match, normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerMappingManager(metaclass=Singleton):
+    """Singleton class mapping the answers of the agent to the submission format.
+    The dish mapping and the fallback answers are loaded once and kept in memory.
+    """
+
+    def __init__(self):
+        self._dish_mapping = None
+        self._normalized_mapping = None
+        self._fuzzy_matches: dict[str, str | None] = {}
+        self._fallbacks = None
+        self._lock = threading.Lock()
+        self.settings_provider = SettingsProvider()  # type: ignore
+
+    def _setup_dish_mapping(self):
+        """Load the dish name to id mapping, also indexed by normalised name."""
+        with open(self.settings_provider.get_dish_mapping_path()) as file:
+            dish_mapping = json.load(file)
+        self._normalized_mapping = {
+            normalize_text(name): dish_id for name, dish_id in dish_mapping.items()
+        }
+        self._dish_mapping = dish_mapping
+
+    def _setup_fallbacks(self):
+        """Load the fallback answers, indexed by row_id."""
+        df = pl.read_csv(self.settings_provider.get_fallback_dataset_path())
+        self._fallbacks = {
+            row_id: str(result)
+            for row_id, result in zip(df["row_id"].to_list(), df["result"].to_list())
+        }
+
+    @property
+    def dish_mapping(self) -> dict[str, int]:
+        with self._lock:
+            if self._dish_mapping is None:
+                self._setup_dish_mapping()
+        return self._dish_mapping  # type: ignore
+
+    @property
+    def fallbacks(self) -> dict[int, str]:
+        with self._lock:
+            if self._fallbacks is None:
+                self._setup_fallbacks()
+        return self._fallbacks  # type: ignore
+
+    def get_dish_id(self, dish_name: str) -> int | None:
+        """Get the id of a dish. The name is matched exactly first, then after
+        normalisation, and finally with a fuzzy match against the normalised names,
+        rejected if another dish is almost as close.
+
+        Args:
+            - dish_name: The name of the dish.
+
+        Returns:
+            - The id of the dish, None if no dish matches.
+        """
+        dish_mapping = self.dish_mapping
+        dish_id = dish_mapping.get(dish_name.lower())
+        if dish_id is not None:
+            return dish_id
+
+        normalized_name = normalize_text(dish_name)
+        dish_id = self._normalized_mapping.get(normalized_name)  # type: ignore
+        if dish_id is not None:
+            return dish_id
+
+        if normalized_name not in self._fuzzy_matches:
+            # Some dishes differ by a single word, an ambiguous name is not matched
+            match = closest_match(
+                normalized_name,
+                list(self._normalized_mapping),  # type: ignore
+                cutoff=self.settings_provider.get_dish_match_cutoff(),
+                margin=self.settings_provider.get_dish_match_margin(),
+            )
+            self._fuzzy_matches[normalized_name] = match
+            if match:
+                logger.info(f"Matched dish '{dish_name}' to '{match}'")
+
+        match = self._fuzzy_matches[normalized_name]
+        return self._normalized_mapping[match] if match else None  # type: ignore
+
+    def get_fallback(self, question_id: int) -> str:
+        """Get the fallback answer of a question.
+
+        Args:
+            - question_id: The row_id of the question.
+
+        Returns:
+            - The fallback result, a list of dish ids separated by a comma.
+        """
+        return self.fallbacks[question_id]
@@ -0,0 +1,121 @@
+import hashlib
+import logging
+import os
+import threading
+
+from hackathon.utils.file_utils import load_json
+from hackathon.utils.settings.settings_provider import SettingsProvider
+from hackathon.utils.singleton import Singleton
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogueManager(metaclass=Singleton):
+    """Singleton cache of the entity JSON files and of the vocabularies derived from
+    them. A file is parsed again only when its modification time changes, and the
+    vocabularies are rebuilt only when one of the files has been parsed again.
+    """
+
+    def __init__(self):
+        self._files: dict[str, tuple[int, list]] = {}
+        self._vocabularies: dict[str, list[str]] | None = None
+        self._vocabularies_version: tuple | None = None
+        self._data_version: tuple[tuple, str] | None = None
+        self._lock = threading.RLock()
+        self.settings_provider = SettingsProvider()  # type: ignore
+
+    def _load(self, path: str) -> list:
+        """Return the content of a JSON file, parsing it only if it changed."""
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            cached = self._files.get(path)
+            if cached is None or cached[0] != mtime:
+                logger.info(f"Loading catalogue file {path}")
+                self._files[path] = (mtime, load_json(path))
+            return self._files[path][1]
+
+    @property
+    def dishes(self) -> list[dict]:
+        return self._load(self.settings_provider.get_dishes_json_path())
+
+    @property
+    def chefs(self) -> list[dict]:
+        return self._load(self.settings_provider.get_chefs_json_path())
+
+    @property
+    def techniques(self) -> list[dict]:
+        return self._load(self.settings_provider.get_techniques_json_path())
+
+    @property
+    def version(self) -> tuple:
+        """Modification times of the entity files, changes when any of them does."""
+        return tuple(
+            os.stat(path).st_mtime_ns
+            for path in [
+                self.settings_provider.get_dishes_json_path(),
+                self.settings_provider.get_chefs_json_path(),
+                self.settings_provider.get_techniques_json_path(),
+            ]
+        )
+
+    @property
+    def data_version(self) -> str:
+        """Content hash of the entity files the graph is loaded from. Unlike
+        `version`, it does not change when a file is touched without being modified.
+        """
+        version = self.version
+        with self._lock:
+            if self._data_version is None or self._data_version[0] != version:
+                digest = hashlib.sha256()
+                for path in [
+                    self.settings_provider.get_dishes_json_path(),
+                    self.settings_provider.get_chefs_json_path(),
+                    self.settings_provider.get_techniques_json_path(),
+                ]:
+                    with open(path, "rb") as file:
+                        digest.update(file.read())
+                self._data_version = (version, digest.hexdigest())
+            return self._data_version[1]
+
+    def _build_vocabularies(self) -> dict[str, list[str]]:
+        dishes, chefs, techniques = self.dishes, self.chefs, self.techniques
+
+        def vocabulary(values) -> list[str]:
+            return sorted({value.lower() for value in values})
+
+        return {
+            "restaurants": vocabulary(chef["restaurant"] for chef in chefs),
+            "planets": vocabulary(chef["planet_name"] for chef in chefs),
+            # Licenses held by the chefs and needed by the techniques
+            "licenses": vocabulary(
+                lic["name"]
+                for entity in [*chefs, *techniques]
+                for lic in entity["licenses"]
+            ),
+            "dishes": vocabulary(dish["name"] for dish in dishes),
+            "culinary_orders": vocabulary(dish["culinary_order"] for dish in dishes),
+            "ingredients": vocabulary(
+                ingredient for dish in dishes for ingredient in dish["ingredients"]
+            ),
+            "techniques": vocabulary(technique["name"] for technique in techniques),
+            "technique_categories": vocabulary(
+                technique["category"] for technique in techniques
+            ),
+        }
+
+    def get_vocabulary(self, name: str) -> list[str]:
+        """Get a vocabulary of the catalogue, lowercased and sorted.
+
+        Args:
+            - name: one of restaurants, planets, licenses, dishes, culinary_orders,
+            ingredients, techniques, technique_categories.
+
+        Returns:
+            - The distinct values of the vocabulary.
+        """
+        version = self.version
+        with self._lock:
+            if self._vocabularies is None or self._vocabularies_version != version:
+                self._vocabularies = self._build_vocabularies()
+                self._vocabularies_version = version
+            return list(self._vocabularies[name])
@@ -2,40 +2,85 @@ from hackathon.utils.settings.settings_provider import SettingsProvider
 from hackathon.utils.singleton import Singleton
 from hackathon.models import CSVEntry
 import polars as pl
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
 
 
 class DatasetManager(metaclass=Singleton):
     """Singleton class for managing the dataset containing the interactions with the
     RAG system.
+
+    Entries are buffered in memory and periodically appended to a journal file next
+    to the dataset, so a crash loses at most the entries of the last flush interval.
+    The sorted CSV is written once, on save, and the journal is then removed.
     """
 
     def __init__(self):
-        self._dataset = None
+        self._entries = None
+        self._pending: list[CSVEntry] = []
         self._dataset_path = None
+        self._journal_path = None
+        # Entries are added by graph nodes running on concurrent workers
+        self._lock = threading.RLock()
         self.settings_provider = SettingsProvider()  # type: ignore
 
     def _setup_dataset(self):
         """Setup the dataset by loading the CSV file containing the interactions with the
-        RAG system.
+        RAG system, then replaying the journal left by a run that was not saved.
         """
 
         self._dataset_path = self.settings_provider.get_dataset_path()
+        self._journal_path = f"{self._dataset_path}.journal"
+
+        entries: dict[int, str] = {}
         try:
-            self._dataset = pl.read_csv(self._dataset_path, quote_char='"')
+            dataset = pl.read_csv(self._dataset_path, quote_char='"')
+            for row_id, result in zip(
+                dataset["row_id"].to_list(), dataset["result"].to_list()
+            ):
+                entries[row_id] = str(result)
         except FileNotFoundError:
-            # Initialize an empty DataFrame if the file does not exist
-            self._dataset = pl.DataFrame(
-                schema={
-                    "row_id": pl.Int64,
-                    "result": pl.Utf8,
-                }
-            )
+            # Start from an empty dataset if the file does not exist
+            pass
+
+        if os.path.exists(self._journal_path):
+            with open(self._journal_path) as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Last line truncated by a crash
+                        continue
+                    entries[record["row_id"]] = record["result"]
+            logger.info(f"Recovered entries from journal {self._journal_path}")
+
+        self._entries = entries
+
+    @property
+    def entries(self) -> dict[int, str]:
+        with self._lock:
+            if self._entries is None:
+                self._setup_dataset()
+        return self._entries  # type: ignore
 
     @property
     def dataset(self) -> pl.DataFrame:
-        if self._dataset is None:
-            self._setup_dataset()
-        return self._dataset  # type: ignore
+        with self._lock:
+            entries = sorted(self.entries.items())
+        return pl.DataFrame(
+            {
+                "row_id": [row_id for row_id, _ in entries],
+                "result": [result for _, result in entries],
+            },
+            schema={
+                "row_id": pl.Int64,
+                "result": pl.Utf8,
+            },
+        )
 
     @property
     def dataset_path(self) -> str:
@@ -43,20 +88,51 @@ class DatasetManager(metaclass=Singleton):
             self._setup_dataset()
         return self._dataset_path  # type: ignore
 
+    @property
+    def row_ids(self) -> set[int]:
+        """The row_ids of the questions already in the dataset."""
+        with self._lock:
+            return set(self.entries)
+
     def add_entry(self, entry: CSVEntry) -> None:
-        """Add a new entry to the dataset.
+        """Add a new entry to the dataset. An entry with the same row_id replaces the
+        previous one.
 
         Args:
-            model_response: The model response to add to the dataset.
+            entry: The entry to add to the dataset.
         """
-        entry = pl.DataFrame(
-            {
-                "row_id": entry.question_id,
-                "result": entry.result,
-            }
-        )
-        self._dataset = pl.concat([self.dataset, entry], how="vertical")
+        with self._lock:
+            self.entries[entry.question_id] = entry.result
+            self._pending.append(entry)
+            if (
+                len(self._pending)
+                >= self.settings_provider.get_dataset_flush_interval()
+            ):
+                self._flush()
+
+    def _flush(self) -> None:
+        """Append the pending entries to the journal and sync it to disk."""
+        if not self._pending:
+            return
+        with open(self._journal_path, "a") as file:  # type: ignore
+            for entry in self._pending:
+                record = {"row_id": entry.question_id, "result": entry.result}
+                file.write(json.dumps(record) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        self._pending = []
+
+    def flush(self) -> None:
+        """Persist the pending entries to the journal."""
+        with self._lock:
+            self._flush()
 
     def save(self):
-        """Save the dataset to the CSV file."""
-        self.dataset.write_csv(self.dataset_path, include_header=True)
+        """Save the dataset to the CSV file, sorted by row_id."""
+        with self._lock:
+            self._flush()
+            tmp_path = f"{self.dataset_path}.tmp"
+            self.dataset.write_csv(tmp_path, include_header=True)
+            os.replace(tmp_path, self.dataset_path)
+            if os.path.exists(self._journal_path):  # type: ignore
+                os.remove(self._journal_path)  # type: ignore
@@ -0,0 +1,128 @@
+import logging
+import threading
+from collections import Counter, defaultdict
+
+from hackathon.managers.catalogue_manager import CatalogueManager
+from hackathon.utils.settings.settings_provider import SettingsProvider
+from hackathon.utils.singleton import Singleton
+from hackathon.utils.text_utils import closest_match, normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Vocabularies of the entities that can appear as query parameters
+VOCABULARIES = [
+    "ingredients",
+    "techniques",
+    "planets",
+    "technique_categories",
+    "restaurants",
+    "culinary_orders",
+    "licenses",
+    "dishes",
+]
+
+# Number of candidates retrieved by trigram overlap and scored by edit distance
+MAX_CANDIDATES = 10
+
+
+def _trigrams(text: str) -> set[str]:
+    padded = f"  {text} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class EntityLinkerManager(metaclass=Singleton):
+    """Singleton class linking entity names written by the LLM to the names in
+    the graph. A name is looked up exactly, then after normalisation, and finally
+    fuzzily: candidates sharing the most character trigrams with it are retrieved
+    from an inverted index and the closest one by edit distance is taken, if close
+    enough and clearly closer than the second one: many names differ by a single
+    word, and an ambiguous name is better left unlinked than linked to the wrong
+    entity. The indexes are built once from the catalogue vocabularies and rebuilt
+    when the entity files change.
+    """
+
+    def __init__(self):
+        self._indexes = None
+        self._version = None
+        self._fuzzy_matches: dict[tuple[str | None, str], str | None] = {}
+        self._lock = threading.Lock()
+        self.settings_provider = SettingsProvider()  # type: ignore
+
+    def _setup_indexes(self):
+        """Build the exact, normalised and trigram indexes of every vocabulary."""
+        catalogue = CatalogueManager()
+        exact: dict[str | None, set[str]] = defaultdict(set)
+        normalized: dict[str | None, dict[str, str]] = defaultdict(dict)
+        trigrams: dict[str | None, dict[str, set[str]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+        # Every vocabulary is indexed on its own and, under None, with the others
+        for kind in VOCABULARIES:
+            for name in catalogue.get_vocabulary(kind):
+                normalized_name = normalize_text(name)
+                for key in (kind, None):
+                    exact[key].add(name)
+                    normalized[key][normalized_name] = name
+                    for trigram in _trigrams(normalized_name):
+                        trigrams[key][trigram].add(normalized_name)
+        self._indexes = (exact, normalized, trigrams)
+        self._fuzzy_matches = {}
+
+    @property
+    def indexes(self) -> tuple:
+        version = CatalogueManager().version
+        with self._lock:
+            if self._indexes is None or self._version != version:
+                self._setup_indexes()
+                self._version = version
+        return self._indexes  # type: ignore
+
+    def _fuzzy_match(self, normalized_name: str, kind: str | None) -> str | None:
+        _, normalized, trigrams = self.indexes
+        overlaps = Counter(
+            candidate
+            for trigram in _trigrams(normalized_name)
+            for candidate in trigrams[kind].get(trigram, ())
+        )
+        candidates = [
+            candidate for candidate, _ in overlaps.most_common(MAX_CANDIDATES)
+        ]
+        match = closest_match(
+            normalized_name,
+            candidates,
+            cutoff=self.settings_provider.get_entity_match_cutoff(),
+            margin=self.settings_provider.get_entity_match_margin(),
+        )
+        return normalized[kind][match] if match else None
+
+    def link(self, name: str, kind: str | None = None) -> str:
+        """Get the name in the graph of an entity.
+
+        Args:
+            - name: The name of the entity, as written by the LLM.
+            - kind: The vocabulary of the entity, e.g. "ingredients" or "planets".
+            All the vocabularies are searched if None.
+
+        Returns:
+            - The name of the entity in the graph, the lowercased name if no entity
+            matches.
+        """
+        exact, normalized, _ = self.indexes
+        lowered = name.strip().lower()
+        if lowered in exact[kind]:
+            return lowered
+
+        normalized_name = normalize_text(name)
+        if normalized_name in normalized[kind]:
+            return normalized[kind][normalized_name]
+
+        if (kind, normalized_name) not in self._fuzzy_matches:
+            match = self._fuzzy_match(normalized_name, kind)
+            self._fuzzy_matches[(kind, normalized_name)] = match
+            if match:
+                logger.info(f"Linked '{name}' to '{match}'")
+        return self._fuzzy_matches[(kind, normalized_name)] or lowered
+
+    def link_all(self, names: list[str], kind: str | None = None) -> list[str]:
+        """Link a list of entity names, see `link`."""
+        return [self.link(name, kind) for name in names]
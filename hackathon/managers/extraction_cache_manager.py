@@ -0,0 +1,96 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any
+
+from hackathon.utils.settings.settings_provider import SettingsProvider
+from hackathon.utils.singleton import Singleton
+
+logger = logging.getLogger(__name__)
+
+
+def hash_file(path: str) -> str:
+    """Content hash of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_content(content: Any) -> str:
+    """Content hash of a JSON serialisable value."""
+    serialized = json.dumps(content, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class ExtractionCacheManager(metaclass=Singleton):
+    """Singleton content addressed cache of the ingestion, on disk.
+
+    It has two levels. The markdown level maps the hash of the bytes of a document
+    and of the version of the converter to the markdown it was converted into, the
+    costly step, for every ingestor run in a ConversionPool; the markdown is split again on every hit, so changing the
+    splitter never serves stale chunks. The entities level maps the hash of an
+    extraction request to the entity the LLM extracted. That hash covers the
+    rendered prompt, which includes the chunk and the prompt version, plus the
+    output schema and the model. Every entry is a JSON file named after its hash,
+    so only the documents and the chunks that changed miss the cache.
+    """
+
+    def __init__(self):
+        self.settings_provider = SettingsProvider()  # type: ignore
+
+    def _path(self, level: str, key: str) -> str:
+        return os.path.join(
+            self.settings_provider.get_extraction_cache_path(), level, f"{key}.json"
+        )
+
+    def _get(self, level: str, key: str) -> Any | None:
+        if not self.settings_provider.extraction_cache_enabled():
+            return None
+        path = self._path(level, key)
+        if not os.path.exists(path):
+            return None
+        with open(path) as file:
+            return json.load(file)
+
+    def _put(self, level: str, key: str, content: Any) -> None:
+        if not self.settings_provider.extraction_cache_enabled():
+            return
+        path = self._path(level, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written aside and moved, a concurrent reader never sees a partial entry
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(content, file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def get_markdown(self, key: str) -> str | None:
+        """Get the markdown of a document.
+
+        Args:
+            - key: The hash of the bytes of the document, see `hash_file`, and of
+            the version of the converter.
+
+        Returns:
+            - The markdown, None on a miss.
+        """
+        return self._get("markdown", key)
+
+    def put_markdown(self, key: str, md_text: str) -> None:
+        self._put("markdown", key, md_text)
+
+    def get_entity(self, key: str) -> dict | None:
+        """Get an extracted entity.
+
+        Args:
+            - key: The hash of the extraction request.
+
+        Returns:
+            - The entity as JSON, None on a miss.
+        """
+        return self._get("entities", key)
+
+    def put_entity(self, key: str, entity: dict) -> None:
+        self._put("entities", key, entity)
@@ -0,0 +1,201 @@
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+
+from hackathon.graph.tools.dish_filters import DishFilter, DishMatrix
+from hackathon.managers.catalogue_manager import CatalogueManager
+from hackathon.models import Dish, Technique
+from hackathon.utils.settings.settings_provider import SettingsProvider
+from hackathon.utils.singleton import Singleton
+
+logger = logging.getLogger(__name__)
+
+# Schema of the graph loaded by Neo4jStoreManager, used in the prompt when the
+# memory backend is selected and the database is not introspected.
+GRAPH_SCHEMA = """Node properties:
+Dish {name: STRING, restaurant: STRING, chef_name: STRING, planet_name: STRING, dish_id: STRING, culinary_order: STRING, content_hash: STRING}
+Chef {name: STRING, restaurant: STRING, planet_name: STRING, content_hash: STRING}
+Ingredient {name: STRING}
+Technique {name: STRING, category: STRING, content_hash: STRING}
+License {name: STRING, level: INTEGER}
+Relationship properties:
+
+The relationships:
+(:Dish)-[:CREATED_BY]->(:Chef)
+(:Dish)-[:CONTAINS]->(:Ingredient)
+(:Dish)-[:REQUIRES_TECHNIQUE]->(:Technique)
+(:Technique)-[:NEEDS_LICENSE]->(:License)
+(:Chef)-[:HOLDS_LICENSE]->(:License)"""
+
+
+class MemoryGraphManager(metaclass=Singleton):
+    """Singleton class answering the fixed graph tools from in-memory inverted
+    indexes, built from the entity JSON files and rebuilt only when they change.
+    The dishes are normalised the same way Neo4jStoreManager loads them, so the
+    answers match the graph.
+    """
+
+    def __init__(self):
+        self._dishes = None
+        self._version = None
+        self._lock = threading.Lock()
+        self.settings_provider = SettingsProvider()  # type: ignore
+
+    def _setup_indexes(self):
+        """Build the dishes and the inverted indexes from the JSON files."""
+        start = time.perf_counter()
+        catalogue = CatalogueManager()
+        techniques = [Technique.model_validate(t) for t in catalogue.techniques]
+        dishes = [Dish.model_validate(d) for d in catalogue.dishes]
+        with open(self.settings_provider.get_dish_mapping_path()) as file:
+            dish_mapping = json.load(file)
+
+        self._by_ingredient: dict[str, set[str]] = defaultdict(set)
+        self._by_technique: dict[str, set[str]] = defaultdict(set)
+        self._by_technique_category: dict[str, set[str]] = defaultdict(set)
+        self._by_planet: dict[str, set[str]] = defaultdict(set)
+        self._by_culinary_order: dict[str, set[str]] = defaultdict(set)
+        self._by_license: dict[tuple[str, int], set[str]] = defaultdict(set)
+
+        technique_categories = {t.name.lower(): t.category.lower() for t in techniques}
+        technique_licenses = {
+            t.name.lower(): [(lic.name.lower(), lic.level) for lic in t.licenses]
+            for t in techniques
+        }
+
+        dishes_by_name = {}
+        for dish in dishes:
+            name = dish.name.lower()
+            dishes_by_name[name] = Dish(
+                name=name,
+                restaurant=dish.restaurant.lower(),
+                chef_name=dish.chef_name.lower(),
+                planet_name=dish.planet_name.lower(),
+                ingredients=sorted({i.lower() for i in dish.ingredients}),
+                techniques=sorted({t.lower() for t in dish.techniques}),
+                dish_id=str(dish_mapping.get(name, "-1")),
+                culinary_order=dish.culinary_order,
+            )
+
+        for name, dish in dishes_by_name.items():
+            self._by_planet[dish.planet_name].add(name)
+            self._by_culinary_order[dish.culinary_order].add(name)
+            for ingredient in dish.ingredients:
+                self._by_ingredient[ingredient].add(name)
+            for technique in dish.techniques:
+                self._by_technique[technique].add(name)
+                if technique in technique_categories:
+                    self._by_technique_category[technique_categories[technique]].add(
+                        name
+                    )
+                for lic in technique_licenses.get(technique, []):
+                    self._by_license[lic].add(name)
+
+        self._dishes = dishes_by_name
+        self._dish_matrix = DishMatrix.from_entities(
+            list(dishes_by_name.values()), techniques
+        )
+        logger.info(
+            f"Built in-memory graph indexes for {len(dishes_by_name)} dishes in "
+            f"{time.perf_counter() - start:.3f}s."
+        )
+
+    def _ensure_indexes(self):
+        version = CatalogueManager().version
+        with self._lock:
+            if self._dishes is None or self._version != version:
+                self._setup_indexes()
+                self._version = version
+
+    @property
+    def dishes(self) -> dict[str, Dish]:
+        self._ensure_indexes()
+        return self._dishes  # type: ignore
+
+    @property
+    def dish_matrix(self) -> DishMatrix:
+        self._ensure_indexes()
+        return self._dish_matrix
+
+    @property
+    def schema(self) -> str:
+        return GRAPH_SCHEMA
+
+    def _to_dishes(self, names: set[str]) -> list[Dish]:
+        return [self.dishes[name] for name in sorted(names)]
+
+    def get_dishes_by_ingredients(self, ingredients: list[str]) -> list[Dish]:
+        """Get the dishes containing all the given ingredients.
+
+        Args:
+            - ingredients: Names of the ingredients.
+
+        Returns:
+            - List of dishes.
+        """
+        dishes = self.dishes
+        names = set(dishes) if ingredients else set()
+        for ingredient in ingredients:
+            names &= self._by_ingredient.get(ingredient.lower(), set())
+        return self._to_dishes(names)
+
+    def get_dishes_by_planets(self, planet_names: list[str]) -> list[Dish]:
+        """Get the dishes prepared on any of the given planets.
+
+        Args:
+            - planet_names: Names of the planets.
+
+        Returns:
+            - List of dishes.
+        """
+        self._ensure_indexes()
+        names: set[str] = set()
+        for planet in planet_names:
+            names |= self._by_planet.get(planet.lower(), set())
+        return self._to_dishes(names)
+
+    def get_dishes_by_techniques(self, techniques: list[str]) -> list[Dish]:
+        """Get the dishes requiring all the given techniques.
+
+        Args:
+            - techniques: Names of the techniques.
+
+        Returns:
+            - List of dishes.
+        """
+        dishes = self.dishes
+        names = set(dishes) if techniques else set()
+        for technique in techniques:
+            names &= self._by_technique.get(technique.lower(), set())
+        return self._to_dishes(names)
+
+    def get_dishes_by_technique_category(self, category: str) -> list[Dish]:
+        """Get the dishes requiring at least a technique of the given category."""
+        self._ensure_indexes()
+        return self._to_dishes(self._by_technique_category.get(category.lower(), set()))
+
+    def get_dishes_by_culinary_order(self, culinary_order: str) -> list[Dish]:
+        """Get the dishes of the given culinary order."""
+        self._ensure_indexes()
+        return self._to_dishes(
+            self._by_culinary_order.get(culinary_order.lower(), set())
+        )
+
+    def get_dishes_by_license(self, license_name: str, min_level: int) -> list[Dish]:
+        """Get the dishes requiring a technique that needs the given license at a
+        level greater or equal than `min_level`.
+        """
+        self._ensure_indexes()
+        names: set[str] = set()
+        for (name, level), dish_names in self._by_license.items():
+            if name == license_name.lower() and level >= min_level:
+                names |= dish_names
+        return self._to_dishes(names)
+
+    def filter_dishes(self, expression: DishFilter) -> list[Dish]:
+        """Get the dishes satisfying a filter expression, e.g.
+        `HasIngredient("a") & HasIngredient("b") & ~HasIngredient("c")`.
+        """
+        return [self.dishes[name] for name in self.dish_matrix.evaluate(expression)]
@@ -1,15 +1,13 @@
 from hackathon.enums import LLMProvider
 from hackathon.utils.settings.settings_provider import SettingsProvider
+from hackathon.utils.llm_cache import SQLiteLRUCache
 from hackathon.utils.singleton import Singleton
-from langchain_openai import ChatOpenAI
-from langchain_google_genai import ChatGoogleGenerativeAI
+from langchain_core.caches import BaseCache
 from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.rate_limiters import BaseRateLimiter, InMemoryRateLimiter
 import logging
 import warnings
 
-with warnings.catch_warnings(action="ignore"):
-    from langchain_ibm import ChatWatsonx
-
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,6 +19,8 @@ class ModelManager(metaclass=Singleton):
         self.settings_provider = SettingsProvider()  # type: ignore
 
     def _setup_model(self):
+        # Each setup imports the client of its provider: importing all of them
+        # takes seconds and only one is used
         match self.settings_provider.get_model_provider():
             case LLMProvider.OPEN_AI:
                 self._setup_openai_model()
@@ -32,20 +32,38 @@ class ModelManager(metaclass=Singleton):
                 raise ValueError("Invalid model provider")
 
     def _setup_openai_model(self):
+        from langchain_openai import ChatOpenAI
+
         # Configure the model_name with environment variables and settings
         model_name = self.settings_provider.get_openai_model_name()
 
         # Initialize ChatOpenAI instance
-        self._model = ChatOpenAI(model=model_name, temperature=self._get_temperature())
+        self._model = ChatOpenAI(
+            model=model_name,
+            temperature=self._get_temperature(),
+            cache=self._get_cache(),
+            rate_limiter=self._get_rate_limiter(
+                self.settings_provider.get_openai_requests_per_second()
+            ),
+        )
 
     def _setup_google_model(self):
+        from langchain_google_genai import ChatGoogleGenerativeAI
+
         # Configure the model_name with environment variables and settings
         self._model = ChatGoogleGenerativeAI(
             model=self.settings_provider.get_google_model_name(),  # type: ignore
             temperature=self._get_temperature(),
+            cache=self._get_cache(),
+            rate_limiter=self._get_rate_limiter(
+                self.settings_provider.get_google_requests_per_second()
+            ),
         )
 
     def _setup_ibm_model(self):
+        with warnings.catch_warnings(action="ignore"):
+            from langchain_ibm import ChatWatsonx
+
         # Configure the model_name with environment variables and settings
         self._model = ChatWatsonx(
             model_id=self.settings_provider.get_ibm_model_name(),  # type: ignore
@@ -54,11 +72,54 @@ class ModelManager(metaclass=Singleton):
             params={
                 "temperature": self._get_temperature(),
             },
+            cache=self._get_cache(),
+            rate_limiter=self._get_rate_limiter(
+                self.settings_provider.get_ibm_requests_per_second()
+            ),
         )
 
     def _get_temperature(self) -> float:
         return self.settings_provider.get_model_temperature()
 
+    def _get_cache(self) -> BaseCache | bool:
+        """The persistent response cache of the model, False to disable caching."""
+        if not self.settings_provider.llm_cache_enabled():
+            return False
+        return SQLiteLRUCache(
+            path=self.settings_provider.get_llm_cache_path(),
+            max_entries=self.settings_provider.get_llm_cache_max_entries(),
+        )
+
+    def _get_rate_limiter(self, requests_per_second: float) -> BaseRateLimiter | None:
+        """Token bucket shared by all the calls to the model, refilled at the rate
+        allowed by the provider and holding up to one second of requests, so short
+        bursts are allowed. None if the provider is not limited.
+        """
+        if requests_per_second <= 0:
+            return None
+        return InMemoryRateLimiter(
+            requests_per_second=requests_per_second,
+            check_every_n_seconds=0.1,
+            max_bucket_size=max(1, requests_per_second),
+        )
+
+    @property
+    def model_id(self) -> str:
+        """Provider, name and temperature of the model, identifying its outputs in
+        the caches without setting up the model.
+        """
+        provider = self.settings_provider.get_model_provider()
+        match provider:
+            case LLMProvider.OPEN_AI:
+                model_name = self.settings_provider.get_openai_model_name()
+            case LLMProvider.IBM:
+                model_name = self.settings_provider.get_ibm_model_name()
+            case LLMProvider.GOOGLE:
+                model_name = self.settings_provider.get_google_model_name()
+            case _:
+                raise ValueError("Invalid model provider")
+        return f"{provider.value}:{model_name}:{self._get_temperature()}"
+
     @property
     def model(self) -> BaseChatModel:
         if not self._model:
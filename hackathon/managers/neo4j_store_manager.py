@@ -1,182 +1,760 @@
 from langchain_neo4j import Neo4jGraph
+from neo4j import (
+    READ_ACCESS,
+    WRITE_ACCESS,
+    AsyncDriver,
+    AsyncGraphDatabase,
+    ManagedTransaction,
+    Query,
+)
 from tqdm import tqdm
+from hackathon.managers.catalogue_manager import CatalogueManager
 from hackathon.utils.file_utils import load_json
-from hackathon.models import Dish, Chef, Technique
+from hackathon.models import Dish, Chef, License, Technique
+import hashlib
 import json
+import time
 from hackathon.utils.settings.settings_provider import SettingsProvider
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Schema of the graph as (name, label, properties). Unique keys back the MERGE
+# statements of the loaders, indexes back the filters of the agent's queries.
+UNIQUE_CONSTRAINTS = [
+    ("dish_name_unique", "Dish", ["name"]),
+    ("ingredient_name_unique", "Ingredient", ["name"]),
+    ("technique_name_unique", "Technique", ["name"]),
+    ("license_name_level_unique", "License", ["name", "level"]),
+]
+INDEXES = [
+    ("dish_planet_name_index", "Dish", ["planet_name"]),
+    ("dish_culinary_order_index", "Dish", ["culinary_order"]),
+    ("technique_category_index", "Technique", ["category"]),
+]
+
+# Techniques sharing a name, the first one, with a category if any, is kept. The
+# loader used to merge them on name and category, so graphs loaded before the
+# uniqueness constraint may hold several nodes per name.
+DUPLICATE_TECHNIQUES = """
+MATCH (t:Technique)
+WITH t ORDER BY t.category IS NULL, elementId(t)
+WITH t.name AS name, collect(t) AS nodes
+WHERE size(nodes) > 1
+WITH head(nodes) AS keep, tail(nodes) AS duplicates
+UNWIND duplicates AS duplicate
+"""
+
+# Plan operators reading every node of a label, or every node
+SCAN_OPERATORS = {"NodeByLabelScan", "AllNodesScan"}
+
 
 class Neo4jStoreManager:
-    def __init__(self, reset_graph: bool = False):
+    def __init__(self, reset_graph: bool = False, sync_graph: bool = False):
         self.settings_provider = SettingsProvider()
+        self.dish_mapping = None
+        self._graph_version = None
+        self._data_hash = None
+        self._async_driver = None
+        # Transaction of a running sync, the writes are made in it
+        self._tx: ManagedTransaction | None = None
+        # The schema is introspected on first use of `schema`, the agent reads it
+        # from the snapshot while the data hash does not change
         self.graph = Neo4jGraph(
             url=self.settings_provider.get_neo4j_url(),
             username=self.settings_provider.get_neo4j_username(),
             password=self.settings_provider.get_neo4j_password(),
+            driver_config=self._driver_config(),
+            refresh_schema=False,
         )
         if reset_graph:
-            # Load the dish mapping
-            mapping_path = SettingsProvider().get_dish_mapping_path()
-            with open(mapping_path) as file:
-                dish_mapping = json.load(file)
-            self.dish_mapping = dish_mapping
-
             self.reset_graph()
             self.setup()
+        elif sync_graph:
+            self.sync()
+
+    def _driver_config(self) -> dict:
+        """Connection pool of the drivers. The pool must hold at least one
+        connection per concurrent question, or the workers wait for each other.
+        """
+        return {
+            "max_connection_pool_size": self.settings_provider.get_neo4j_max_pool_size(),
+            "connection_acquisition_timeout": self.settings_provider.get_neo4j_acquisition_timeout(),
+        }
 
-    def _add_dish(self, dish: Dish) -> None:
-        """Add a dish to the graph.
+    def _session_config(self, access_mode: str) -> dict:
+        return {
+            "database": self.graph._database,
+            "default_access_mode": access_mode,
+            "fetch_size": self.settings_provider.get_neo4j_fetch_size(),
+        }
+
+    @property
+    def async_driver(self) -> AsyncDriver:
+        """Driver of the async API. It is bound to the event loop it is first used
+        in, `aclose` must be awaited before the loop is closed.
+        """
+        if self._async_driver is None:
+            self._async_driver = AsyncGraphDatabase.driver(
+                self.settings_provider.get_neo4j_url(),
+                auth=(
+                    self.settings_provider.get_neo4j_username(),
+                    self.settings_provider.get_neo4j_password(),
+                ),
+                **self._driver_config(),
+            )
+        return self._async_driver
+
+    async def aclose(self) -> None:
+        if self._async_driver is not None:
+            await self._async_driver.close()
+            self._async_driver = None
+
+    @property
+    def graph_version(self) -> str | None:
+        """Version of the graph, stored in the GraphMeta node so caches persisted
+        across runs can tell whether the graph changed. It is the epoch of the
+        database, a random id drawn when the GraphMeta node is created, and the
+        counter of the loads, syncs and resets of the graph: a new database, e.g. a
+        container restarted empty, never repeats the versions of a previous one.
+        None if the graph was never written.
+
+        The version is read once and then kept: writes made by another process
+        are seen after `refresh_graph_version`.
+        """
+        if self._graph_version is None:
+            self.refresh_graph_version()
+        return self._graph_version
+
+    def refresh_graph_version(self) -> str | None:
+        """Read the version of the graph again, see `graph_version`."""
+        res = self.read(
+            "MATCH (m:GraphMeta) RETURN m.epoch AS epoch, m.version AS version"
+        )
+        self._graph_version = self._format_graph_version(res)
+        return self._graph_version
+
+    async def arefresh_graph_version(self) -> str | None:
+        """Async version of `refresh_graph_version`."""
+        res = await self.aread(
+            "MATCH (m:GraphMeta) RETURN m.epoch AS epoch, m.version AS version"
+        )
+        self._graph_version = self._format_graph_version(res)
+        return self._graph_version
+
+    def _format_graph_version(self, res: list[dict]) -> str | None:
+        if not res or res[0]["epoch"] is None:
+            return None
+        return f"{res[0]['epoch']}:{res[0]['version'] or 0}"
+
+    def _bump_graph_version(self) -> None:
+        res = self.write(
+            """
+            MERGE (m:GraphMeta)
+            SET m.epoch = coalesce(m.epoch, randomUUID()),
+                m.version = coalesce(m.version, 0) + 1
+            RETURN m.epoch AS epoch, m.version AS version
+            """
+        )
+        self._graph_version = self._format_graph_version(res)
+
+    @property
+    def data_hash(self) -> str | None:
+        """Content hash of the entity files the graph was last loaded from, stored
+        in the GraphMeta node. None if the graph was reset or never loaded.
+        """
+        if self._data_hash is None:
+            res = self.read("MATCH (m:GraphMeta) RETURN m.data_hash AS data_hash")
+            self._data_hash = res[0]["data_hash"] if res else None
+        return self._data_hash
+
+    def _set_data_hash(self, data_hash: str | None) -> None:
+        self.write(
+            "MERGE (m:GraphMeta) SET m.data_hash = $data_hash",
+            {"data_hash": data_hash},
+        )
+        self._data_hash = data_hash
+        # The data changed, the schema is introspected again on next use
+        self.graph.schema = ""
+
+    @property
+    def schema(self) -> str:
+        """Schema of the graph, introspected on first use."""
+        if not self.graph.schema:
+            start = time.perf_counter()
+            self.graph.refresh_schema()
+            logger.info(
+                f"Introspected the graph schema in {time.perf_counter() - start:.2f}s"
+            )
+        return self.graph.schema
+
+    def explain(self, query: str, params: dict | None = None) -> str:
+        """Plan a query without running it.
 
         Args:
-            - dish: Dish object.
+            - query: The Cypher query.
+            - params: The parameters of the query.
+
+        Returns:
+            - The type of the query: "r" read only, "rw" read and write, "w" write
+            only or "s" schema.
         """
+        with self.graph._driver.session(**self._session_config(READ_ACCESS)) as session:
+            summary = session.run(Query(f"EXPLAIN {query}"), params or {}).consume()
+        return summary.query_type  # type: ignore
+
+    async def aexplain(self, query: str, params: dict | None = None) -> str:
+        """Async version of `explain`."""
+        async with self.async_driver.session(
+            **self._session_config(READ_ACCESS)
+        ) as session:
+            result = await session.run(Query(f"EXPLAIN {query}"), params or {})
+            summary = await result.consume()
+        return summary.query_type  # type: ignore
+
+    def _check_row_limit(self, records: list, row_limit: int | None) -> None:
+        if row_limit is not None and len(records) > row_limit:
+            raise ValueError(
+                f"The query returned more than {row_limit} rows, "
+                "make it more selective or return DISTINCT rows."
+            )
+
+    def read(
+        self,
+        query: str,
+        params: dict | None = None,
+        timeout: float | None = None,
+        row_limit: int | None = None,
+    ) -> list[dict]:
+        """Run a query in a read only session, routed to a reader in a cluster.
 
-        query = """
-        MERGE (d:Dish {name: $name})
-        SET d.restaurant = $restaurant, 
-            d.chef_name = $chef_name, 
-            d.planet_name = $planet_name,
-            d.dish_id = $dish_id,
-            d.culinary_order = $culinary_order
-
-        MERGE (c:Chef {name: $chef_name, restaurant: $restaurant, planet_name: $planet_name})
-        MERGE (d)-[:CREATED_BY]->(c)
+        Args:
+            - query: The Cypher query.
+            - params: The parameters of the query.
+            - timeout: Seconds after which the server aborts the transaction,
+            NEO4J_QUERY_TIMEOUT if None.
+            - row_limit: Maximum number of rows, more rows raise a ValueError.
+
+        Returns:
+            - The rows of the result, as returned by `graph.query`.
         """
+        timeout = timeout or self.settings_provider.get_neo4j_query_timeout()
+        with self.graph._driver.session(**self._session_config(READ_ACCESS)) as session:
+            result = session.run(Query(query, timeout=timeout), params or {})
+            if row_limit is None:
+                records = list(result)
+            else:
+                # Fetch one more row to detect a result over the limit
+                records = result.fetch(row_limit + 1)
+                self._check_row_limit(records, row_limit)
+        return [record.data() for record in records]
+
+    async def aread(
+        self,
+        query: str,
+        params: dict | None = None,
+        timeout: float | None = None,
+        row_limit: int | None = None,
+    ) -> list[dict]:
+        """Async version of `read`, used by the tools when the graph runs with the
+        async API, so concurrent questions do not hold a thread each.
+        """
+        timeout = timeout or self.settings_provider.get_neo4j_query_timeout()
+        async with self.async_driver.session(
+            **self._session_config(READ_ACCESS)
+        ) as session:
+            result = await session.run(Query(query, timeout=timeout), params or {})
+            if row_limit is None:
+                records = [record async for record in result]
+            else:
+                records = await result.fetch(row_limit + 1)
+                self._check_row_limit(records, row_limit)
+        return [record.data() for record in records]
+
+    def write(
+        self, query: str, params: dict | None = None, timeout: float | None = None
+    ) -> list[dict]:
+        """Run a query in a write session, routed to the leader in a cluster.
 
-        params = {
-            "name": dish.name.lower(),
-            "restaurant": dish.restaurant.lower(),
-            "chef_name": dish.chef_name.lower(),
-            "planet_name": dish.planet_name.lower(),
-            "dish_id": str(self.dish_mapping.get(dish.name.lower(), "-1")),
-            "culinary_order": dish.culinary_order,
-        }
+        Args:
+            - query: The Cypher query.
+            - params: The parameters of the query.
+            - timeout: Seconds after which the server aborts the transaction, no
+            limit if None since loading the graph can take long.
 
-        self.graph.query(query, params)
+        Returns:
+            - The rows of the result.
+        """
+        if self._tx is not None:
+            return [record.data() for record in self._tx.run(query, params or {})]
+        with self.graph._driver.session(
+            **self._session_config(WRITE_ACCESS)
+        ) as session:
+            result = session.run(Query(query, timeout=timeout), params or {})
+            return [record.data() for record in result]
 
-        # Add Ingredient Relationships
-        for ingredient in dish.ingredients:
-            ing_query = """
-            MERGE (i:Ingredient {name: $ingredient_name})
-            MERGE (d:Dish {name: $name})
-            MERGE (d)-[:CONTAINS]->(i)
-            """
-            ing_params = {
-                "name": dish.name.lower(),
-                "ingredient_name": ingredient.lower(),
-            }
-            self.graph.query(ing_query, ing_params)
+    def _run_batched(self, query: str, rows: list[dict], desc: str) -> float:
+        """Run a query over a list of rows, sending them in batches as `$rows`.
 
-        # Add Technique Relationships
-        for technique in dish.techniques:
-            tech_query = """
-            MERGE (t:Technique {name: $technique_name})
-            MERGE (d:Dish {name: $name})
-            MERGE (d)-[:REQUIRES_TECHNIQUE]->(t)
-            """
-            tech_params = {
+        Args:
+            - query: Cypher query that UNWINDs `$rows`.
+            - rows: list of parameter dictionaries.
+            - desc: description shown in the progress bar.
+
+        Returns:
+            - Elapsed time in seconds.
+        """
+        batch_size = self.settings_provider.get_neo4j_batch_size()
+        start = time.perf_counter()
+        for i in tqdm(range(0, len(rows), batch_size), desc=desc):
+            self.write(query, {"rows": rows[i : i + batch_size]})
+        return time.perf_counter() - start
+
+    def _log_throughput(self, entity: str, n_rows: int, elapsed: float) -> None:
+        rate = n_rows / elapsed if elapsed > 0 else float("inf")
+        logger.info(
+            f"Added {n_rows} {entity} to the graph in {elapsed:.2f}s ({rate:.0f} rows/s)."
+        )
+
+    def _get_dish_mapping(self) -> dict[str, int]:
+        if self.dish_mapping is None:
+            mapping_path = SettingsProvider().get_dish_mapping_path()
+            with open(mapping_path) as file:
+                self.dish_mapping = json.load(file)
+        return self.dish_mapping
+
+    def _dish_rows(self, dishes: list[Dish]) -> list[dict]:
+        """Build the query parameters of a list of dishes, one row per dish name."""
+        dish_mapping = self._get_dish_mapping()
+        rows = {}
+        for dish in dishes:
+            row = {
                 "name": dish.name.lower(),
-                "technique_name": technique.lower(),
+                "restaurant": dish.restaurant.lower(),
+                "chef_name": dish.chef_name.lower(),
+                "planet_name": dish.planet_name.lower(),
+                "dish_id": str(dish_mapping.get(dish.name.lower(), "-1")),
+                "culinary_order": dish.culinary_order,
+                "ingredients": sorted({i.lower() for i in dish.ingredients}),
+                "techniques": sorted({t.lower() for t in dish.techniques}),
+            }
+            rows[row["name"]] = _with_content_hash(row)
+        return list(rows.values())
+
+    def _technique_rows(self, techniques: list[Technique]) -> list[dict]:
+        """Build the query parameters of a list of techniques, one row per name."""
+        rows = {}
+        for technique in techniques:
+            row = {
+                "name": technique.name.lower(),
+                "category": technique.category.lower(),
+                "licenses": _license_rows(technique.licenses),
             }
-            self.graph.query(tech_query, tech_params)
+            rows[row["name"]] = _with_content_hash(row)
+        return list(rows.values())
+
+    def _chef_rows(self, chefs: list[Chef]) -> list[dict]:
+        """Build the query parameters of a list of chefs, one row per name and
+        restaurant."""
+        rows = {}
+        for chef in chefs:
+            row = {
+                "name": chef.name.lower(),
+                "restaurant": chef.restaurant.lower(),
+                "planet_name": chef.planet_name.lower(),
+                "licenses": _license_rows(chef.licenses),
+            }
+            rows[(row["name"], row["restaurant"])] = _with_content_hash(row)
+        return list(rows.values())
 
     def add_dishes(self, dishes: list[Dish]) -> None:
-        """Add a list of dishes to the graph.
+        """Add a list of dishes to the graph, together with their chef, ingredient
+        and technique relationships.
 
         Args:
             - dishes: list of Dish objects.
         """
-        for dish in tqdm(dishes, desc="Adding dishes"):
-            self._add_dish(dish)
-        logger.info(f"Added {len(dishes)} dishes to the graph.")
+        self._upsert_dishes(self._dish_rows(dishes))
+
+    def _upsert_dishes(self, rows: list[dict]) -> None:
+        query = """
+        UNWIND $rows AS row
+        MERGE (d:Dish {name: row.name})
+        SET d.restaurant = row.restaurant,
+            d.chef_name = row.chef_name,
+            d.planet_name = row.planet_name,
+            d.dish_id = row.dish_id,
+            d.culinary_order = row.culinary_order,
+            d.content_hash = row.content_hash
+
+        MERGE (c:Chef {name: row.chef_name, restaurant: row.restaurant, planet_name: row.planet_name})
+        MERGE (d)-[:CREATED_BY]->(c)
+        """
+        elapsed = self._run_batched(query, rows, desc="Adding dishes")
+        self._log_throughput("dishes", len(rows), elapsed)
+
+        # Add Ingredient Relationships
+        ing_query = """
+        UNWIND $rows AS row
+        MERGE (i:Ingredient {name: row.ingredient_name})
+        WITH i, row
+        MATCH (d:Dish {name: row.name})
+        MERGE (d)-[:CONTAINS]->(i)
+        """
+        ing_rows = [
+            {"name": row["name"], "ingredient_name": ingredient}
+            for row in rows
+            for ingredient in row["ingredients"]
+        ]
+        elapsed = self._run_batched(ing_query, ing_rows, desc="Adding ingredients")
+        self._log_throughput("ingredient relationships", len(ing_rows), elapsed)
+
+        # Add Technique Relationships
+        tech_query = """
+        UNWIND $rows AS row
+        MERGE (t:Technique {name: row.technique_name})
+        WITH t, row
+        MATCH (d:Dish {name: row.name})
+        MERGE (d)-[:REQUIRES_TECHNIQUE]->(t)
+        """
+        tech_rows = [
+            {"name": row["name"], "technique_name": technique}
+            for row in rows
+            for technique in row["techniques"]
+        ]
+        elapsed = self._run_batched(tech_query, tech_rows, desc="Adding techniques")
+        self._log_throughput("technique relationships", len(tech_rows), elapsed)
+
+    def add_licenses(self, licenses: list[License]) -> None:
+        """Add a list of licenses to the graph. Duplicated licenses are added once.
+
+        Args:
+            - licenses: list of License objects.
+        """
+        query = """
+        UNWIND $rows AS row
+        MERGE (l:License {name: row.name, level: row.level})
+        """
+        rows = _license_rows(licenses)
+        elapsed = self._run_batched(query, rows, desc="Adding licenses")
+        self._log_throughput("licenses", len(rows), elapsed)
 
     def add_techniques(self, techniques: list[Technique]) -> None:
-        """Add a list of techniques to the graph.
+        """Add a list of techniques to the graph, linked to the licenses they need.
+        The licenses must already be in the graph.
 
         Args:
             - techniques: list of Technique objects.
         """
-        for technique in tqdm(techniques, desc="Adding techniques"):
-            self._add_technique(technique)
+        self._upsert_techniques(self._technique_rows(techniques))
 
-        logger.info(f"Added {len(techniques)} techniques to the graph.")
+    def _upsert_techniques(self, rows: list[dict]) -> None:
+        query = """
+        UNWIND $rows AS row
+        MERGE (t:Technique {name: row.name})
+        SET t.category = row.category,
+            t.content_hash = row.content_hash
+        """
+        elapsed = self._run_batched(query, rows, desc="Adding techniques")
+        self._log_throughput("techniques", len(rows), elapsed)
+
+        license_query = """
+        UNWIND $rows AS row
+        MATCH (t:Technique {name: row.technique_name})
+        MATCH (l:License {name: row.name, level: row.level})
+        MERGE (t)-[:NEEDS_LICENSE]->(l)
+        """
+        license_rows = [
+            {"technique_name": row["name"], **lic}
+            for row in rows
+            for lic in row["licenses"]
+        ]
+        elapsed = self._run_batched(
+            license_query, license_rows, desc="Adding technique licenses"
+        )
+        self._log_throughput(
+            "technique license relationships", len(license_rows), elapsed
+        )
 
-    def _add_technique(self, technique: Technique) -> None:
-        """Add a technique to the graph.
+    def add_chefs(self, chefs: list[Chef]) -> None:
+        """Add a list of chefs to the graph, linked to the licenses they hold.
+        The licenses must already be in the graph.
 
         Args:
-            - technique: Technique object.
+            - chefs: list of Chef objects.
         """
-        query = """
-        MERGE (t:Technique {name: $name, category: $category})
-        SET t.category = $category
+        self._upsert_chefs(self._chef_rows(chefs))
 
-        FOREACH (license IN $licenses |
-            MERGE (l:License {name: license.name, level: license.level})
-            SET l.level = license.level
-            MERGE (t)-[:NEEDS_LICENSE]->(l)
+    def _upsert_chefs(self, rows: list[dict]) -> None:
+        query = """
+        UNWIND $rows AS row
+        MERGE (c:Chef {name: row.name, restaurant: row.restaurant})
+        SET c.planet_name = row.planet_name,
+            c.content_hash = row.content_hash
+        """
+        elapsed = self._run_batched(query, rows, desc="Adding chefs")
+        self._log_throughput("chefs", len(rows), elapsed)
+
+        license_query = """
+        UNWIND $rows AS row
+        MATCH (c:Chef {name: row.chef_name, restaurant: row.restaurant})
+        MATCH (l:License {name: row.name, level: row.level})
+        MERGE (c)-[:HOLDS_LICENSE]->(l)
+        """
+        license_rows = [
+            {"chef_name": row["name"], "restaurant": row["restaurant"], **lic}
+            for row in rows
+            for lic in row["licenses"]
+        ]
+        elapsed = self._run_batched(
+            license_query, license_rows, desc="Adding chef licenses"
         )
+        self._log_throughput("chef license relationships", len(license_rows), elapsed)
+
+    def _diff(
+        self, label: str, keys: list[str], rows: list[dict]
+    ) -> tuple[list[dict], list[dict]]:
+        """Compare the rows of an entity with the nodes in the graph by content hash.
+
+        Args:
+            - label: label of the nodes.
+            - keys: properties identifying a node.
+            - rows: query parameters built from the JSON files.
+
+        Returns:
+            - The rows that are new or changed, and the keys of the nodes that are
+            no longer in the rows.
         """
+        properties = ", ".join(f"n.{key} AS {key}" for key in keys)
+        res = self.read(
+            f"MATCH (n:{label}) RETURN {properties}, n.content_hash AS content_hash"
+        )
+        current = {tuple(r[key] for key in keys): r["content_hash"] for r in res}
+
+        changed = []
+        row_keys = set()
+        for row in rows:
+            row_key = tuple(row[key] for key in keys)
+            row_keys.add(row_key)
+            if current.get(row_key) != row["content_hash"]:
+                changed.append(row)
+        removed = [
+            dict(zip(keys, node_key))
+            for node_key in current
+            if node_key not in row_keys
+        ]
 
-        params = {
-            "name": technique.name.lower(),
-            "category": technique.category.lower(),
-            "licenses": [
-                {"name": lic.name.lower(), "level": lic.level}
-                for lic in technique.licenses
-            ],
-        }
+        logger.info(f"{label}: {len(changed)} changed, {len(removed)} removed.")
+        return changed, removed
 
-        self.graph.query(query, params)
+    def _delete_nodes(self, label: str, keys: list[str], rows: list[dict]) -> None:
+        match = ", ".join(f"{key}: row.{key}" for key in keys)
+        query = f"""
+        UNWIND $rows AS row
+        MATCH (n:{label} {{{match}}})
+        DETACH DELETE n
+        """
+        self._run_batched(query, rows, desc=f"Removing {label} nodes")
+
+    def _prune_relationships(
+        self,
+        technique_rows: list[dict],
+        chef_rows: list[dict],
+        dish_rows: list[dict],
+    ) -> None:
+        """Delete the relationships of the changed entities that are no longer in
+        their rows. The relationships still in the rows are merged afterwards."""
+        self._run_batched(
+            """
+            UNWIND $rows AS row
+            MATCH (t:Technique {name: row.name})-[r:NEEDS_LICENSE]->(l:License)
+            WHERE NOT {name: l.name, level: l.level} IN row.licenses
+            DELETE r
+            """,
+            technique_rows,
+            desc="Pruning technique licenses",
+        )
+        self._run_batched(
+            """
+            UNWIND $rows AS row
+            MATCH (c:Chef {name: row.name, restaurant: row.restaurant})-[r:HOLDS_LICENSE]->(l:License)
+            WHERE NOT {name: l.name, level: l.level} IN row.licenses
+            DELETE r
+            """,
+            chef_rows,
+            desc="Pruning chef licenses",
+        )
+        self._run_batched(
+            """
+            UNWIND $rows AS row
+            MATCH (d:Dish {name: row.name})-[r:CONTAINS]->(i:Ingredient)
+            WHERE NOT i.name IN row.ingredients
+            DELETE r
+            """,
+            dish_rows,
+            desc="Pruning ingredients",
+        )
+        self._run_batched(
+            """
+            UNWIND $rows AS row
+            MATCH (d:Dish {name: row.name})-[r:REQUIRES_TECHNIQUE]->(t:Technique)
+            WHERE NOT t.name IN row.techniques
+            DELETE r
+            """,
+            dish_rows,
+            desc="Pruning techniques",
+        )
+        self._run_batched(
+            """
+            UNWIND $rows AS row
+            MATCH (d:Dish {name: row.name})-[r:CREATED_BY]->(c:Chef)
+            WHERE NOT (c.name = row.chef_name AND c.restaurant = row.restaurant
+                AND c.planet_name = row.planet_name)
+            DELETE r
+            """,
+            dish_rows,
+            desc="Pruning chefs",
+        )
 
-    def _add_chef(self, chef: Chef) -> None:
-        """Add a chef to the graph.
+    def _delete_orphans(self) -> None:
+        """Delete the ingredients and the licenses no longer referenced."""
+        self.write("MATCH (i:Ingredient) WHERE NOT (i)<-[:CONTAINS]-() DELETE i")
+        self.write(
+            "MATCH (l:License) WHERE NOT (l)<-[:NEEDS_LICENSE|HOLDS_LICENSE]-() "
+            "DELETE l"
+        )
 
-        Args:
-            - chef: Chef object.
+    def _merge_duplicate_techniques(self) -> None:
+        """Merge the techniques sharing a name into one node, which keeps their
+        relationships. Its content hash is cleared, so the next sync writes it
+        again from the JSON files.
         """
-        query = """
-        MERGE (c:Chef {name: $name, restaurant: $restaurant})
-        SET c.restaurant = $restaurant, 
-            c.name = $name,
-            c.planet_name = $planet_name
-        
-        FOREACH (license IN $licenses |
-            MERGE (l:License {name: license.name, level: license.level})
-            SET l.level = license.level,
-                l.name = license.name
-            MERGE (c)-[:HOLDS_LICENSE]->(l)
+        self.write(
+            DUPLICATE_TECHNIQUES
+            + """
+            MATCH (d:Dish)-[:REQUIRES_TECHNIQUE]->(duplicate)
+            MERGE (d)-[:REQUIRES_TECHNIQUE]->(keep)
+            """
+        )
+        self.write(
+            DUPLICATE_TECHNIQUES
+            + """
+            MATCH (duplicate)-[:NEEDS_LICENSE]->(l:License)
+            MERGE (keep)-[:NEEDS_LICENSE]->(l)
+            """
+        )
+        res = self.write(
+            DUPLICATE_TECHNIQUES
+            + """
+            SET keep.category = coalesce(keep.category, duplicate.category),
+                keep.content_hash = null
+            DETACH DELETE duplicate
+            RETURN count(*) AS merged
+            """
         )
+        if res and res[0]["merged"]:
+            logger.warning(f"Merged {res[0]['merged']} duplicated techniques.")
+            self._bump_graph_version()
+
+    def create_schema(self) -> None:
+        """Create the uniqueness constraints and the indexes of the graph.
+        Existing constraints and indexes are left untouched. Duplicated techniques,
+        left by the loader before the constraints existed, are merged first, or the
+        uniqueness constraint could not be created.
         """
+        self._merge_duplicate_techniques()
+        for name, label, properties in UNIQUE_CONSTRAINTS:
+            keys = ", ".join(f"n.{prop}" for prop in properties)
+            self.write(
+                f"CREATE CONSTRAINT {name} IF NOT EXISTS "
+                f"FOR (n:{label}) REQUIRE ({keys}) IS UNIQUE"
+            )
+        for name, label, properties in INDEXES:
+            keys = ", ".join(f"n.{prop}" for prop in properties)
+            self.write(f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON ({keys})")
+        logger.info(
+            f"Schema ready: {len(UNIQUE_CONSTRAINTS)} constraints, {len(INDEXES)} indexes."
+        )
 
-        params = {
-            "name": chef.name.lower(),
-            "restaurant": chef.restaurant.lower(),
-            "planet_name": chef.planet_name.lower(),
-            # "document": chef.document,
-            "licenses": [
-                {"name": lic.name.lower(), "level": lic.level} for lic in chef.licenses
-            ],
-        }
-
-        self.graph.query(query, params)
+    def _plan(self, query: str) -> dict:
+        """Plan of a query, as returned by EXPLAIN. The parameters are not needed."""
+        with self.graph._driver.session(**self._session_config(READ_ACCESS)) as session:
+            summary = session.run(Query(f"EXPLAIN {query}")).consume()
+        return summary.plan  # type: ignore
 
-    def add_chefs(self, chefs: list[Chef]) -> None:
-        """Add a list of chefs to the graph.
+    def label_scans(self, queries: list[str]) -> list[str]:
+        """Find the queries that scan every node of a label, or every node, and
+        then filter them on a property: the plan the planner falls back to when
+        no index covers the property.
 
         Args:
-            - chefs: list of Chef objects.
+            - queries: The Cypher queries to plan.
+
+        Returns:
+            - Description of the scans, e.g. `NodeByLabelScan d:Dish filtered by
+            d.planet_name IN $planet_names`.
         """
-        for chef in tqdm(chefs, desc="Adding chefs"):
-            self._add_chef(chef)
+        scans = []
+
+        def visit(operator: dict, parent: dict | None) -> None:
+            operator_type = operator["operatorType"].split("@")[0]
+            if (
+                operator_type in SCAN_OPERATORS
+                and parent is not None
+                and parent["operatorType"].split("@")[0] == "Filter"
+            ):
+                variables = operator.get("identifiers", [])
+                details = parent["arguments"].get("Details", "")
+                if any(f"{variable}." in details for variable in variables):
+                    scan_details = operator["arguments"].get("Details", "")
+                    scans.append(
+                        f"{operator_type} {scan_details} filtered by {details}"
+                    )
+            for child in operator.get("children", []):
+                visit(child, operator)
+
+        for query in queries:
+            visit(self._plan(query), None)
+        for scan in scans:
+            logger.warning(f"Unindexed lookup: {scan}.")
+        return scans
+
+    def missing_indexes(self, queries: list[str] | None = None) -> list[str]:
+        """Check that the graph has an index for every key looked up by the loaders
+        and by the agent's queries. Uniqueness constraints count as indexes.
+
+        Args:
+            - queries: Queries to plan, the scans filtering on a property found in
+            their plans are reported too, see `label_scans`.
 
-        logger.info(f"Added {len(chefs)} chefs to the graph.")
+        Returns:
+            - Description of the missing indexes, e.g. `:Dish(planet_name)`, and of
+            the unindexed lookups of the queries.
+        """
+        res = self.read(
+            "SHOW INDEXES YIELD labelsOrTypes, properties "
+            "RETURN labelsOrTypes, properties"
+        )
+        existing = set()
+        for r in res:
+            for label in r["labelsOrTypes"] or []:
+                existing.add((label, tuple(r["properties"] or [])))
+
+        missing = [
+            f":{label}({', '.join(properties)})"
+            for _, label, properties in UNIQUE_CONSTRAINTS + INDEXES
+            if (label, tuple(properties)) not in existing
+        ]
+        for index in missing:
+            logger.warning(f"Missing index on {index}.")
+        return missing + self.label_scans(queries or [])
 
     def reset_graph(self) -> None:
-        self.graph.query("MATCH (n) DETACH DELETE n")
+        # GraphMeta is kept, a version counter starting over would match the
+        # versions of stale cache entries
+        self.write("MATCH (n) WHERE NOT n:GraphMeta DETACH DELETE n")
+        self._bump_graph_version()
+        self._set_data_hash(None)
 
     def setup(self) -> None:
         """Setup the graph by loading the data from the JSON files."""
@@ -184,24 +762,141 @@ class Neo4jStoreManager:
         # Check for consistency
         check_consistency()
 
-        techniques = [
-            Technique.model_validate(technique)
-            for technique in load_json(SettingsProvider().get_techniques_json_path())
-        ]
+        start = time.perf_counter()
+
+        # Create constraints and indexes before loading, MERGE relies on them
+        self.create_schema()
+
+        techniques, chefs, dishes = load_entities()
+
+        # Load licenses first, techniques and chefs link to them
+        self.add_licenses(
+            [lic for technique in techniques for lic in technique.licenses]
+            + [lic for chef in chefs for lic in chef.licenses]
+        )
         self.add_techniques(techniques)
-        # Load chefs
-        chefs = [
-            Chef.model_validate(chef)
-            for chef in load_json(SettingsProvider().get_chefs_json_path())
-        ]
         self.add_chefs(chefs)
+        self.add_dishes(dishes)
+        self._bump_graph_version()
+        self._set_data_hash(CatalogueManager().data_version)
+
+        logger.info(f"Graph setup completed in {time.perf_counter() - start:.2f}s.")
+
+    def sync(self) -> None:
+        """Synchronise the graph with the JSON files. Only the techniques, chefs and
+        dishes whose content hash changed are written, the relationships they lost
+        and the entities no longer in the files are deleted. Unlike a reset, the
+        graph is never empty while it is refreshed: the changes are made in a
+        single write transaction, so readers see either the old graph or the new
+        one, never a dish that lost its edges before getting the new ones.
+        """
+
+        # Check for consistency
+        check_consistency()
+
+        start = time.perf_counter()
+        # Schema changes cannot share a transaction with data changes
+        self.create_schema()
 
-        # Load dishes
-        dishes = [
-            Dish.model_validate(dish)
-            for dish in load_json(SettingsProvider().get_dishes_json_path())
+        techniques, chefs, dishes = load_entities()
+        technique_rows, removed_techniques = self._diff(
+            "Technique", ["name"], self._technique_rows(techniques)
+        )
+        chef_rows, removed_chefs = self._diff(
+            "Chef", ["name", "restaurant"], self._chef_rows(chefs)
+        )
+        dish_rows, removed_dishes = self._diff(
+            "Dish", ["name"], self._dish_rows(dishes)
+        )
+        data_hash = CatalogueManager().data_version
+        changes = [
+            technique_rows,
+            removed_techniques,
+            chef_rows,
+            removed_chefs,
+            dish_rows,
+            removed_dishes,
         ]
-        self.add_dishes(dishes)
+        if not any(changes):
+            # Nothing to write, the version of the graph and the caches keyed on
+            # it are kept
+            if self.data_hash != data_hash:
+                self._set_data_hash(data_hash)
+            logger.info("Graph already in sync.")
+            return
+
+        def apply_changes(tx: ManagedTransaction) -> None:
+            self._tx = tx
+            try:
+                # Remove the entities that no longer exist and the stale
+                # relationships
+                self._delete_nodes("Dish", ["name"], removed_dishes)
+                self._delete_nodes("Chef", ["name", "restaurant"], removed_chefs)
+                self._delete_nodes("Technique", ["name"], removed_techniques)
+                self._prune_relationships(technique_rows, chef_rows, dish_rows)
+
+                # Upsert the changed entities, licenses first as the others link
+                # to them
+                self.add_licenses(
+                    [
+                        License.model_validate(lic)
+                        for row in technique_rows + chef_rows
+                        for lic in row["licenses"]
+                    ]
+                )
+                self._upsert_techniques(technique_rows)
+                self._upsert_chefs(chef_rows)
+                self._upsert_dishes(dish_rows)
+                self._delete_orphans()
+                # One version per sync, committed with the changes
+                self._bump_graph_version()
+                self._set_data_hash(data_hash)
+            finally:
+                self._tx = None
+
+        try:
+            with self.graph._driver.session(
+                **self._session_config(WRITE_ACCESS)
+            ) as session:
+                session.execute_write(apply_changes)
+        except Exception:
+            # Rolled back, the versions set in the transaction are read again
+            self._graph_version = None
+            self._data_hash = None
+            raise
+
+        logger.info(f"Graph sync completed in {time.perf_counter() - start:.2f}s.")
+
+
+def load_entities() -> tuple[list[Technique], list[Chef], list[Dish]]:
+    """Load the techniques, the chefs and the dishes from the JSON files."""
+    techniques = [
+        Technique.model_validate(technique)
+        for technique in load_json(SettingsProvider().get_techniques_json_path())
+    ]
+    chefs = [
+        Chef.model_validate(chef)
+        for chef in load_json(SettingsProvider().get_chefs_json_path())
+    ]
+    dishes = [
+        Dish.model_validate(dish)
+        for dish in load_json(SettingsProvider().get_dishes_json_path())
+    ]
+    return techniques, chefs, dishes
+
+
+def _license_rows(licenses: list[License]) -> list[dict]:
+    return [
+        {"name": name, "level": level}
+        for name, level in sorted({(lic.name.lower(), lic.level) for lic in licenses})
+    ]
+
+
+def _with_content_hash(row: dict) -> dict:
+    """Add to a row the hash of its content, stored on the node to detect changes."""
+    content = json.dumps(row, sort_keys=True, ensure_ascii=False)
+    row["content_hash"] = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return row
 
 
 def check_consistency():
@@ -264,7 +959,10 @@ def check_consistency():
 
 
 if __name__ == "__main__":
-    neo4j_store_manager = Neo4jStoreManager(reset_graph=True)
+    from hackathon.graph.tools.cypher_queries import TOOL_QUERIES
+
+    neo4j_store_manager = Neo4jStoreManager(sync_graph=True)
+    neo4j_store_manager.missing_indexes(TOOL_QUERIES)
 
     # Dish.from_neo4j(retrieved_dishes[0])
 
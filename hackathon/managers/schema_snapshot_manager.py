@@ -0,0 +1,95 @@
+import json
+import logging
+import os
+import threading
+
+from hackathon.utils.settings.settings_provider import SettingsProvider
+from hackathon.utils.singleton import Singleton
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the content of the snapshot changes, older snapshots are ignored
+SNAPSHOT_FORMAT = 1
+
+
+class SchemaSnapshotManager(metaclass=Singleton):
+    """Singleton snapshot on disk of what the agent's system prompt is built from:
+    the schema of the graph, the vocabularies and the rendered prompt.
+
+    The snapshot is keyed by the data hash of the graph, written by
+    Neo4jStoreManager on every load, by the data version of the entity files the
+    vocabularies are read from and by the version of the prompt template.
+    While the key does not change the prompt is read from disk, without
+    introspecting the graph.
+    """
+
+    def __init__(self):
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self.settings_provider = SettingsProvider()  # type: ignore
+
+    def _load(self) -> dict:
+        path = self.settings_provider.get_schema_snapshot_path()
+        if not os.path.exists(path):
+            return {}
+        with open(path) as file:
+            snapshot = json.load(file)
+        if snapshot.get("format") != SNAPSHOT_FORMAT:
+            return {}
+        return snapshot
+
+    @property
+    def snapshot(self) -> dict:
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._load()
+        return self._snapshot  # type: ignore
+
+    def get(self, key: str) -> dict | None:
+        """Get the snapshot taken with a key.
+
+        Args:
+            - key: The data hashes of the graph and the version of the prompt.
+
+        Returns:
+            - The snapshot, with the schema, the vocabularies and the system
+            prompt. None if the snapshot on disk was taken with another key.
+        """
+        if not self.settings_provider.schema_snapshot_enabled():
+            return None
+        if self.snapshot.get("key") != key:
+            logger.info("Schema snapshot missing or stale")
+            return None
+        return self.snapshot
+
+    def put(
+        self,
+        key: str,
+        schema: str,
+        vocabularies: dict[str, list[str]],
+        system_prompt: str,
+    ) -> None:
+        """Save a snapshot to disk, replacing the previous one.
+
+        Args:
+            - key: The data hashes of the graph and the version of the prompt.
+            - schema: The schema of the graph.
+            - vocabularies: The vocabularies included in the prompt, by name.
+            - system_prompt: The rendered system prompt.
+        """
+        if not self.settings_provider.schema_snapshot_enabled():
+            return
+        snapshot = {
+            "format": SNAPSHOT_FORMAT,
+            "key": key,
+            "schema": schema,
+            "vocabularies": vocabularies,
+            "system_prompt": system_prompt,
+        }
+        path = self.settings_provider.get_schema_snapshot_path()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(snapshot, file, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._snapshot = snapshot
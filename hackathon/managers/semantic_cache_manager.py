@@ -0,0 +1,273 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from hackathon.managers.answer_cache_manager import get_answers_version
+from hackathon.managers.catalogue_manager import CatalogueManager
+from hackathon.managers.entity_linker_manager import VOCABULARIES
+from hackathon.utils.phrase_matcher import PhraseMatcher
+from hackathon.utils.settings.settings_provider import SettingsProvider
+from hackathon.utils.singleton import Singleton
+from hackathon.utils.text_utils import normalize_text
+
+logger = logging.getLogger(__name__)
+
+# Numbers in a question, e.g. license grades and distances in light years
+NUMBER = re.compile(r"\d+(?:[.,]\d+)?")
+
+# Words negating the entities that follow them, e.g. "senza" or "esclusi"
+NEGATION_WORDS = {"non", "senza", "ne", "tranne", "eccetto", "salvo"}
+NEGATION_PREFIXES = ("esclu", "evit")
+
+
+class SemanticCacheManager(metaclass=Singleton):
+    """Singleton cache of the answers of the agent, matched by meaning.
+
+    Questions are embedded on CPU with a local sentence embedding model and kept in
+    a brute force cosine index, a matrix of normalised vectors searched with a single
+    matrix-vector product. A question whose nearest neighbour is above the similarity
+    threshold gets the answer of that neighbour. Questions built on the same
+    template are close whatever entity they name, so a neighbour is only taken if
+    it names the same entities of the catalogue and the same numbers, in the same
+    order. Questions with a negation are never cached, the embeddings barely tell
+    "contengono X" from "non contengono X". Like the exact answer cache, the index
+    is persisted to disk with the version of the answers and discarded when it
+    changes.
+    """
+
+    def __init__(self):
+        self._embeddings = None
+        self._vectors: np.ndarray | None = None
+        self._questions: list[str] = []
+        self._dish_ids: list[list[str]] = []
+        self._signatures: list[list[str]] = []
+        self._matcher = None
+        self._matcher_version = None
+        self._version = None
+        # Embeddings computed on a miss, reused when the answer is stored
+        self._recent: dict[str, np.ndarray] = {}
+        self._hits = 0
+        self._misses = 0
+        self._lookup_time = 0.0
+        self._agent_runs = 0
+        self._agent_time = 0.0
+        self._lock = threading.Lock()
+        self.settings_provider = SettingsProvider()  # type: ignore
+
+    def _setup_embeddings(self):
+        # Imported here, loading transformers is slow and the cache is optional
+        from langchain_huggingface import HuggingFaceEmbeddings
+
+        self._embeddings = HuggingFaceEmbeddings(
+            model_name=self.settings_provider.get_semantic_cache_model_name(),
+            model_kwargs={"device": "cpu"},
+            encode_kwargs={"normalize_embeddings": True},
+        )
+
+    def _setup_index(self, version: str | None):
+        """Load the index from disk, discarding it if the version of the answers
+        or the embedding model changed.
+        """
+        self._version = version
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._questions, self._dish_ids, self._signatures = [], [], []
+
+        path = self.settings_provider.get_semantic_cache_path()
+        if not os.path.exists(path):
+            return
+        with np.load(path) as content:
+            metadata = json.loads(str(content["metadata"]))
+            if (
+                "signatures" not in metadata
+                or version is None
+                or metadata.get("version") != version
+                or metadata["model_name"]
+                != self.settings_provider.get_semantic_cache_model_name()
+            ):
+                logger.info(
+                    "Graph data, model or prompt changed, discarding semantic cache"
+                )
+                return
+            self._vectors = content["vectors"]
+        self._questions = metadata["questions"]
+        self._dish_ids = metadata["dish_ids"]
+        self._signatures = metadata["signatures"]
+        logger.info(f"Loaded {len(self._questions)} semantic cache entries from {path}")
+
+    @property
+    def embeddings(self) -> Embeddings:
+        with self._lock:
+            if self._embeddings is None:
+                self._setup_embeddings()
+        return self._embeddings  # type: ignore
+
+    def _check_index(self, version: str | None):
+        """Load the index on first use and empty it when the version of the answers
+        changes, the same version as the exact answer cache. Must be called holding
+        the lock.
+        """
+        if self._vectors is None:
+            self._setup_index(version)
+        elif self._version != version:
+            logger.info("Graph data, model or prompt changed, clearing semantic cache")
+            self._vectors = np.empty((0, 0), dtype=np.float32)
+            self._questions, self._dish_ids, self._signatures = [], [], []
+            self._version = version
+
+    @property
+    def matcher(self) -> PhraseMatcher:
+        catalogue = CatalogueManager()
+        version = catalogue.version
+        with self._lock:
+            if self._matcher is None or self._matcher_version != version:
+                self._matcher = PhraseMatcher.from_vocabularies(
+                    {kind: catalogue.get_vocabulary(kind) for kind in VOCABULARIES}
+                )
+                self._matcher_version = version
+        return self._matcher  # type: ignore
+
+    def _signature(self, question: str) -> list[str]:
+        """The entities of the catalogue, with their kind, and the numbers named in
+        a question, in the order of the question. Two questions can only share an
+        answer if they have the same signature.
+        """
+        entities = [
+            f"{'/'.join(sorted(m.kinds))}:{normalize_text(m.phrase)}"
+            for m in self.matcher.find(question)
+        ]
+        numbers = [n.replace(",", ".") for n in NUMBER.findall(question)]
+        return entities + numbers
+
+    @staticmethod
+    def _has_negation(question: str) -> bool:
+        return any(
+            word in NEGATION_WORDS or word.startswith(NEGATION_PREFIXES)
+            for word in normalize_text(question).split()
+        )
+
+    def _embed(self, question: str) -> np.ndarray:
+        # The e5 models expect the "query: " prefix on the text to embed
+        vector = self.embeddings.embed_query(f"query: {question}")
+        return np.asarray(vector, dtype=np.float32)
+
+    def get(self, question: str) -> list[str] | None:
+        """Get the answer of the most similar cached question.
+
+        Args:
+            - question: The question of the user.
+
+        Returns:
+            - The dish ids of the answer, None if no cached question is similar enough.
+        """
+        enabled = self.settings_provider.semantic_cache_enabled()
+        if not enabled or self._has_negation(question):
+            return None
+
+        start = time.perf_counter()
+        vector = self._embed(question)
+        signature = self._signature(question)
+        threshold = self.settings_provider.get_semantic_cache_threshold()
+        version = get_answers_version()
+        with self._lock:
+            self._check_index(version)
+            dish_ids = None
+            if version is not None and len(self._questions):
+                similarities = self._vectors @ vector  # type: ignore
+                # The most similar question above the threshold with the same
+                # entities and numbers
+                for index in np.argsort(-similarities):
+                    if similarities[index] < threshold:
+                        break
+                    if self._signatures[index] == signature:
+                        dish_ids = list(self._dish_ids[index])
+                        logger.info(
+                            f"Semantic cache hit ({similarities[index]:.3f}): "
+                            f"'{question}' ~ '{self._questions[index]}'"
+                        )
+                        break
+            if dish_ids is None:
+                self._recent[normalize_text(question)] = vector
+                self._misses += 1
+            else:
+                self._hits += 1
+            self._lookup_time += time.perf_counter() - start
+        return dish_ids
+
+    def put(self, question: str, dish_ids: list[str]) -> None:
+        """Add an answered question to the index.
+
+        Args:
+            - question: The question of the user.
+            - dish_ids: The dish ids of the answer.
+        """
+        enabled = self.settings_provider.semantic_cache_enabled()
+        if not enabled or not dish_ids or self._has_negation(question):
+            return
+
+        with self._lock:
+            vector = self._recent.pop(normalize_text(question), None)
+        if vector is None:
+            vector = self._embed(question)
+        signature = self._signature(question)
+        version = get_answers_version()
+        with self._lock:
+            self._check_index(version)
+            if version is None:
+                return
+            if len(self._questions):
+                self._vectors = np.vstack([self._vectors, vector])  # type: ignore
+            else:
+                self._vectors = vector[np.newaxis, :]
+            self._questions.append(question)
+            self._dish_ids.append(list(dish_ids))
+            self._signatures.append(signature)
+
+    def record_agent_run(self, elapsed: float) -> None:
+        """Record the time the agent took to answer a question the cache missed."""
+        with self._lock:
+            self._agent_runs += 1
+            self._agent_time += elapsed
+
+    def get_stats(self) -> dict[str, float]:
+        """Hit rate and latency of the cache, and the agent time it saved, estimated
+        from the mean time of the agent on the questions the cache missed.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            mean_lookup = self._lookup_time / lookups if lookups else 0.0
+            mean_agent = (
+                self._agent_time / self._agent_runs if self._agent_runs else 0.0
+            )
+            return {
+                "lookups": lookups,
+                "hits": self._hits,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "mean_lookup_seconds": mean_lookup,
+                "mean_agent_seconds": mean_agent,
+                "saved_seconds": self._hits * (mean_agent - mean_lookup),
+            }
+
+    def save(self) -> None:
+        """Persist the index to disk."""
+        with self._lock:
+            self._recent.clear()
+            if self._vectors is None or self._version is None:
+                return
+            metadata = {
+                "version": self._version,
+                "model_name": self.settings_provider.get_semantic_cache_model_name(),
+                "questions": self._questions,
+                "dish_ids": self._dish_ids,
+                "signatures": self._signatures,
+            }
+            path = self.settings_provider.get_semantic_cache_path()
+            # np.savez appends the extension to paths without one
+            tmp_path = f"{path}.tmp.npz"
+            np.savez(tmp_path, vectors=self._vectors, metadata=json.dumps(metadata))
+            os.replace(tmp_path, path)
@@ -1,9 +1,16 @@
 from dotenv import load_dotenv
+from hackathon.managers.answer_cache_manager import AnswerCacheManager
+from hackathon.managers.answer_mapping_manager import AnswerMappingManager
 from hackathon.managers.dataset_manager import DatasetManager
 from hackathon.managers.model_manager import ModelManager
+from hackathon.managers.entity_linker_manager import EntityLinkerManager
+from hackathon.managers.memory_graph_manager import MemoryGraphManager
 from hackathon.managers.neo4j_store_manager import Neo4jStoreManager
+from hackathon.managers.schema_snapshot_manager import SchemaSnapshotManager
+from hackathon.managers.semantic_cache_manager import SemanticCacheManager
 from hackathon.utils.singleton import Singleton
 import logging
+import threading
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,9 +20,29 @@ load_dotenv()
 
 class SessionManager(metaclass=Singleton):
     def __init__(self):
-        self.neo4j_manager = Neo4jStoreManager()
+        self._neo4j_manager = None
+        self._neo4j_lock = threading.Lock()
+        self.memory_graph_manager = MemoryGraphManager()
+        self.entity_linker_manager = EntityLinkerManager()
         self.model_manager = ModelManager()
         self.dataset_manager = DatasetManager()
+        self.answer_mapping_manager = AnswerMappingManager()
+        self.answer_cache_manager = AnswerCacheManager()
+        self.semantic_cache_manager = SemanticCacheManager()
+        self.schema_snapshot_manager = SchemaSnapshotManager()
+
+    @property
+    def neo4j_manager(self) -> Neo4jStoreManager:
+        # Connect on first use, the memory backend may never need Neo4j
+        with self._neo4j_lock:
+            if self._neo4j_manager is None:
+                self._neo4j_manager = Neo4jStoreManager()
+        return self._neo4j_manager
+
+    async def aclose(self) -> None:
+        """Close the async resources, bound to the event loop that created them."""
+        if self._neo4j_manager is not None:
+            await self._neo4j_manager.aclose()
 
 
 # endregion
@@ -0,0 +1,97 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import warnings
+from typing import Any
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteLRUCache(BaseCache):
+    """Persistent LLM response cache stored in a SQLite file, holding at most
+    `max_entries` responses and evicting the least recently used ones.
+
+    LangChain looks the cache up with the serialised messages as `prompt` and with
+    an `llm_string` describing the model: its name, its parameters such as the
+    temperature, and the kwargs bound to it such as the tools. Both are hashed
+    together into the key, so a change to any of them is a miss.
+    """
+
+    def __init__(self, path: str, max_entries: int):
+        """
+        Args:
+            - path: The path of the SQLite file.
+            - max_entries: Maximum number of responses kept in the cache.
+        """
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.max_entries = max_entries
+        # The models are called from the worker threads of the graph
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS llm_cache_accessed_at "
+                "ON llm_cache (accessed_at)"
+            )
+
+    @staticmethod
+    def _key(prompt: str, llm_string: str) -> str:
+        return hashlib.sha256(f"{llm_string}\n{prompt}".encode()).hexdigest()
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        key = self._key(prompt, llm_string)
+        with self._lock, self._connection:
+            row = self._connection.execute(
+                "SELECT response FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._connection.execute(
+                "UPDATE llm_cache SET accessed_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+        try:
+            # loads warns that it is in beta on every call
+            with warnings.catch_warnings(action="ignore"):
+                return loads(row[0])
+        except (ValueError, KeyError, TypeError):
+            # Corrupted, or written by a version of LangChain with other classes
+            logger.warning("Discarding an LLM cache entry that could not be loaded")
+            return None
+
+    def update(self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE) -> None:
+        key = self._key(prompt, llm_string)
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?)",
+                (key, dumps(list(return_val)), time.time()),
+            )
+            self._connection.execute(
+                """
+                DELETE FROM llm_cache WHERE key IN (
+                    SELECT key FROM llm_cache ORDER BY accessed_at DESC
+                    LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+    def clear(self, **kwargs: Any) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM llm_cache")
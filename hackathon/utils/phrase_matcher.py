@@ -0,0 +1,75 @@
+from typing import NamedTuple
+
+from hackathon.utils.text_utils import normalize_text
+
+
+class PhraseMatch(NamedTuple):
+    kinds: frozenset[str]
+    phrase: str
+    start: int
+    end: int
+
+
+class PhraseMatcher:
+    """Finds known phrases in a text with a trie over words.
+
+    Phrases and texts are normalised with `normalize_text` and split into words, so
+    matching ignores casing, accents and punctuation and never stops in the middle
+    of a word. Every phrase has one or more kinds, e.g. "ingredients" or "planets".
+    The text is scanned left to right taking the longest phrase starting at each
+    word, so "carne di mucca" wins over "carne" and matches never overlap.
+    """
+
+    _KINDS = "\0kinds"
+    _PHRASE = "\0phrase"
+
+    def __init__(self):
+        self._root: dict = {}
+
+    @classmethod
+    def from_vocabularies(cls, vocabularies: dict[str, list[str]]) -> "PhraseMatcher":
+        """Build a matcher from vocabularies of phrases keyed by kind."""
+        matcher = cls()
+        for kind, phrases in vocabularies.items():
+            for phrase in phrases:
+                matcher.add(phrase, kind)
+        return matcher
+
+    def add(self, phrase: str, kind: str) -> None:
+        words = normalize_text(phrase).split()
+        if not words:
+            return
+        node = self._root
+        for word in words:
+            node = node.setdefault(word, {})
+        node.setdefault(self._KINDS, set()).add(kind)
+        node[self._PHRASE] = phrase
+
+    def find(self, text: str) -> list[PhraseMatch]:
+        """Find the phrases in a text.
+
+        Args:
+            - text: The text to scan.
+
+        Returns:
+            - The matches in order of position, with start and end word offsets.
+        """
+        words = normalize_text(text).split()
+        matches = []
+        start = 0
+        while start < len(words):
+            node, longest = self._root, None
+            for end in range(start, len(words)):
+                node = node.get(words[end])
+                if node is None:
+                    break
+                if self._KINDS in node:
+                    longest = PhraseMatch(
+                        frozenset(node[self._KINDS]), node[self._PHRASE], start, end + 1
+                    )
+            if longest is None:
+                start += 1
+            else:
+                matches.append(longest)
+                start = longest.end
+        return matches
@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
-from hackathon.enums import LLMProvider
+from hackathon.enums import CheckpointerBackend, GraphBackend, LLMProvider
 
 
 class Settings(BaseSettings):
@@ -37,6 +37,45 @@ class Settings(BaseSettings):
 
     # Dataset path
     dataset_path: str
+    fallback_dataset_path: str = "fallback_dataset.csv"
+    # Number of entries buffered before they are appended to the dataset journal
+    dataset_flush_interval: int = 10
+
+    # Minimum similarity for a dish name to be fuzzily matched to an id
+    dish_match_cutoff: float = 0.85
+    # Minimum difference of similarity between the best and the second dish, a
+    # second dish above the cutoff or closer than this makes the match ambiguous
+    dish_match_margin: float = 0.05
+    # Minimum similarity for an entity in a query to be linked to the graph
+    entity_match_cutoff: float = 0.8
+    # Minimum difference of similarity between the best and the second entity
+    entity_match_margin: float = 0.05
+
+    # Answer cache, keyed by the normalised question
+    answer_cache_enabled: bool = True
+    answer_cache_path: str = "answer_cache.json"
+    answer_cache_max_size: int = 10000
+    # Seconds after which a cached answer expires
+    answer_cache_ttl: float = 7 * 24 * 3600
+
+    # Semantic answer cache, matching paraphrased questions with local embeddings
+    semantic_cache_enabled: bool = False
+    semantic_cache_path: str = "semantic_cache.npz"
+    semantic_cache_model_name: str = "intfloat/multilingual-e5-large"
+    # Minimum cosine similarity for a cached question to be reused
+    semantic_cache_threshold: float = 0.95
+
+    # Answer the plain ingredient and planet lookups without calling the LLM
+    router_enabled: bool = True
+
+    # Number of questions answered concurrently
+    max_concurrency: int = 8
+
+    # Checkpointer settings
+    checkpointer: CheckpointerBackend = CheckpointerBackend.MEMORY
+    checkpoint_db_path: str = "checkpoints.sqlite"
+    # Delete the checkpoints of a question once its answer is recorded
+    prune_finished_threads: bool = True
 
     # Embeddings model name
     embedding_provider: LLMProvider
@@ -47,6 +86,27 @@ class Settings(BaseSettings):
     # Model settings
     model_temperature: float = 0.0
 
+    # Persistent cache of the LLM responses
+    llm_cache_enabled: bool = True
+    llm_cache_path: str = "llm_cache.sqlite"
+    llm_cache_max_entries: int = 50000
+
+    # Requests per second allowed by each provider, 0 for no limit
+    openai_requests_per_second: float = 5.0
+    google_requests_per_second: float = 1.0
+    ibm_requests_per_second: float = 2.0
+
+    # LLM extraction of the menus: requests in flight, and retries of the rate
+    # limited requests with a backoff doubling from the given seconds
+    extraction_max_concurrency: int = 8
+    extraction_max_retries: int = 5
+    extraction_backoff_seconds: float = 2.0
+    # Content addressed cache of the menu markdown and of the entities extracted
+    extraction_cache_enabled: bool = True
+    extraction_cache_path: str = "extraction_cache"
+    # Processes converting the documents to markdown
+    ingestion_max_workers: int = 4
+
     openai_model_name: str | None = None
     google_model_name: str | None = None
 
@@ -64,7 +124,35 @@ class Settings(BaseSettings):
     # MongoDB settings
     mongo_db_uri: str
 
+    # Backend of the fixed graph tools
+    graph_backend: GraphBackend = GraphBackend.NEO4J
+
     # Neo4j settings
     neo4j_url: str
     neo4j_username: str
     neo4j_password: str
+    # Number of rows sent in each UNWIND batch when loading the graph
+    neo4j_batch_size: int = 1000
+    # Connection pool, sized for the concurrent questions and their tool calls
+    neo4j_max_pool_size: int = 100
+    # Seconds to wait for a free connection of the pool
+    neo4j_acquisition_timeout: float = 60.0
+    # Number of records fetched in each batch from the server
+    neo4j_fetch_size: int = 1000
+    # Seconds after which a read transaction is aborted
+    neo4j_query_timeout: float = 30.0
+    # Limits of the queries written by the agent, timeout in seconds
+    cypher_query_timeout: float = 10.0
+    cypher_row_limit: int = 1000
+    # Number of validated query shapes kept
+    cypher_plan_cache_size: int = 1000
+    # Cache of the results of the tool queries, TTL in seconds
+    query_cache_enabled: bool = True
+    query_cache_path: str = "query_cache.json"
+    query_cache_max_size: int = 10000
+    query_cache_ttl: float = 24 * 3600
+    # Seconds the startup benchmark allows for importing the CLI
+    startup_time_budget: float = 3.0
+    # Snapshot of the schema and of the system prompt of the agent
+    schema_snapshot_enabled: bool = True
+    schema_snapshot_path: str = "schema_snapshot.json"
@@ -1,8 +1,7 @@
 import os
-from hackathon.enums import LLMProvider
+from hackathon.enums import CheckpointerBackend, GraphBackend, LLMProvider
 from hackathon.utils.settings.settings import Settings
 from hackathon.utils.singleton import Singleton
-from langfuse.callback import CallbackHandler
 
 
 class SettingsProvider(metaclass=Singleton):
@@ -77,6 +76,65 @@ class SettingsProvider(metaclass=Singleton):
     def get_dataset_path(self) -> str:
         return os.path.join(self.settings.data_path, self.settings.dataset_path)
 
+    def get_fallback_dataset_path(self) -> str:
+        return os.path.join(
+            self.settings.data_path, self.settings.fallback_dataset_path
+        )
+
+    def get_dataset_flush_interval(self) -> int:
+        return self.settings.dataset_flush_interval
+
+    def get_dish_match_cutoff(self) -> float:
+        return self.settings.dish_match_cutoff
+
+    def get_dish_match_margin(self) -> float:
+        return self.settings.dish_match_margin
+
+    def router_enabled(self) -> bool:
+        return self.settings.router_enabled
+
+    def get_entity_match_cutoff(self) -> float:
+        return self.settings.entity_match_cutoff
+
+    def get_entity_match_margin(self) -> float:
+        return self.settings.entity_match_margin
+
+    def get_max_concurrency(self) -> int:
+        return self.settings.max_concurrency
+
+    def answer_cache_enabled(self) -> bool:
+        return self.settings.answer_cache_enabled
+
+    def get_answer_cache_path(self) -> str:
+        return os.path.join(self.settings.data_path, self.settings.answer_cache_path)
+
+    def get_answer_cache_max_size(self) -> int:
+        return self.settings.answer_cache_max_size
+
+    def get_answer_cache_ttl(self) -> float:
+        return self.settings.answer_cache_ttl
+
+    def semantic_cache_enabled(self) -> bool:
+        return self.settings.semantic_cache_enabled
+
+    def get_semantic_cache_path(self) -> str:
+        return os.path.join(self.settings.data_path, self.settings.semantic_cache_path)
+
+    def get_semantic_cache_model_name(self) -> str:
+        return self.settings.semantic_cache_model_name
+
+    def get_semantic_cache_threshold(self) -> float:
+        return self.settings.semantic_cache_threshold
+
+    def get_checkpointer(self) -> CheckpointerBackend:
+        return self.settings.checkpointer
+
+    def get_checkpoint_db_path(self) -> str:
+        return os.path.join(self.settings.data_path, self.settings.checkpoint_db_path)
+
+    def prune_finished_threads(self) -> bool:
+        return self.settings.prune_finished_threads
+
     def get_embeddings_model_name(self) -> str:
         return self.settings.embeddings_model_name
 
@@ -98,6 +156,44 @@ class SettingsProvider(metaclass=Singleton):
     def get_model_temperature(self) -> float:
         return self.settings.model_temperature
 
+    def llm_cache_enabled(self) -> bool:
+        return self.settings.llm_cache_enabled
+
+    def get_llm_cache_path(self) -> str:
+        return os.path.join(self.settings.data_path, self.settings.llm_cache_path)
+
+    def get_llm_cache_max_entries(self) -> int:
+        return self.settings.llm_cache_max_entries
+
+    def get_openai_requests_per_second(self) -> float:
+        return self.settings.openai_requests_per_second
+
+    def get_google_requests_per_second(self) -> float:
+        return self.settings.google_requests_per_second
+
+    def get_ibm_requests_per_second(self) -> float:
+        return self.settings.ibm_requests_per_second
+
+    def get_extraction_max_concurrency(self) -> int:
+        return self.settings.extraction_max_concurrency
+
+    def get_extraction_max_retries(self) -> int:
+        return self.settings.extraction_max_retries
+
+    def get_extraction_backoff_seconds(self) -> float:
+        return self.settings.extraction_backoff_seconds
+
+    def extraction_cache_enabled(self) -> bool:
+        return self.settings.extraction_cache_enabled
+
+    def get_extraction_cache_path(self) -> str:
+        return os.path.join(
+            self.settings.data_path, self.settings.extraction_cache_path
+        )
+
+    def get_ingestion_max_workers(self) -> int:
+        return self.settings.ingestion_max_workers
+
     def get_ibm_project_id(self) -> str | None:
         return self.settings.ibm_project_id
 
@@ -128,12 +224,18 @@ class SettingsProvider(metaclass=Singleton):
             self.settings.licenses_json,
         )
 
-    def get_langfuse_config(self) -> CallbackHandler:
+    def get_langfuse_config(self) -> dict:
         if self._langfuse_config is None:
+            # Imported on first use, langfuse is only needed when tracing
+            from langfuse.callback import CallbackHandler
+
             langfuse_handler = CallbackHandler()
             self._langfuse_config = {"callbacks": [langfuse_handler]}
         return self._langfuse_config
 
+    def get_graph_backend(self) -> GraphBackend:
+        return self.settings.graph_backend
+
     def get_neo4j_url(self) -> str:
         return self.settings.neo4j_url
 
@@ -142,3 +244,48 @@ class SettingsProvider(metaclass=Singleton):
 
     def get_neo4j_password(self) -> str:
         return self.settings.neo4j_password
+
+    def get_neo4j_batch_size(self) -> int:
+        return self.settings.neo4j_batch_size
+
+    def get_neo4j_max_pool_size(self) -> int:
+        return self.settings.neo4j_max_pool_size
+
+    def get_neo4j_acquisition_timeout(self) -> float:
+        return self.settings.neo4j_acquisition_timeout
+
+    def get_neo4j_fetch_size(self) -> int:
+        return self.settings.neo4j_fetch_size
+
+    def get_neo4j_query_timeout(self) -> float:
+        return self.settings.neo4j_query_timeout
+
+    def get_cypher_query_timeout(self) -> float:
+        return self.settings.cypher_query_timeout
+
+    def get_cypher_row_limit(self) -> int:
+        return self.settings.cypher_row_limit
+
+    def get_cypher_plan_cache_size(self) -> int:
+        return self.settings.cypher_plan_cache_size
+
+    def query_cache_enabled(self) -> bool:
+        return self.settings.query_cache_enabled
+
+    def get_query_cache_path(self) -> str:
+        return os.path.join(self.settings.data_path, self.settings.query_cache_path)
+
+    def get_query_cache_max_size(self) -> int:
+        return self.settings.query_cache_max_size
+
+    def get_query_cache_ttl(self) -> float:
+        return self.settings.query_cache_ttl
+
+    def get_startup_time_budget(self) -> float:
+        return self.settings.startup_time_budget
+
+    def schema_snapshot_enabled(self) -> bool:
+        return self.settings.schema_snapshot_enabled
+
+    def get_schema_snapshot_path(self) -> str:
+        return os.path.join(self.settings.data_path, self.settings.schema_snapshot_path)
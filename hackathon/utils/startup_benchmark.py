@@ -0,0 +1,87 @@
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from typing import NamedTuple
+
+from hackathon.utils.settings.settings_provider import SettingsProvider
+
+
+class ImportTime(NamedTuple):
+    module: str
+    self_seconds: float
+    cumulative_seconds: float
+
+
+def profile_imports(module: str) -> list[ImportTime]:
+    """Import a module in a fresh interpreter with `-X importtime`.
+
+    Args:
+        - module: The module to import, e.g. "hackathon.main".
+
+    Returns:
+        - The import time of every module imported, slowest cumulative first.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    # Lines are "import time: <self us> | <cumulative us> | <nested module>"
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        times.append(
+            ImportTime(name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6)
+        )
+    return sorted(times, key=lambda t: t.cumulative_seconds, reverse=True)
+
+
+def measure_startup(module: str, repeat: int = 5) -> float:
+    """Median wall time in seconds of importing a module in a fresh interpreter,
+    interpreter startup included.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", f"import {module}"], capture_output=True, check=True
+        )
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure the startup time of the CLI and the slowest imports."
+    )
+    parser.add_argument("--module", default="hackathon.main")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--top", type=int, default=15, help="Number of slowest imports shown."
+    )
+    parser.add_argument(
+        "--budget",
+        type=float,
+        default=SettingsProvider().get_startup_time_budget(),
+        help="Fail if the startup time in seconds is above this budget.",
+    )
+    args = parser.parse_args()
+
+    for t in profile_imports(args.module)[: args.top]:
+        print(f"{t.cumulative_seconds:8.3f}s {t.self_seconds:8.3f}s  {t.module}")
+
+    elapsed = measure_startup(args.module, args.repeat)
+    print(f"Importing {args.module}: {elapsed:.3f}s (budget {args.budget:.3f}s)")
+    if elapsed > args.budget:
+        print("Startup time over budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+import difflib
+import re
+import unicodedata
+
+
+def normalize_text(text: str) -> str:
+    """Normalise a text for matching: lowercase, fold accents, replace punctuation
+    with spaces and collapse whitespace.
+
+    Example:
+        "  Sinfonia  Cosmica: all'Alba di Fenice! " -> "sinfonia cosmica all alba di fenice"
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    text = re.sub(r"[^\w\s]|_", " ", text)
+    return " ".join(text.split())
+
+
+def closest_match(
+    word: str, possibilities: list[str], cutoff: float, margin: float
+) -> str | None:
+    """Find the closest possibility to a word by edit distance, if the match is
+    unambiguous: a second possibility also above the cutoff, or within the margin
+    of the best one, could equally be meant and no match is returned.
+
+    Args:
+        - word: The word to match.
+        - possibilities: The candidates.
+        - cutoff: Minimum similarity, in [0, 1], of the match.
+        - margin: Minimum difference of similarity with the second candidate.
+
+    Returns:
+        - The closest possibility, None if no possibility matches unambiguously.
+    """
+    matches = difflib.get_close_matches(
+        word, possibilities, n=2, cutoff=max(0.0, cutoff - margin)
+    )
+    scores = [difflib.SequenceMatcher(None, match, word).ratio() for match in matches]
+    if not scores or scores[0] < cutoff:
+        return None
+    if len(scores) > 1 and (scores[1] >= cutoff or scores[0] - scores[1] < margin):
+        return None
+    return matches[0]
@@ -0,0 +1,72 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterator
+from typing import Any
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a time to live.
+
+    Entries are kept in access order: a hit moves the entry to the end and, when the
+    cache is full, the least recently used entry is evicted. Expiry times are wall
+    clock timestamps, so the entries can be persisted and loaded back.
+    """
+
+    def __init__(self, max_size: int, ttl: float | None = None):
+        """
+        Args:
+            - max_size: Maximum number of entries kept in the cache.
+            - ttl: Seconds after which an entry expires, None to never expire.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[Hashable, tuple[float | None, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get the value of a key, `default` if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, value: Any, expires_at: float | None = None) -> None:
+        """Store a value, evicting the least recently used entry if the cache is full.
+
+        Args:
+            - key: The key of the entry.
+            - value: The value of the entry.
+            - expires_at: Expiry timestamp, computed from the ttl if not given.
+        """
+        if expires_at is None and self.ttl is not None:
+            expires_at = time.time() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def items(self) -> Iterator[tuple[Hashable, float | None, Any]]:
+        """The entries that have not expired, from the least recently used, as
+        (key, expires_at, value) tuples.
+        """
+        now = time.time()
+        with self._lock:
+            entries = list(self._entries.items())
+        for key, (expires_at, value) in entries:
+            if expires_at is None or expires_at > now:
+                yield key, expires_at, value
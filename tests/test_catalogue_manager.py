@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from hackathon.managers.catalogue_manager import CatalogueManager
+from hackathon.utils.singleton import Singleton
+
+DISHES = [
+    {
+        "name": "Sinfonia Cosmica",
+        "culinary_order": "nessun ordine",
+        "ingredients": ["Latte+"],
+    }
+]
+CHEFS = [
+    {
+        "name": "Chef Alpha",
+        "restaurant": "Eco di Pandora",
+        "planet_name": "Pandora",
+        "licenses": [{"name": "psionica", "level": 2}],
+    }
+]
+TECHNIQUES = [
+    {
+        "name": "Vapore Quantico",
+        "category": "cottura a vapore",
+        "licenses": [
+            {"name": "Quantistica", "level": 3},
+            {"name": "psionica", "level": 1},
+        ],
+    }
+]
+
+
+@pytest.fixture
+def catalogue(monkeypatch, tmp_path):
+    Singleton._instances.pop(CatalogueManager, None)
+    catalogue = CatalogueManager()
+    for name, content in [
+        ("dishes", DISHES),
+        ("chefs", CHEFS),
+        ("techniques", TECHNIQUES),
+    ]:
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps(content))
+        monkeypatch.setattr(
+            catalogue.settings_provider,
+            f"get_{name}_json_path",
+            lambda path=path: str(path),
+        )
+    yield catalogue
+    Singleton._instances.pop(CatalogueManager, None)
+
+
+def test_licenses_of_chefs_and_techniques(catalogue):
+    assert catalogue.get_vocabulary("licenses") == ["psionica", "quantistica"]
+
+
+def test_vocabularies(catalogue):
+    assert catalogue.get_vocabulary("ingredients") == ["latte+"]
+    assert catalogue.get_vocabulary("restaurants") == ["eco di pandora"]
+    assert catalogue.get_vocabulary("technique_categories") == ["cottura a vapore"]
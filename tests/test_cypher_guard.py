@@ -0,0 +1,103 @@
+from types import SimpleNamespace
+
+import pytest
+
+from hackathon.graph.tools import cypher_guard
+from hackathon.graph.tools.cypher_guard import CypherGuard, normalize_query
+from hackathon.utils.singleton import Singleton
+
+
+class FakeNeo4jManager:
+    def __init__(self, query_type: str):
+        self.query_type = query_type
+        self.explained = []
+
+    def explain(self, query: str, params: dict | None = None) -> str:
+        self.explained.append(query)
+        return self.query_type
+
+
+@pytest.fixture
+def guard(monkeypatch):
+    Singleton._instances.pop(CypherGuard, None)
+    neo4j_manager = FakeNeo4jManager("r")
+    session = SimpleNamespace(neo4j_manager=neo4j_manager)
+    monkeypatch.setattr(cypher_guard, "SessionManager", lambda: session)
+    guard = CypherGuard()
+    yield guard, neo4j_manager
+    Singleton._instances.pop(CypherGuard, None)
+
+
+def test_normalize_query():
+    query = """
+    // Dishes of a planet
+    MATCH (d:Dish {planet_name: 'Pandora'}) /* within 3 */
+    WHERE d.level >= 3 AND d.name <> "Eco \\"di\\" Pandora"
+    RETURN d.`dish id`
+    """
+
+    assert normalize_query(query) == (
+        "MATCH (d:Dish {planet_name: ?}) WHERE d.level >= ? AND d.name <> ? RETURN d.?"
+    )
+
+
+def test_normalize_query_keeps_identifiers_with_digits():
+    assert normalize_query("MATCH (n1)-[r2]->(m) RETURN n1  LIMIT 10") == (
+        "MATCH (n1)-[r2]->(m) RETURN n1 LIMIT ?"
+    )
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "CREATE (d:Dish {name: 'x'})",
+        "MATCH (d:Dish) DETACH DELETE d",
+        "MATCH (d:Dish) set d.name = 'x'",
+        "MATCH (d:Dish) REMOVE d.name",
+        "MERGE (p:Planet {name: 'x'})",
+        "DROP INDEX dish_name",
+        "MATCH (d) FOREACH (x IN [1] | SET d.n = x)",
+        "LOAD  CSV FROM 'file:///x.csv' AS row RETURN row",
+        "CALL apoc.periodic.iterate('MATCH (n) RETURN n', 'DELETE n', {})",
+        "MATCH (d:Dish) RETURN d /* a comment */ ; CREATE (x)",
+    ],
+)
+def test_rejects_write_clauses(guard, query):
+    guard, neo4j_manager = guard
+
+    with pytest.raises(ValueError, match="Only read queries"):
+        guard.validate(query)
+    assert neo4j_manager.explained == []
+
+
+@pytest.mark.parametrize(
+    "query",
+    [
+        "MATCH (d:Dish {name: 'Create Merge Delete'}) RETURN d",
+        "MATCH (d:Dish) // SET d.name = 'x'\nRETURN d.created_at, d.settled",
+        "MATCH (d:`SET`) RETURN d",
+        "CALL db.labels",
+    ],
+)
+def test_accepts_write_words_outside_clauses(guard, query):
+    guard, _ = guard
+
+    guard.validate(query)
+
+
+def test_rejects_write_plans(guard):
+    guard, neo4j_manager = guard
+    neo4j_manager.query_type = "rw"
+
+    with pytest.raises(ValueError, match="'rw' plan"):
+        guard.validate("MATCH (d:Dish) RETURN d")
+
+
+def test_validated_shapes_are_not_planned_again(guard):
+    guard, neo4j_manager = guard
+
+    guard.validate("MATCH (d:Dish {name: 'A'}) RETURN d LIMIT 5")
+    guard.validate("MATCH (d:Dish {name: 'B'})  RETURN d LIMIT 10")
+
+    assert len(neo4j_manager.explained) == 1
+    assert guard.get_stats() == {"hits": 1, "misses": 1}
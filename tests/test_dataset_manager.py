@@ -0,0 +1,63 @@
+import os
+
+import polars as pl
+import pytest
+
+from hackathon.managers.dataset_manager import DatasetManager
+from hackathon.models import CSVEntry
+from hackathon.utils.settings.settings_provider import SettingsProvider
+from hackathon.utils.singleton import Singleton
+
+
+def restart() -> DatasetManager:
+    """A new manager, as after a restart of the process."""
+    Singleton._instances.pop(DatasetManager, None)
+    return DatasetManager()
+
+
+@pytest.fixture
+def dataset_path(monkeypatch, tmp_path):
+    path = tmp_path / "dataset.csv"
+    settings = SettingsProvider()
+    monkeypatch.setattr(settings, "get_dataset_path", lambda: str(path))
+    monkeypatch.setattr(settings, "get_dataset_flush_interval", lambda: 2)
+    yield path
+    Singleton._instances.pop(DatasetManager, None)
+
+
+def test_replay_journal_after_crash(dataset_path):
+    manager = restart()
+    manager.add_entry(CSVEntry(question_id=1, result="10"))
+    manager.save()
+
+    manager = restart()
+    manager.add_entry(CSVEntry(question_id=2, result="20"))
+    manager.add_entry(CSVEntry(question_id=1, result="11"))
+    # Not flushed yet, lost by the crash
+    manager.add_entry(CSVEntry(question_id=3, result="30"))
+    with open(f"{dataset_path}.journal", "a") as file:
+        file.write('{"row_id": 4, "res')
+
+    manager = restart()
+    assert manager.entries == {1: "11", 2: "20"}
+    manager.add_entry(CSVEntry(question_id=3, result="30"))
+    manager.save()
+
+    dataset = pl.read_csv(dataset_path)
+    assert dataset["row_id"].to_list() == [1, 2, 3]
+    assert dataset["result"].cast(pl.Utf8).to_list() == ["11", "20", "30"]
+    assert not os.path.exists(f"{dataset_path}.journal")
+
+
+def test_replaying_twice_does_not_duplicate_rows(dataset_path):
+    manager = restart()
+    manager.add_entry(CSVEntry(question_id=5, result="50"))
+    manager.add_entry(CSVEntry(question_id=6, result="60"))
+
+    # Two crashes in a row, the journal is replayed twice
+    assert restart().row_ids == {5, 6}
+    manager = restart()
+    manager.save()
+
+    assert manager.row_ids == {5, 6}
+    assert pl.read_csv(dataset_path)["row_id"].to_list() == [5, 6]
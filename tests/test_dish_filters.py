@@ -0,0 +1,95 @@
+import pytest
+
+from hackathon.graph.tools.dish_filters import (
+    And,
+    DishFilter,
+    DishMatrix,
+    HasIngredient,
+    NeedsLicense,
+    Not,
+    OnPlanet,
+    Or,
+    UsesTechnique,
+)
+from hackathon.models import Dish, License, Technique
+
+
+@pytest.fixture
+def matrix() -> DishMatrix:
+    techniques = [
+        Technique(
+            name="Grigliatura Astrale",
+            category="grigliatura",
+            licenses=[License(name="gravitazionale", level=1)],
+        ),
+        Technique(
+            name="Vapore Quantico",
+            category="cottura a vapore",
+            licenses=[License(name="gravitazionale", level=3)],
+        ),
+    ]
+    dishes = [
+        Dish(
+            name="Sinfonia Cosmica",
+            planet_name="Pandora",
+            ingredients=["Latte+", "Chocobo Wings"],
+            techniques=["Grigliatura Astrale"],
+        ),
+        Dish(
+            name="Nebulosa di Sapori",
+            planet_name="Tatooine",
+            ingredients=["Latte+"],
+            techniques=["Vapore Quantico"],
+        ),
+        Dish(
+            name="Eco di Pandora",
+            planet_name="Pandora",
+            ingredients=["Sale Temporale"],
+            techniques=[],
+        ),
+    ]
+    return DishMatrix.from_entities(dishes, techniques)
+
+
+def test_dish_filter_is_abstract():
+    with pytest.raises(TypeError):
+        DishFilter()  # type: ignore
+
+
+def test_and_or_not(matrix):
+    latte = HasIngredient("latte+")
+    pandora = OnPlanet("Pandora")
+
+    assert matrix.evaluate(And(latte, pandora)) == ["sinfonia cosmica"]
+    assert matrix.evaluate(Or(latte, pandora)) == matrix.dish_names
+    assert matrix.evaluate(Not(latte)) == ["eco di pandora"]
+    assert matrix.evaluate(latte & ~pandora) == ["nebulosa di sapori"]
+
+
+def test_empty_combinations(matrix):
+    assert matrix.evaluate(And()) == matrix.dish_names
+    assert matrix.evaluate(Or()) == []
+    assert matrix.evaluate(Not(HasIngredient("muffa lunare"))) == matrix.dish_names
+
+
+def test_needs_license_min_level(matrix):
+    assert matrix.evaluate(NeedsLicense("Gravitazionale")) == [
+        "sinfonia cosmica",
+        "nebulosa di sapori",
+    ]
+    assert matrix.evaluate(NeedsLicense("gravitazionale", 3)) == ["nebulosa di sapori"]
+    assert matrix.evaluate(NeedsLicense("gravitazionale", 4)) == []
+    assert matrix.evaluate(NeedsLicense("psionica")) == []
+
+
+def test_cross_check(matrix):
+    expression = HasIngredient("latte+") & UsesTechnique("vapore quantico")
+
+    assert matrix.cross_check(expression, ["Nebulosa di Sapori"]) == {
+        "missing": [],
+        "unexpected": [],
+    }
+    assert matrix.cross_check(expression, ["Eco di Pandora"]) == {
+        "missing": ["nebulosa di sapori"],
+        "unexpected": ["eco di pandora"],
+    }
@@ -0,0 +1,82 @@
+import pytest
+
+from hackathon.managers import entity_linker_manager
+from hackathon.managers.entity_linker_manager import EntityLinkerManager
+from hackathon.utils.singleton import Singleton
+from hackathon.utils.text_utils import closest_match
+
+
+class FakeCatalogue:
+    version = (0,)
+
+    def get_vocabulary(self, name: str) -> list[str]:
+        return {
+            "ingredients": [
+                "riso di cassandra",
+                "spaghi del sole",
+                "spaghi del sale",
+                "essenza di tachioni",
+            ],
+            "planets": ["pandora", "krypton"],
+            "restaurants": ["eco di pandora"],
+        }.get(name, [])
+
+
+@pytest.fixture
+def linker(monkeypatch):
+    Singleton._instances.pop(EntityLinkerManager, None)
+    monkeypatch.setattr(entity_linker_manager, "CatalogueManager", FakeCatalogue)
+    linker = EntityLinkerManager()
+    settings = linker.settings_provider
+    monkeypatch.setattr(settings, "get_entity_match_cutoff", lambda: 0.8)
+    monkeypatch.setattr(settings, "get_entity_match_margin", lambda: 0.05)
+    yield linker
+    Singleton._instances.pop(EntityLinkerManager, None)
+
+
+def test_closest_match():
+    possibilities = ["riso di cassandra", "essenza di tachioni"]
+
+    assert closest_match("riso di casandra", possibilities, 0.8, 0.05) == (
+        "riso di cassandra"
+    )
+
+
+def test_closest_match_below_cutoff():
+    assert closest_match("riso di cassiopea", ["riso di cassandra"], 0.8, 0.05) is None
+
+
+def test_closest_match_ambiguous():
+    possibilities = ["spaghi del sole", "spaghi del sale"]
+
+    # Both candidates above the cutoff
+    assert closest_match("spaghi del solo", possibilities, 0.8, 0.05) is None
+    # The second candidate is below the cutoff but within the margin of the first
+    assert closest_match("spaghi del solo", possibilities, 0.9, 0.1) is None
+    assert closest_match("spaghi del solo", possibilities, 0.9, 0.05) == (
+        "spaghi del sole"
+    )
+
+
+def test_link_exact_and_normalized(linker):
+    assert linker.link(" Krypton ", "planets") == "krypton"
+    assert linker.link("Essènza di Tachioni!", "ingredients") == "essenza di tachioni"
+
+
+def test_link_fuzzy(linker):
+    assert linker.link("Riso di Casandra", "ingredients") == "riso di cassandra"
+    assert linker.link_all(["Pandorra", "Kripton"], "planets") == [
+        "pandora",
+        "krypton",
+    ]
+
+
+def test_link_leaves_ambiguous_and_distant_names_unlinked(linker):
+    assert linker.link("Spaghi del Solo", "ingredients") == "spaghi del solo"
+    assert linker.link("Riso di Cassiopea", "ingredients") == "riso di cassiopea"
+
+
+def test_link_searches_the_kind_only(linker):
+    assert linker.link("Eco di Pandora", "planets") == "eco di pandora"
+    assert linker.link("Eco di Pandora") == "eco di pandora"
+    assert linker.link("Pandorra") == "pandora"
@@ -0,0 +1,46 @@
+from hackathon.utils.phrase_matcher import PhraseMatch, PhraseMatcher
+
+
+def make_matcher() -> PhraseMatcher:
+    return PhraseMatcher.from_vocabularies(
+        {
+            "ingredients": ["carne", "carne di mucca", "latte+", "essenza di tachioni"],
+            "planets": ["pandora"],
+            "restaurants": ["eco di pandora"],
+        }
+    )
+
+
+def test_longest_match_wins():
+    matches = make_matcher().find("Piatti con Carne di Mucca e carne")
+
+    assert [m.phrase for m in matches] == ["carne di mucca", "carne"]
+    assert matches[0] == PhraseMatch(frozenset({"ingredients"}), "carne di mucca", 2, 5)
+
+
+def test_ignores_casing_accents_and_punctuation():
+    matches = make_matcher().find(
+        "Quali piatti contengono LATTE+ e Essènza di Tachioni?"
+    )
+
+    assert [m.phrase for m in matches] == ["latte+", "essenza di tachioni"]
+
+
+def test_never_matches_inside_a_word():
+    assert make_matcher().find("Piatti carnevaleschi di Pandoraa") == []
+
+
+def test_matches_do_not_overlap():
+    matches = make_matcher().find("Piatti di Eco di Pandora")
+
+    assert [(m.kinds, m.phrase) for m in matches] == [
+        (frozenset({"restaurants"}), "eco di pandora")
+    ]
+
+
+def test_phrase_with_several_kinds():
+    matcher = make_matcher()
+    matcher.add("Pandora", "dishes")
+
+    (match,) = matcher.find("Su Pandora")
+    assert match.kinds == {"planets", "dishes"}
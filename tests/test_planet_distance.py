@@ -0,0 +1,60 @@
+import pytest
+
+from hackathon.graph.tools.planet_distance import PlanetDistanceIndex
+from hackathon.utils.singleton import Singleton
+
+DISTANCES = """/,Tatooine,Krypton,Namecc,Pandora
+Tatooine,0,100,83,250
+Krypton,100,0,83,150
+Namecc,83,83,0,400
+Pandora,250,150,400,0
+"""
+
+
+@pytest.fixture
+def index(monkeypatch, tmp_path):
+    path = tmp_path / "distances.csv"
+    path.write_text(DISTANCES)
+    Singleton._instances.pop(PlanetDistanceIndex, None)
+    index = PlanetDistanceIndex()
+    monkeypatch.setattr(
+        index.settings_provider, "get_distance_csv_path", lambda: str(path)
+    )
+    yield index
+    Singleton._instances.pop(PlanetDistanceIndex, None)
+
+
+def test_within_includes_the_boundary(index):
+    assert index.within("Tatooine", 83) == ["tatooine", "namecc"]
+    assert index.within("Tatooine", 82.9) == ["tatooine"]
+    assert index.within("tatooine ", 100) == ["tatooine", "namecc", "krypton"]
+
+
+def test_within_zero_is_the_planet_itself(index):
+    assert index.within("Pandora", 0) == ["pandora"]
+
+
+def test_within_any_sorts_by_closest_origin(index):
+    assert index.within_any(["Tatooine", "Pandora"], 150) == [
+        "pandora",
+        "tatooine",
+        "namecc",
+        "krypton",
+    ]
+    assert index.within_any(["Namecc", "Krypton"], 83) == [
+        "krypton",
+        "namecc",
+        "tatooine",
+    ]
+
+
+def test_nearest_excludes_the_planet(index):
+    assert index.nearest("Krypton", 2) == ["namecc", "tatooine"]
+    assert index.nearest("Namecc", 2) == ["krypton", "tatooine"]
+    assert index.nearest("Pandora", 10) == ["krypton", "tatooine", "namecc"]
+    assert index.nearest("Pandora", 0) == []
+
+
+def test_unknown_planet(index):
+    with pytest.raises(ValueError, match="Unknown planet"):
+        index.within("Alderaan", 10)
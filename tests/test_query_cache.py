@@ -0,0 +1,135 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from hackathon.graph.tools import query_cache
+from hackathon.graph.tools.query_cache import QueryCache, canonical_query
+from hackathon.utils.singleton import Singleton
+
+
+class FakeNeo4jManager:
+    """Graph whose version is kept by the process, like Neo4jStoreManager, and
+    written by this process or by others through `stored_version`."""
+
+    def __init__(self):
+        self.stored_version = "epoch:1"
+        self.graph_version = self.stored_version
+        self.queries = []
+
+    def refresh_graph_version(self) -> str | None:
+        self.graph_version = self.stored_version
+        return self.graph_version
+
+    async def arefresh_graph_version(self) -> str | None:
+        return self.refresh_graph_version()
+
+    def read(self, query: str, params: dict) -> list[dict]:
+        self.queries.append((query, params))
+        return [{"version": self.stored_version, "params": params}]
+
+    async def aread(self, query: str, params: dict) -> list[dict]:
+        return self.read(query, params)
+
+
+@pytest.fixture
+def cache(monkeypatch, tmp_path):
+    Singleton._instances.pop(QueryCache, None)
+    neo4j_manager = FakeNeo4jManager()
+    session = SimpleNamespace(neo4j_manager=neo4j_manager)
+    monkeypatch.setattr(query_cache, "SessionManager", lambda: session)
+    cache = QueryCache()
+    settings = cache.settings_provider
+    monkeypatch.setattr(settings, "query_cache_enabled", lambda: True)
+    monkeypatch.setattr(
+        settings, "get_query_cache_path", lambda: str(tmp_path / "query_cache.json")
+    )
+    yield cache, neo4j_manager
+    Singleton._instances.pop(QueryCache, None)
+
+
+def test_canonical_query():
+    query = """
+    MATCH (d:Dish)  // dishes
+    WHERE d.name = 'Eco  di   Pandora' /* keep the literal */
+    RETURN d
+    """
+
+    assert canonical_query(query) == (
+        "MATCH (d:Dish) WHERE d.name = 'Eco  di   Pandora' RETURN d"
+    )
+
+
+def test_keyed_by_canonical_query_and_params(cache):
+    cache, neo4j_manager = cache
+
+    cache.query("MATCH (d:Dish) RETURN d", {"a": 1, "b": [2]})
+    cache.query("MATCH (d:Dish)\n  RETURN d // all", {"b": [2], "a": 1})
+    assert len(neo4j_manager.queries) == 1
+
+    cache.query("MATCH (d:Dish) RETURN d", {"a": 2, "b": [2]})
+    cache.query("MATCH (d:Dish) WHERE d.name = 'a  b' RETURN d")
+    cache.query("MATCH (d:Dish) WHERE d.name = 'a b' RETURN d")
+    assert len(neo4j_manager.queries) == 4
+    assert cache.get_stats()["hits"] == 1
+
+
+def test_invalidated_by_writes_of_the_process(cache):
+    cache, neo4j_manager = cache
+    cache.query("MATCH (d:Dish) RETURN d")
+
+    # Like _bump_graph_version, the process sees its own writes at once
+    neo4j_manager.stored_version = neo4j_manager.graph_version = "epoch:2"
+
+    assert cache.query("MATCH (d:Dish) RETURN d") == [
+        {"version": "epoch:2", "params": {}}
+    ]
+    assert len(neo4j_manager.queries) == 2
+
+
+def test_invalidated_by_writes_of_other_processes_from_the_next_miss(cache):
+    cache, neo4j_manager = cache
+    cache.query("MATCH (d:Dish) RETURN d")
+    neo4j_manager.stored_version = "epoch:2"
+
+    # Not seen until a miss reads the version again
+    cache.query("MATCH (d:Dish) RETURN d")
+    assert len(neo4j_manager.queries) == 1
+    cache.query("MATCH (c:Chef) RETURN c")
+    cache.query("MATCH (d:Dish) RETURN d")
+    assert len(neo4j_manager.queries) == 3
+
+
+def test_not_cached_without_graph_version(cache):
+    cache, neo4j_manager = cache
+    neo4j_manager.stored_version = neo4j_manager.graph_version = None
+
+    cache.query("MATCH (d:Dish) RETURN d")
+    cache.query("MATCH (d:Dish) RETURN d")
+
+    assert len(neo4j_manager.queries) == 2
+
+
+def test_aquery_shares_the_entries(cache):
+    cache, neo4j_manager = cache
+
+    cache.query("MATCH (d:Dish) RETURN d", {"a": 1})
+    rows = asyncio.run(cache.aquery("MATCH (d:Dish) RETURN d", {"a": 1}))
+
+    assert rows == [{"version": "epoch:1", "params": {"a": 1}}]
+    assert len(neo4j_manager.queries) == 1
+
+
+def test_persisted_with_their_version(cache):
+    cache, neo4j_manager = cache
+    cache.query("MATCH (d:Dish) RETURN d")
+    cache.save()
+
+    Singleton._instances.pop(QueryCache, None)
+    cache = QueryCache()
+    cache.query("MATCH (d:Dish) RETURN d")
+    assert len(neo4j_manager.queries) == 1
+
+    neo4j_manager.stored_version = neo4j_manager.graph_version = "epoch:2"
+    cache.query("MATCH (d:Dish) RETURN d")
+    assert len(neo4j_manager.queries) == 2
@@ -0,0 +1,112 @@
+import csv
+from pathlib import Path
+
+import pytest
+
+from hackathon.graph.nodes import router
+from hackathon.graph.nodes.router import QuestionMatcher, _is_plain_lookup, route
+from hackathon.graph.state import GraphState
+from hackathon.models import Dish
+from hackathon.utils.singleton import Singleton
+
+QUESTIONS_PATH = Path(__file__).parents[1] / "competition_data" / "domande.csv"
+
+# Questions of competition_data/domande.csv, by row, without words adding a
+# constraint the matched entities do not capture
+PLAIN_LOOKUPS = {0, 1, 2, 3, 4, 5, 8, 9, 10, 11, 13, 18, 19, 21, 44, 45, 47, 50, 51}
+
+DISH = Dish(name="Sinfonia Cosmica", ingredients=[], techniques=[])
+
+
+class FakeCatalogue:
+    version = (0,)
+
+    def get_vocabulary(self, name: str) -> list[str]:
+        return {
+            "ingredients": ["chocobo wings", "riso di cassandra", "erba pipa"],
+            "planets": ["krypton", "pandora"],
+            "restaurants": ["eco di pandora"],
+            "techniques": ["fermentazione quantico biometrica"],
+            "dishes": ["erba pipa"],
+        }.get(name, [])
+
+
+class FakeTool:
+    def __init__(self):
+        self.calls = []
+
+    def invoke(self, arguments: dict) -> dict:
+        self.calls.append(arguments)
+        return {"dishes": [DISH]}
+
+
+@pytest.fixture
+def tools(monkeypatch):
+    Singleton._instances.pop(QuestionMatcher, None)
+    monkeypatch.setattr(router, "CatalogueManager", FakeCatalogue)
+    monkeypatch.setattr(router.SettingsProvider(), "router_enabled", lambda: True)
+    tools = {"ingredients": FakeTool(), "planets": FakeTool()}
+    monkeypatch.setattr(router, "get_dishes_by_ingredients", tools["ingredients"])
+    monkeypatch.setattr(router, "get_dishes_by_planets", tools["planets"])
+    yield tools
+    Singleton._instances.pop(QuestionMatcher, None)
+
+
+def test_plain_lookups_of_domande():
+    with open(QUESTIONS_PATH) as file:
+        questions = [row["domanda"] for row in csv.DictReader(file)]
+
+    assert {i for i, q in enumerate(questions) if _is_plain_lookup(q)} == PLAIN_LOOKUPS
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        "Quali piatti non contengono Chocobo Wings?",
+        "Quali piatti contengono Chocobo Wings o Riso di Cassandra?",
+        "Quali piatti usano almeno 2 ingredienti tra Chocobo Wings e Erba Pipa?",
+        "Quali piatti sono serviti entro 3 anni luce da Krypton?",
+        "Quali piatti dello chef di Eco di Pandora contengono Chocobo Wings?",
+    ],
+)
+def test_not_plain_lookup(question):
+    assert not _is_plain_lookup(question)
+
+
+def test_routes_ingredients(tools):
+    state = GraphState(
+        question="Quali piatti contengono Chocobo Wings e Riso di Cassandra?"
+    )
+
+    assert route(state)["dishes"] == [DISH]
+    assert tools["ingredients"].calls == [
+        {"ingredients": ["chocobo wings", "riso di cassandra"]}
+    ]
+    assert tools["planets"].calls == []
+
+
+def test_routes_planets(tools):
+    state = GraphState(question="Quali piatti sono serviti su Krypton o Pandora?")
+    assert route(state)["dishes"] == []
+
+    state = GraphState(question="Quali piatti sono serviti su Krypton e Pandora?")
+    assert route(state)["dishes"] == [DISH]
+    assert tools["planets"].calls == [{"planet_names": ["krypton", "pandora"]}]
+
+
+@pytest.mark.parametrize(
+    "question",
+    [
+        # Ingredient and technique
+        "Quali piatti con Fermentazione Quantico Biometrica includono Chocobo Wings?",
+        # Ingredient and planet
+        "Quali piatti di Krypton contengono Chocobo Wings?",
+        # A phrase naming an ingredient and a dish
+        "Quali piatti contengono Erba Pipa?",
+        # No entity
+        "Quali piatti sono i migliori?",
+    ],
+)
+def test_falls_through_to_the_agent(tools, question):
+    assert route(GraphState(question=question))["dishes"] == []
+    assert tools["ingredients"].calls == tools["planets"].calls == []
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+from hackathon.managers import semantic_cache_manager
+from hackathon.managers.semantic_cache_manager import SemanticCacheManager
+from hackathon.utils.singleton import Singleton
+
+
+class FakeCatalogue:
+    version = (0,)
+
+    def get_vocabulary(self, name: str) -> list[str]:
+        return {
+            "ingredients": ["latte+", "chocobo wings", "sale temporale"],
+            "licenses": ["ltk", "q"],
+        }.get(name, [])
+
+
+class FakeEmbeddings:
+    """Embeds every question to the same vector, as if the questions built on
+    the same template were indistinguishable by meaning."""
+
+    def embed_query(self, text: str) -> list[float]:
+        return [1.0, 0.0, 0.0]
+
+
+@pytest.fixture
+def manager(monkeypatch, tmp_path):
+    Singleton._instances.pop(SemanticCacheManager, None)
+    monkeypatch.setattr(semantic_cache_manager, "CatalogueManager", FakeCatalogue)
+    monkeypatch.setattr(semantic_cache_manager, "get_answers_version", lambda: "v1")
+    manager = SemanticCacheManager()
+    manager._embeddings = FakeEmbeddings()
+    settings = manager.settings_provider
+    monkeypatch.setattr(settings, "semantic_cache_enabled", lambda: True)
+    monkeypatch.setattr(settings, "get_semantic_cache_threshold", lambda: 0.95)
+    monkeypatch.setattr(
+        settings,
+        "get_semantic_cache_path",
+        lambda: str(tmp_path / "semantic_cache.npz"),
+    )
+    yield manager
+    Singleton._instances.pop(SemanticCacheManager, None)
+
+
+def test_hit_on_paraphrase(manager):
+    manager.put("Quali piatti contengono il Latte+?", ["1"])
+
+    assert manager.get("Quali sono i piatti che contengono Latte+?") == ["1"]
+
+
+def test_miss_on_different_entity(manager):
+    manager.put("Quali piatti contengono il Latte+?", ["1"])
+
+    assert manager.get("Quali piatti contengono le Chocobo Wings?") is None
+
+
+def test_miss_on_swapped_entities(manager):
+    manager.put("Quali piatti contengono Latte+ e Sale Temporale?", ["1"])
+
+    assert manager.get("Quali piatti contengono Sale Temporale e Latte+?") is None
+
+
+def test_miss_on_negation(manager):
+    manager.put("Quali piatti contengono Latte+ ma non Chocobo Wings?", ["1"])
+    manager.put("Quali piatti contengono Latte+?", ["2"])
+
+    assert manager.get("Quali piatti contengono Chocobo Wings ma non Latte+?") is None
+    assert manager.get("Quali piatti contengono Latte+ ma non Chocobo Wings?") is None
+    assert manager.get("Quali piatti non contengono Latte+?") is None
+    assert manager.get("Quali piatti contengono Latte+?") == ["2"]
+
+
+def test_miss_on_different_number(manager):
+    manager.put("Quali piatti sono di chef con licenza LTK di grado 7?", ["1"])
+
+    assert manager.get("Quali piatti sono di chef con licenza LTK di grado 5?") is None
+
+
+def test_signatures_are_persisted(manager):
+    manager.put("Quali piatti contengono il Latte+?", ["1"])
+    manager.save()
+    manager._vectors = None
+
+    assert manager.get("Quali piatti contengono le Chocobo Wings?") is None
+    assert manager.get("Quali piatti contengono il Latte+?") == ["1"]
+    assert np.asarray(manager._vectors).shape == (1, 3)
+
+
+def test_cleared_on_version_change(manager, monkeypatch):
+    manager.put("Quali piatti contengono il Latte+?", ["1"])
+    manager.save()
+    monkeypatch.setattr(semantic_cache_manager, "get_answers_version", lambda: "v2")
+
+    assert manager.get("Quali piatti contengono il Latte+?") is None
+    manager._vectors = None
+    assert manager.get("Quali piatti contengono il Latte+?") is None